@@ -1,9 +1,13 @@
+import atexit
 import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Any, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional
 
 
 class Config:
@@ -25,10 +29,11 @@ class Config:
         # Основные настройки
         self.APP_NAME = "Training App"
         self.APP_VERSION = "1.0.0"
+        self.ORGANIZATION = "Training App"  # для QSettings
         
         # Определяем режим работы
         self.ENVIRONMENT = os.environ.get('TABATA_ENV', 'production').lower()
-        self.DEBUG = True   #self.ENVIRONMENT in ['development', 'dev', 'test']
+        self.DEBUG = self.ENVIRONMENT in ['development', 'dev', 'test']
         
         # Пути
         self.BASE_DIR = self._get_base_dir()
@@ -39,11 +44,72 @@ class Config:
         # База данных
         # self.DB_PATH = self.DATA_DIR / "database" / "test.db"
         self.DB_PATH = self.DATA_DIR / "database" / "fitness.db"
+        self.DB_POOL_SIZE = 4  # соединений в пуле (0 - новое соединение на каждый запрос)
+        self.DB_POOL_TIMEOUT = 10  # секунд ожидания свободного соединения
+        self.DB_HEALTH_CHECK_INTERVAL = 30  # секунд простоя до проверки соединения
+        # Несколько экземпляров приложения с общей БД: ожидание блокировки записи
+        self.DB_BUSY_TIMEOUT_MS = 1000  # ожидание внутри SQLite до ошибки SQLITE_BUSY
+        self.DB_BUSY_RETRIES = 5  # повторов после SQLITE_BUSY
+        self.DB_BUSY_BACKOFF_BASE = 0.05  # секунд; задержка повтора n - случайная до base * 2^n
+        self.DB_BUSY_BACKOFF_MAX = 1.0  # секунд, предел задержки повтора
+        # Профили PRAGMA, применяемые к каждому соединению с БД
+        self.DB_PRAGMA_PROFILES = {
+            # Максимальная надежность: fsync на каждый коммит
+            "durable": {
+                "journal_mode": "WAL",
+                "synchronous": "FULL",
+                "foreign_keys": "ON",
+                "cache_size": -2000,  # КБ (отрицательное значение)
+                "mmap_size": 0,
+                "temp_store": "DEFAULT",
+            },
+            # WAL + NORMAL: при сбое питания теряется только последняя транзакция
+            "balanced": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "foreign_keys": "ON",
+                "cache_size": -16000,
+                "mmap_size": 64 * 1024 * 1024,
+                "temp_store": "MEMORY",
+            },
+            # Без fsync: только для тестовых баз и массового импорта
+            "fast": {
+                "journal_mode": "WAL",
+                "synchronous": "OFF",
+                "foreign_keys": "ON",
+                "cache_size": -64000,
+                "mmap_size": 256 * 1024 * 1024,
+                "temp_store": "MEMORY",
+            },
+        }
+        self.DB_PRAGMA_PROFILE = os.environ.get('TABATA_DB_PROFILE', 'balanced').lower()
+        # Кэш чтения репозиториев (упражнения, тренировки, подходы)
+        self.CACHE_MAX_SIZE = 1024  # записей (0 - кэш отключен)
+        self.CACHE_TTL = 300  # секунд жизни записи
+        # Резервные копии (SQLite backup API)
+        self.DB_BACKUP_DIR = self.DATA_DIR / "backups"
+        self.DB_BACKUP_PAGES = 1024  # страниц за один шаг копирования (4 МБ при странице 4 КБ)
+        # Автоматические снимки (настройка auto_backup): хранятся только измененные блоки
+        self.SNAPSHOT_DIR = self.DATA_DIR / "snapshots"
+        self.SNAPSHOT_CHUNK_SIZE = 64 * 1024  # байт в блоке (кратно размеру страницы)
+        self.SNAPSHOT_INTERVAL = 24 * 60 * 60  # секунд между снимками
+        self.SNAPSHOT_KEEP_LAST = 7  # последних снимков хранится всегда
+        self.SNAPSHOT_KEEP_DAILY = 30  # дней, за которые хранится последний снимок дня
+        # Экспорт статистики (настройка auto_export): только строки после прошлой выгрузки
+        self.EXPORT_DIR = self.DATA_DIR / "exports"
+        self.EXPORT_FORMAT = "csv"  # "csv" или "jsonl"
+        self.EXPORT_BATCH_SIZE = 1000  # строк в одном запросе
+        # Массовый импорт истории (models.bulk_importer)
+        self.BULK_IMPORT_CHUNK_ROWS = 50000  # подходов в одной транзакции
+        # Импорт одной транзакцией с построением индексов в конце - только когда
+        # БД не используется приложением (запись другими соединениями блокируется)
+        self.BULK_IMPORT_DEFER_INDEXES = False
         
         # Интерфейс
         self.WINDOW_TITLE = f"{self.APP_NAME} v{self.APP_VERSION}"
         self.WINDOW_SIZE = (1024, 768) if not self.DEBUG else (800, 600)
         self.WINDOW_MIN_SIZE = (800, 600)
+        self.SEARCH_DEBOUNCE_INTERVAL = 150  # мс после последнего нажатия до запроса поиска
         
         # Логирование
         self.LOG_LEVEL = logging.DEBUG if self.DEBUG else logging.INFO
@@ -52,23 +118,49 @@ class Config:
         self.LOG_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
         self.LOG_BACKUP_COUNT = 5
         self.LOG_FILE = self.LOGS_DIR / f"{self.APP_NAME.lower().replace(' ', '_')}.log"
+        # Уровни отдельных логгеров (переопределяют LOG_LEVEL)
+        self.LOG_LEVELS = {
+            'PIL': logging.WARNING,
+            'urllib3': logging.WARNING,
+        }
+        # Запись в файл и консоль выполняется фоновым потоком через очередь
+        self.LOG_QUEUE_SIZE = 10000  # записей в очереди
+        # Политика при заполненной очереди: "drop" - отбросить запись,
+        # "block" - ждать LOG_QUEUE_BLOCK_TIMEOUT (ошибки ждут без ограничения)
+        self.LOG_QUEUE_POLICY = "drop"
+        self.LOG_QUEUE_BLOCK_TIMEOUT = 0.5  # секунд ожидания места в очереди
+        self.LOG_SLOW_WRITE_MS = 50  # запись дольше считается медленной
         
         # Настройки таймера
-        self.TIMER_UPDATE_INTERVAL = 1000  # мс
+        self.TIMER_UPDATE_INTERVAL = 100  # мс (только перерисовка, время считает WorkoutTimer)
         self.PREPARATION_TIME = 5  # секунд подготовки
         self.BEEP_ENABLED = True
         self.BEEP_VOLUME = 80  # %
         
         # Настройки тренировок
+        self.DEFAULT_WORK_TIME = 20
         self.DEFAULT_REST_TIME = 10
         self.DEFAULT_CYCLES = 8
         self.DEFAULT_SETS = 1
         
+        # Буфер записи подходов
+        self.HISTORY_FLUSH_SETS = 10  # подходов в буфере до автоматической записи
+        self.HISTORY_FLUSH_INTERVAL = 30000  # мс между периодическими записями буфера
+        self.HISTORY_JOURNAL_PATH = self.DATA_DIR / "history_journal.jsonl"
+        
         # Настройки пользователя
         self.SESSION_TIMEOUT = 24 * 60 * 60  # 1 день в секундах для "запомнить меня"
-        
-        # Создаем директории
-        self._create_directories()
+        self.SESSION_SWEEP_INTERVAL = 60 * 60  # секунд между удалениями истекших сессий
+        self.SESSION_SWEEP_BATCH = 500  # сессий в одной транзакции удаления
+        # Стоимость хеширования паролей scrypt (подбор: PYTHONPATH=src python -m models.passwords)
+        self.PASSWORD_SCRYPT_N = 2 ** 14
+        self.PASSWORD_SCRYPT_R = 8
+        self.PASSWORD_SCRYPT_P = 1
+
+        # Запуск
+        self.STARTUP_BUDGET_MS = 1500  # бюджет запуска до первой отрисовки (--profile-startup)
+
+        # Директории создаются при запуске приложения (create_directories), а не при импорте
     
     def _get_base_dir(self) -> Path:
         """Получение базовой директории"""
@@ -80,7 +172,7 @@ class Config:
         
         return base_dir
     
-    def _create_directories(self):
+    def create_directories(self):
         """Создание необходимых директорий"""
         directories = [
             self.DATA_DIR,
@@ -126,18 +218,121 @@ class Config:
         print("=" * 50)
 
 
+class LoggingStats:
+    """Счетчики конвейера логирования (для диагностики)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.slow_writes = 0
+        self.max_write_ms = 0.0
+        self.max_queue_size = 0
+
+    def record_enqueued(self, queue_size: int):
+        with self._lock:
+            self.enqueued += 1
+            self.max_queue_size = max(self.max_queue_size, queue_size)
+
+    def record_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+    def record_write(self, elapsed_ms: float, slow_ms: float):
+        with self._lock:
+            self.max_write_ms = max(self.max_write_ms, elapsed_ms)
+            if elapsed_ms > slow_ms:
+                self.slow_writes += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "slow_writes": self.slow_writes,
+                "max_write_ms": round(self.max_write_ms, 2),
+                "max_queue_size": self.max_queue_size,
+            }
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Постановка записей в ограниченную очередь без ввода-вывода в потоке вызова
+
+    При заполненной очереди запись отбрасывается (policy="drop") или поток
+    ждет освобождения места не дольше block_timeout (policy="block").
+    Записи уровня ERROR и выше ждут места без ограничения времени при любой
+    политике, чтобы ошибки не терялись.
+    """
+
+    def __init__(self, log_queue: queue.Queue, stats: LoggingStats,
+                 policy: str = "drop", block_timeout: float = 0.5):
+        super().__init__(log_queue)
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Неизвестная политика очереди логов: {policy}")
+        self.stats = stats
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if record.levelno >= logging.ERROR:
+                # Ошибки не отбрасываются: ждем места в очереди без ограничения
+                self.queue.put(record)
+            elif self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.stats.record_dropped()
+            return
+        self.stats.record_enqueued(self.queue.qsize())
+
+
+class TimedQueueListener(QueueListener):
+    """Фоновая запись логов с учетом медленных записей"""
+
+    def __init__(self, log_queue: queue.Queue, *handlers, stats: LoggingStats, slow_ms: float):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.stats = stats
+        self.slow_ms = slow_ms
+
+    def enqueue_sentinel(self):
+        # Очередь ограничена: метка остановки ждет, пока поток освободит место
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord):
+        start = time.perf_counter()
+        super().handle(record)
+        self.stats.record_write((time.perf_counter() - start) * 1000, self.slow_ms)
+
+
+# Фоновый поток записи логов и его счетчики
+_log_listener: Optional[TimedQueueListener] = None
+_log_stats = LoggingStats()
+
+
 def setup_logging(config: Optional[Config] = None):
     """
     Настройка системы логирования
+
+    Логгеры только ставят записи в ограниченную очередь, а запись в файл
+    и консоль выполняет фоновый поток (QueueListener), поэтому поток GUI
+    не ждет дискового ввода-вывода.
     
     Args:
         config: Экземпляр Config (если None, создается новый)
     """
+    global _log_listener
+
     if config is None:
         config = Config()
     
     # Создаем директорию для логов, если не существует
     config.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Повторная настройка: останавливаем прежний поток записи
+    stop_logging()
     
     # Создаем корневой логгер
     root_logger = logging.getLogger()
@@ -173,13 +368,22 @@ def setup_logging(config: Optional[Config] = None):
     
     console_handler.setFormatter(formatter)
     
-    # Добавляем обработчики к корневому логгеру
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Обработчики работают в фоновом потоке, к корневому логгеру добавляется очередь
+    log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    root_logger.addHandler(BoundedQueueHandler(
+        log_queue, _log_stats,
+        policy=config.LOG_QUEUE_POLICY,
+        block_timeout=config.LOG_QUEUE_BLOCK_TIMEOUT
+    ))
+    _log_listener = TimedQueueListener(
+        log_queue, file_handler, console_handler,
+        stats=_log_stats, slow_ms=config.LOG_SLOW_WRITE_MS
+    )
+    _log_listener.start()
     
-    # Отключаем логирование некоторых библиотек
-    logging.getLogger('PIL').setLevel(logging.WARNING)
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    # Уровни отдельных логгеров
+    for name, level in config.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
     
     # Логируем начало сессии
     logger = logging.getLogger(__name__)
@@ -192,6 +396,38 @@ def setup_logging(config: Optional[Config] = None):
     return root_logger
 
 
+def stop_logging():
+    """Запись оставшихся в очереди логов и остановка фонового потока"""
+    global _log_listener
+    if _log_listener is None:
+        return
+    listener, _log_listener = _log_listener, None
+    # Новые записи больше не ставятся в очередь (после остановки - logging.lastResort)
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, BoundedQueueHandler):
+            root_logger.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    stats = _log_stats.to_dict()
+    if stats["dropped"] or stats["slow_writes"]:
+        # Поток записи уже остановлен - сообщаем напрямую в stderr
+        print(f"Логирование: отброшено записей {stats['dropped']}, "
+              f"медленных записей {stats['slow_writes']}", file=sys.stderr)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Счетчики логирования: поставлено, отброшено, медленные записи, размер очереди"""
+    stats = _log_stats.to_dict()
+    stats["queue_size"] = _log_listener.queue.qsize() if _log_listener else 0
+    stats["running"] = _log_listener is not None
+    return stats
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Получение именованного логгера
@@ -1,4 +1,13 @@
 # src/controllers/__init__.py
-from .main_controller import MainController
+# MainController импортирует все окна и PyQt, поэтому загружается только
+# при обращении: импорт отдельных контроллеров не тянет за собой GUI
+
+
+def __getattr__(name):
+    if name == 'MainController':
+        from .main_controller import MainController
+        return MainController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['MainController']
\ No newline at end of file
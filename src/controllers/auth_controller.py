@@ -1,8 +1,8 @@
 # src/controllers/auth_controller.py
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from models.database import Database
 from models.repositories.user_repository import UserRepository
-from models.repositories.session_repository import SessionRepository
+from models.repositories.session_repository import SessionRepository, SessionSweeper
 
 class AuthController:
     """Контроллер для управления аутентификацией и пользователями"""
@@ -10,6 +10,8 @@ class AuthController:
     def __init__(self, db: Database = None):
         self.db = db or Database()
         self.user_repo = UserRepository(self.db)
+        self.session_repo = SessionRepository(self.db)
+        self.session_sweeper = SessionSweeper(self.session_repo)
         self.current_user = None
         self.session_token = None
     
@@ -29,7 +31,7 @@ class AuthController:
         #     return {"success": False, "message": "Некорректный email"}
         
         try:
-            # Создаем пользователя
+            # Создаем пользователя (занятые имя и email - DuplicateUserError, подкласс ValueError)
             user = self.user_repo.create_user(username, email, password)
             
             # Автоматически логиним
@@ -40,6 +42,30 @@ class AuthController:
         except Exception as e:
             return {"success": False, "message": f"Ошибка регистрации: {str(e)}"}
     
+    def provision_users(self, users: List[Dict[str, str]], skip_existing: bool = True) -> Dict[str, Any]:
+        """
+        Массовое создание учетных записей (импорт клиентов зала)
+
+        Args:
+            users: Словари с ключами username, email, password
+            skip_existing: Пропускать занятые имена и email (иначе импорт отменяется целиком)
+
+        Returns:
+            Dict с количеством созданных (created) и списком пропущенных (skipped)
+        """
+        try:
+            result = self.user_repo.create_users(users, skip_existing=skip_existing)
+            return {
+                "success": True,
+                "created": result["created"],
+                "skipped": result["skipped"],
+                "message": f"Создано пользователей: {result['created']}, пропущено: {len(result['skipped'])}"
+            }
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            return {"success": False, "message": f"Ошибка создания пользователей: {str(e)}"}
+    
     def login(self, email: str, password: str, remember_me: bool = False) -> Dict[str, Any]:
         """Вход пользователя"""
         user = self.user_repo.authenticate(email, password)
@@ -66,8 +92,7 @@ class AuthController:
     def logout(self) -> Dict[str, Any]:
         """Выход пользователя"""
         if self.session_token:
-            session_repo = SessionRepository(self.db)
-            session_repo.delete_session(self.session_token)
+            self.session_repo.delete_session(self.session_token)
         
         self.current_user = None
         self.session_token = None
@@ -83,6 +108,14 @@ class AuthController:
             return True
         return False
     
+    def start_session_sweeper(self):
+        """Запуск фонового удаления истекших сессий"""
+        self.session_sweeper.start()
+
+    def stop_session_sweeper(self):
+        """Остановка фонового удаления истекших сессий"""
+        self.session_sweeper.stop()
+
     def get_current_user(self) -> Optional[Dict[str, Any]]:
         """Получение текущего пользователя"""
         return self.current_user
@@ -121,7 +154,7 @@ class AuthController:
         
         # Проверяем текущий пароль
         user_with_password = self.user_repo.get_by_email(self.current_user['email'])
-        if not UserRepository._verify_password(current_password, user_with_password['password_hash']):
+        if not self.user_repo._verify_password(current_password, user_with_password['password_hash']):
             return {"success": False, "message": "Текущий пароль неверен"}
         
         try:
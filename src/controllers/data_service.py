@@ -0,0 +1,186 @@
+# src/controllers/data_service.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from config import get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+class DataAccessService(QObject):
+    """
+    Сервис доступа к данным в отдельном потоке
+
+    Все вызовы контроллеров выполняются последовательно в одном потоке БД
+    (порядок запросов сохраняется), а результат доставляется в callback
+    в потоке GUI через сигнал Qt.
+    """
+
+    # (callback, результат) - доставка результата в поток GUI
+    _completed = pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self._completed.connect(self._deliver)
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, callback: Optional[Callable[[Any], None]] = None, **kwargs) -> Future:
+        """
+        Постановка вызова в очередь потока БД
+
+        Args:
+            fn: Вызываемая функция (обычно метод контроллера)
+            callback: Функция, получающая результат в потоке GUI
+
+        Returns:
+            Future с результатом вызова
+        """
+        future = Future()
+        self._queue.put((future, fn, args, kwargs, callback))
+        return future
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Синхронный вызов через поток БД (ожидает завершения всех ранее поставленных запросов)"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def wrap(self, controller) -> "AsyncController":
+        """Асинхронная обертка контроллера"""
+        return AsyncController(controller, self)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Остановка потока после выполнения поставленных запросов"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self):
+        """Основной цикл потока БД"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            future, fn, args, kwargs, callback = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Ошибка в потоке БД при вызове {getattr(fn, '__name__', fn)}: {e}")
+                future.set_exception(e)
+                # Контроллеры сообщают об ошибках через словарь результата
+                result = {"success": False, "message": str(e)}
+            else:
+                future.set_result(result)
+
+            if callback is not None:
+                self._completed.emit(callback, result)
+
+    @staticmethod
+    def _deliver(callback, result):
+        """Вызов callback в потоке GUI"""
+        callback(result)
+
+
+class AsyncController:
+    """
+    Асинхронная обертка контроллера
+
+    Каждый метод контроллера доступен с теми же аргументами и дополнительным
+    именованным аргументом callback; вызов возвращает Future.
+    """
+
+    def __init__(self, controller, service: DataAccessService):
+        self._controller = controller
+        self._service = service
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._controller, name)
+        if not callable(attr):
+            raise AttributeError(f"{type(self._controller).__name__}.{name} не является методом")
+
+        def method(*args, callback=None, **kwargs) -> Future:
+            return self._service.submit(attr, *args, callback=callback, **kwargs)
+
+        method.__name__ = name
+        return method
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Процентиль fraction (0..1) списка значений (0 - для пустого списка)"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class EventLoopProbe(QObject):
+    """
+    Измеритель задержек цикла событий GUI
+
+    Таймер с коротким интервалом фиксирует, насколько позже положенного
+    он срабатывает; задержка больше порога считается зависанием интерфейса.
+    """
+
+    def __init__(self, interval_ms: int = 20, stall_threshold_ms: int = 50, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._on_tick)
+        self.reset()
+
+    def reset(self):
+        """Сброс статистики"""
+        self._last_tick = None
+        self.ticks = 0
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self.total_lag_ms = 0.0
+        self.lags_ms = []  # задержка каждого тика (для процентилей)
+
+    def start(self):
+        self.reset()
+        self._last_tick = time.perf_counter()
+        self._timer.start()
+
+    def stop(self) -> dict:
+        """Остановка измерения и получение статистики"""
+        self._timer.stop()
+        stats = self.stats()
+        logger.info(
+            f"Цикл событий: тиков {stats['ticks']}, зависаний {stats['stalls']}, "
+            f"макс. задержка {stats['max_lag_ms']} мс"
+        )
+        return stats
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "stalls": self.stalls,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "avg_lag_ms": round(self.total_lag_ms / self.ticks, 1) if self.ticks else 0.0,
+            "p50_lag_ms": round(percentile(self.lags_ms, 0.50), 1),
+            "p99_lag_ms": round(percentile(self.lags_ms, 0.99), 1),
+        }
+
+    def _on_tick(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._last_tick) * 1000 - self.interval_ms)
+        self._last_tick = now
+        self.ticks += 1
+        self.lags_ms.append(lag_ms)
+        self.total_lag_ms += lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms >= self.stall_threshold_ms:
+            self.stalls += 1
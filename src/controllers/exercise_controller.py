@@ -2,7 +2,7 @@
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 from models.database import Database
-from models.repositories.exercise_repository import ExerciseRepository
+from models.repositories.cached_repositories import CachedExerciseRepository
 # from models.repositories.workout_repository import WorkoutRepository
 from models.repositories.user_repository import UserRepository
 
@@ -12,7 +12,7 @@ class ExerciseController:
     
     def __init__(self, db: Database = None):
         self.db = db or Database()
-        self.exercise_repo = ExerciseRepository(self.db)
+        self.exercise_repo = CachedExerciseRepository(self.db)
         # self.workout_repo = WorkoutRepository(self.db)
         # self.history_repo = exerciseHistoryRepository(self.db)
         self.user_repo = UserRepository(self.db)
@@ -90,6 +90,34 @@ class ExerciseController:
                 "message": f"Ошибка загрузки упражнений: {str(e)}"
             }
     
+    def search_exercises(self, user_id: int, query: str, limit: int = 200) -> Dict[str, Any]:
+        """
+        Поиск упражнений пользователя по названию и описанию
+        
+        Args:
+            user_id: ID пользователя
+            query: Текст запроса (пустой - все упражнения)
+            limit: Максимальное количество результатов
+            
+        Returns:
+            Dict со списком найденных упражнений
+        """
+        try:
+            exercises = self.exercise_repo.search(user_id, query, limit)
+            
+            return {
+                "success": True,
+                "query": query,
+                "exercises": exercises,
+                "count": len(exercises)
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка поиска упражнений: {str(e)}"
+            }
+    
     def get_exercise_by_id(self, exercise_id: int, user_id: int = None) -> Dict[str, Any]:
         """
         Получение упражнения по ID
@@ -3,14 +3,13 @@ import sys
 import os
 import json
 from pathlib import Path
-from models.database import Database
+from models.database import get_database
 from controllers.auth_controller import AuthController
 from controllers.exercise_controller import ExerciseController
 from controllers.workout_controller import WorkoutController
 from views.main_window import MainWindow
-from config import config, setup_logging, get_logger
+from config import config, get_logger
 
-setup_logging(config)
 # Получаем логгер для текущего модуля
 logger = get_logger(__name__)
 
@@ -21,12 +20,13 @@ class MainController:
         self.config = config
 
         # Инициализация базы данных
-        self.db = Database(config.DB_PATH)
+        self.db = get_database(config.DB_PATH)
         
         # Контроллеры
         self.auth_controller = AuthController(self.db)
         self.exercise_controller = ExerciseController(self.db)
         self.workout_controller = WorkoutController(self.db)
+        self.auth_controller.start_session_sweeper()
         
         # Загрузка сохраненной сессии
         self.load_session()
@@ -0,0 +1,164 @@
+# src/controllers/session_simulation.py
+"""
+Симуляция тренировки для измерения зависаний цикла событий GUI
+
+Сессия из sets подходов проходит так же, как в MainWindow: каждый подход
+сохраняется через WorkoutController.save_workout_result (буфер записывается
+в БД каждые HISTORY_FLUSH_SETS подходов), буфер периодически записывается
+по таймеру flush_results, в конце - последняя запись. Вызовы идут через
+DataAccessService (режим "async") или напрямую в потоке GUI (режим "sync",
+для сравнения), а EventLoopProbe измеряет задержки цикла событий.
+
+Запуск из корня проекта:
+    PYTHONPATH=src python -m controllers.session_simulation [подходов] [async|sync] [файл БД]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from config import config
+from controllers.data_service import DataAccessService, EventLoopProbe, percentile
+from controllers.exercise_controller import ExerciseController
+from controllers.workout_controller import WorkoutController
+from models.database import Database
+from models.repositories.user_repository import UserRepository
+
+MODES = ("async", "sync")
+
+
+def run_session(sets: int = 100, mode: str = "async", db_path=None,
+                set_interval_ms: int = 50, flush_interval_ms: int = 1000,
+                timeout_ms: int = 120000) -> Dict[str, Any]:
+    """
+    Прогон симулированной тренировки
+
+    Args:
+        sets: Количество подходов
+        mode: "async" - через поток БД, "sync" - вызовы в потоке GUI
+        db_path: Файл БД (по умолчанию - новая БД во временном каталоге)
+        set_interval_ms: Интервал между подходами (сжатое время тренировки)
+        flush_interval_ms: Период записи буфера по таймеру
+        timeout_ms: Предельное время прогона
+
+    Returns:
+        Сводка: подходы, записи буфера, задержки сохранения и цикла событий (мс)
+    """
+    if mode not in MODES:
+        raise ValueError(f"Неизвестный режим симуляции: {mode}")
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    tmp_dir = Path(tempfile.mkdtemp())
+    # Журнал восстановления симуляции не смешивается с журналом приложения
+    config.HISTORY_JOURNAL_PATH = tmp_dir / "history_journal.jsonl"
+    db = Database(db_path if db_path is not None else tmp_dir / "session.db")
+    user_id = UserRepository(db).create_user(
+        f"sim_{time.time_ns()}", f"sim_{time.time_ns()}@example.com", "simulation"
+    )["id"]
+    exercise_id = ExerciseController(db).create_exercise(user_id, "Симуляция", "")["exercise_id"]
+    workouts = WorkoutController(db)
+    workout_id = workouts.create_workout(user_id, exercise_id, "Симуляция")["workout_id"]
+
+    service = DataAccessService()
+    async_workouts = service.wrap(workouts)
+
+    def submit(name: str, *args, callback):
+        if mode == "async":
+            getattr(async_workouts, name)(*args, callback=callback)
+        else:
+            callback(getattr(workouts, name)(*args))
+
+    loop = QEventLoop()
+    probe = EventLoopProbe()
+    set_timer = QTimer()
+    set_timer.setInterval(set_interval_ms)
+    flush_timer = QTimer()
+    flush_timer.setInterval(flush_interval_ms)
+    state = {"next_set": 1, "saved": 0, "errors": 0, "flushes": 0}
+    save_latencies = []
+
+    def on_saved(started: float, result: dict):
+        save_latencies.append((time.perf_counter() - started) * 1000)
+        state["saved"] += 1
+        if not result["success"]:
+            state["errors"] += 1
+        if state["saved"] == sets:
+            finish()
+
+    def next_set():
+        set_number = state["next_set"]
+        if set_number > sets:
+            set_timer.stop()
+            return
+        state["next_set"] += 1
+        started = time.perf_counter()
+        submit("save_workout_result", set_number, 10, 30,
+               callback=lambda result: on_saved(started, result))
+
+    def on_flushed(result: dict):
+        state["flushes"] += 1
+        if not result["success"]:
+            state["errors"] += 1
+
+    def finish():
+        set_timer.stop()
+        flush_timer.stop()
+
+        def on_last_flush(result: dict):
+            on_flushed(result)
+            loop.quit()
+
+        submit("flush_results", callback=on_last_flush)
+
+    set_timer.timeout.connect(next_set)
+    flush_timer.timeout.connect(lambda: submit("flush_results", callback=on_flushed))
+    QTimer.singleShot(timeout_ms, loop.quit)
+
+    started = time.perf_counter()
+    probe.start()
+    set_timer.start()
+    flush_timer.start()
+    loop.exec()
+    elapsed = time.perf_counter() - started
+    loop_stats = probe.stop()
+
+    service.shutdown()
+    with db.get_connection() as conn:
+        rows_in_db = conn.execute(
+            "SELECT COUNT(*) FROM history WHERE workout_id = ?", (workout_id,)
+        ).fetchone()[0]
+    db.close()
+    app.processEvents()
+
+    return {
+        "mode": mode,
+        "sets": sets,
+        "saved": state["saved"],
+        "rows_in_db": rows_in_db,
+        "flushes": state["flushes"],
+        "errors": state["errors"],
+        "elapsed": round(elapsed, 2),
+        "save_p50_ms": round(percentile(save_latencies, 0.50), 1),
+        "save_p99_ms": round(percentile(save_latencies, 0.99), 1),
+        "loop": loop_stats,
+    }
+
+
+if __name__ == "__main__":
+    sets = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    mode = sys.argv[2] if len(sys.argv) > 2 else "async"
+    db_path = sys.argv[3] if len(sys.argv) > 3 else None
+
+    report = run_session(sets, mode, db_path)
+    loop_stats = report["loop"]
+    print(f"Режим: {report['mode']}, подходов: {report['saved']} из {report['sets']}, "
+          f"строк в БД: {report['rows_in_db']}, записей буфера: {report['flushes']}, "
+          f"ошибок: {report['errors']}")
+    print(f"Время: {report['elapsed']} с, сохранение подхода: p50 {report['save_p50_ms']} мс, "
+          f"p99 {report['save_p99_ms']} мс")
+    print(f"Цикл событий: тиков {loop_stats['ticks']}, зависаний {loop_stats['stalls']}, "
+          f"задержка p50 {loop_stats['p50_lag_ms']} мс, p99 {loop_stats['p99_lag_ms']} мс, "
+          f"макс. {loop_stats['max_lag_ms']} мс")
@@ -1,10 +1,17 @@
 # src/controllers/workout_controller.py
 from typing import List, Dict, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 from models.database import Database
-from models.repositories.workout_repository import WorkoutRepository
-from models.repositories.history_repository import WorkoutHistoryRepository
+from models.repositories.cached_repositories import CachedWorkoutRepository, CachedWorkoutHistoryRepository
+from models.repositories.history_buffer import HistoryWriteBuffer
 from models.repositories.user_repository import UserRepository
+from models.repositories.user_stats_repository import UserStatsRepository
+from models.stats_exporter import StatsExporter
+from models.bulk_importer import BulkImporter
+from config import config, get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
 
 
 class WorkoutController:
@@ -12,10 +19,20 @@ class WorkoutController:
     
     def __init__(self, db: Database = None):
         self.db = db or Database()
-        self.workout_repo = WorkoutRepository(self.db)
-        self.history_repo = WorkoutHistoryRepository(self.db)
+        self.workout_repo = CachedWorkoutRepository(self.db)
+        self.history_repo = CachedWorkoutHistoryRepository(self.db)
         self.user_repo = UserRepository(self.db)
+        self.stats_repo = UserStatsRepository(self.db)
         self.current_workout = None
+        self._workout_dirty = False  # итоги текущей тренировки не записаны в БД
+
+        # Буфер отложенной записи подходов
+        self.history_buffer = HistoryWriteBuffer(
+            self.history_repo,
+            config.HISTORY_JOURNAL_PATH,
+            config.HISTORY_FLUSH_SETS
+        )
+        self._recover_history()
     
     # ========== МЕТОДЫ ДЛЯ ТРЕНИРОВОК ==========
     
@@ -239,36 +256,45 @@ class WorkoutController:
     
     def save_workout_result(self, current_set: int, cycle: int, duration: int) -> Dict[str, Any]:
         """
-        Сохранение результата выполненной тренировки
+        Сохранение результата выполненного подхода текущей тренировки
+
+        Подход попадает в буфер записи, итоги тренировки обновляются в памяти.
+        В БД они записываются одной транзакцией в flush_results().
         
         Args:
-            workout_id: ID тренировки
-            user_id: ID пользователя
+            current_set: Номер подхода
+            cycle: Количество выполненных повторений
             duration: Фактическое время выполнения (сек)
             
         Returns:
             Dict с результатом сохранения
         """
+        if not self.current_workout:
+            return {
+                "success": False,
+                "message": "Тренировка не найдена"
+            }
+
         try:
-            # Проверяем существование тренировки
-            workout = self.workout_repo.get_by_id(self.current_workout['id'], self.current_workout['user_id'])
-            if not workout:
-                return {
-                    "success": False,
-                    "message": "Тренировка не найдена"
-                }
-            
-            # Сохраняем результат
-            history_id = self.history_repo.save_result(
+            # Обновляем итоги тренировки
+            self.current_workout['work_time'] = (self.current_workout['work_time'] or 0) + duration
+            self.current_workout['reps'] = (self.current_workout['reps'] or 0) + cycle
+            self.current_workout['sets'] = current_set
+            self._workout_dirty = True
+
+            # Сохраняем результат (запись в БД пакетами)
+            self.history_buffer.add(
                 self.current_workout['id'], 
                 current_set, 
                 cycle,
                 duration
             )
+            if self.history_buffer.is_full:
+                self.flush_results()
             
             return {
                 "success": True,
-                "history_id": history_id,
+                "workout": self.current_workout,
                 "message": "Результат сохранен"
             }
             
@@ -277,10 +303,139 @@ class WorkoutController:
                 "success": False,
                 "message": f"Ошибка сохранения результата: {str(e)}"
             }
+
+    def flush_results(self) -> Dict[str, Any]:
+        """
+        Запись накопленных подходов и итогов текущей тренировки одной транзакцией
+        
+        Returns:
+            Dict с результатом записи
+        """
+        try:
+            workout = self.current_workout if self._workout_dirty else None
+
+            def write_workout_totals():
+                self.workout_repo.update(
+                    workout['id'], workout['user_id'], workout['name'],
+                    workout['rest_time'], workout['work_time'], workout['reps'], workout['sets']
+                )
+
+            saved = self.history_buffer.flush(write_workout_totals if workout else None)
+            self._workout_dirty = False
+            return {
+                "success": True,
+                "saved": saved
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка записи результатов: {str(e)}"
+            }
+
+    def finish_workout(self, workout_id: int, user_id: int) -> Dict[str, Any]:
+        """
+        Завершение остановленной тренировки: запись подходов и удаление пустой тренировки
+
+        Вызывается в потоке работы с БД после уже поставленных в очередь
+        подходов, поэтому решение об удалении принимается по записанным
+        итогам, а не по словарю текущей тренировки, который меняет этот поток.
+
+        Args:
+            workout_id: ID тренировки
+            user_id: ID пользователя (для проверки владельца)
+
+        Returns:
+            Dict с результатом; deleted - тренировка без подходов удалена
+        """
+        flushed = self.flush_results()
+        if not flushed["success"]:
+            return flushed
+
+        try:
+            with self.db.get_connection(write=True):
+                workout = self.workout_repo.get_by_id(workout_id, user_id)
+                if not workout:
+                    return {
+                        "success": False,
+                        "message": "Тренировка не найдена или нет доступа"
+                    }
+                empty = not workout['work_time'] and not self.history_repo.get_data_by_workout_id(
+                    workout_id, user_id
+                )
+                if empty:
+                    self.workout_repo.delete(workout_id, user_id)
+
+            if empty and self.current_workout and self.current_workout['id'] == workout_id:
+                self.current_workout = None
+            return {
+                "success": True,
+                "deleted": empty,
+                "message": "Тренировка без выполненных подходов удалена" if empty else "Тренировка сохранена"
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка завершения тренировки: {str(e)}"
+            }
+
+    def export_stats(self, user_id: int) -> Dict[str, Any]:
+        """
+        Выгрузка новых тренировок и подходов пользователя (см. StatsExporter)
+        
+        Returns:
+            Dict с количеством выгруженных строк по таблицам
+        """
+        try:
+            exported = StatsExporter(self.db).export(user_id)
+            return {
+                "success": True,
+                "exported": exported
+            }
+        except Exception as e:
+            logger.error(f"Ошибка экспорта статистики: {e}")
+            return {
+                "success": False,
+                "message": f"Ошибка экспорта статистики: {str(e)}"
+            }
+
+    def import_history(self, user_id: int, path: str, progress=None, cancel_event=None) -> Dict[str, Any]:
+        """
+        Массовый импорт истории тренировок из CSV/JSONL (см. BulkImporter)
+        
+        Args:
+            progress: Функция (прочитано_байт, всего_байт, записано_подходов)
+            cancel_event: threading.Event для отмены между пакетами
+        
+        Returns:
+            Dict с количеством импортированных тренировок и подходов
+        """
+        try:
+            stats = BulkImporter(self.db).import_file(path, user_id, progress, cancel_event)
+            return {
+                "success": True,
+                **stats
+            }
+        except Exception as e:
+            logger.error(f"Ошибка импорта истории: {e}")
+            return {
+                "success": False,
+                "message": f"Ошибка импорта истории: {str(e)}"
+            }
+
+    def _recover_history(self):
+        """Восстановление подходов, не записанных из-за аварийного завершения"""
+        try:
+            workout_ids = self.history_buffer.recover()
+            if workout_ids:
+                self.workout_repo.recalculate_totals(workout_ids)
+        except Exception as e:
+            logger.error(f"Ошибка восстановления подходов из журнала: {e}")
     
-    def get_last_workout_id(self, exercise_id: int) -> int:
+    def get_last_workout_id(self, exercise_id: int, user_id: int = None) -> int:
         """ Получение последней тренировки по ID упражнения """
-        return self.workout_repo.get_last_workout_id(exercise_id)
+        return self.workout_repo.get_last_workout_id(exercise_id, user_id)
         
     
     def get_exercise_history(self, user_id: int, exercise_id: int) -> Dict[str, Any]:
@@ -291,19 +446,14 @@ class WorkoutController:
             exercise_id: ID конкретного упражнения
             
         Returns:
-            Dict с историей тренировок
+            Dict с последней тренировкой (workout) и ее подходами (history)
         """
         try:
-            workout_id = self.get_last_workout_id(exercise_id)
-            if workout_id is None:
-                return {
-                    "success": True,
-                    "history": None
-                }
-            history = self.history_repo.get_data_by_workout_id(workout_id)
+            workout = self.workout_repo.get_last_workout_with_sets(user_id, exercise_id)
             return {
                 "success": True,
-                "history": history
+                "workout": workout,
+                "history": workout.pop('history') if workout else None
             }
             
         except Exception as e:
@@ -312,9 +462,34 @@ class WorkoutController:
                 "message": f"Ошибка получения данных последней тренировоки для конкретного упражнения: {str(e)}"
             }
 
+    def get_exercise_trend(self, user_id: int, exercise_id: int = None, limit: int = 5) -> Dict[str, Any]:
+        """
+        Последние тренировки с подходами по каждому упражнению (для графиков динамики)
+
+        Args:
+            user_id: ID пользователя
+            exercise_id: Только это упражнение (None - все упражнения)
+            limit: Количество тренировок на упражнение
+
+        Returns:
+            Dict с тренировками по упражнениям {ID упражнения: [тренировки от новых к старым]}
+        """
+        try:
+            trend = self.workout_repo.get_recent_workouts_with_sets(user_id, exercise_id, limit)
+            return {
+                "success": True,
+                "trend": trend
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка получения последних тренировок: {str(e)}"
+            }
+
 
     def get_workout_history(self, user_id: int, workout_id: int = None, 
-                           limit: int = 50) -> Dict[str, Any]:
+                           limit: int = 50, page_token: str = None) -> Dict[str, Any]:
         """
         Получение истории тренировок
         
@@ -322,16 +497,18 @@ class WorkoutController:
             user_id: ID пользователя
             workout_id: ID конкретной тренировки (опционально)
             limit: Ограничение количества записей
+            page_token: Токен страницы из предыдущего ответа (next_token/prev_token)
             
         Returns:
-            Dict с историей тренировок
+            Dict с историей тренировок и токенами соседних страниц
         """
         try:
             if workout_id:
-                pass
-                # history = self.workout_repo.get_by_workout(user_id, workout_id)
+                history = self.history_repo.get_data_by_workout_id(workout_id, user_id)
+                page = {"items": history, "next_token": None, "prev_token": None}
             else:
-                history = self.workout_repo.get_user_workouts(user_id)  #, limit)
+                page = self.workout_repo.get_user_workouts_page(user_id, limit, page_token)
+            history = page["items"]
             
             # # Добавляем информацию о тренировках
             # for record in history:
@@ -342,7 +519,37 @@ class WorkoutController:
             return {
                 "success": True,
                 "history": history,
-                "count": len(history)
+                "count": len(history),
+                "next_token": page["next_token"],
+                "prev_token": page["prev_token"]
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка загрузки истории: {str(e)}"
+            }
+
+    def get_workout_history_page(self, user_id: int, cursor: str = None,
+                                 limit: int = 100) -> Dict[str, Any]:
+        """
+        Получение страницы истории тренировок для постраничных таблиц (сначала новые)
+        
+        Args:
+            user_id: ID пользователя
+            cursor: Токен следующей страницы из предыдущего ответа (None - первая страница)
+            limit: Размер страницы
+            
+        Returns:
+            Dict со страницей тренировок и токеном следующей страницы (None - страниц больше нет)
+        """
+        try:
+            page = self.workout_repo.get_user_workouts_page(user_id, limit, cursor)
+            return {
+                "success": True,
+                "items": page["items"],
+                "next_cursor": page["next_token"],
+                "prev_cursor": page["prev_token"]
             }
             
         except Exception as e:
@@ -350,6 +557,34 @@ class WorkoutController:
                 "success": False,
                 "message": f"Ошибка загрузки истории: {str(e)}"
             }
+
+    def get_sets_history_page(self, user_id: int, cursor: str = None,
+                              limit: int = 100) -> Dict[str, Any]:
+        """
+        Получение страницы выполненных подходов пользователя (сначала новые тренировки)
+        
+        Args:
+            user_id: ID пользователя
+            cursor: Токен страницы из предыдущего ответа (None - первая страница)
+            limit: Размер страницы
+            
+        Returns:
+            Dict со страницей подходов и токенами соседних страниц
+        """
+        try:
+            page = self.history_repo.get_user_history_page(user_id, limit, cursor)
+            return {
+                "success": True,
+                "items": page["items"],
+                "next_cursor": page["next_token"],
+                "prev_cursor": page["prev_token"]
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка загрузки подходов: {str(e)}"
+            }
     
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """
@@ -360,12 +595,12 @@ class WorkoutController:
             Dict со статистикой
         """
         try:
-            # Общая статистика
-            total_stats = self.workout_repo.get_user_stats(user_id)[0]
+            # Общая статистика (сводная таблица, обновляется триггерами)
+            total_stats = self.stats_repo.get_totals(user_id)
             
-            # # Статистика по периодам
-            # weekly_stats = self.history_repo.get_period_stats(user_id, 7)
-            # monthly_stats = self.history_repo.get_period_stats(user_id, 30)
+            # Статистика по периодам
+            weekly_stats = self.stats_repo.get_current_period(user_id, 'week')
+            monthly_stats = self.stats_repo.get_current_period(user_id, 'month')
             
             # # Самые частые тренировки
             # favorite_workouts = self.history_repo.get_favorite_workouts(user_id, 5)
@@ -378,8 +613,15 @@ class WorkoutController:
                 "stats": {
                     "Всего тренировок": total_stats['total_workouts'],
                     "Общее время": total_stats['total_duration'],
-                    # "weekly": weekly_stats,
-                    # "monthly": monthly_stats,
+                    "total": {
+                        "total_sessions": total_stats['total_workouts'],
+                        "total_time": total_stats['total_duration'],
+                        "total_reps": total_stats['total_reps'],
+                        "total_sets": total_stats['total_sets'],
+                    },
+                    "weekly": weekly_stats,
+                    "monthly": monthly_stats,
+                    "by_exercise": self.stats_repo.get_exercise_totals(user_id),
                     # "favorites": favorite_workouts,
                     # "progress": progress
                 }
@@ -390,6 +632,34 @@ class WorkoutController:
                 "success": False,
                 "message": f"Ошибка загрузки статистики: {str(e)}"
             }
+
+    def check_stats_consistency(self, user_id: int = None, repair: bool = False) -> Dict[str, Any]:
+        """
+        Проверка сводной статистики по исходным таблицам
+        
+        Args:
+            user_id: ID пользователя (None - все пользователи)
+            repair: Пересчитать сводку при расхождениях
+            
+        Returns:
+            Dict с найденными расхождениями
+        """
+        try:
+            differences = self.stats_repo.check_consistency(user_id)
+            if differences and repair:
+                self.stats_repo.rebuild(user_id)
+            return {
+                "success": True,
+                "consistent": not differences,
+                "differences": differences,
+                "repaired": bool(differences) and repair
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Ошибка проверки статистики: {str(e)}"
+            }
     
     # ========== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ==========
     
@@ -459,6 +729,9 @@ class WorkoutController:
         """
         Расчет прогресса пользователя
         
+        История читается потоково, накапливаются только суммы по неделям,
+        поэтому память не зависит от количества подходов.
+        
         Args:
             user_id: ID пользователя
             
@@ -466,29 +739,40 @@ class WorkoutController:
             Dict с данными о прогрессе
         """
         try:
+            # Суммы и количества по неделям, общее среднее и дисперсия (метод Уэлфорда)
+            weekly_data = {}
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+
             # Получаем историю за последние 30 дней
-            history = self.history_repo.get_period_history(user_id, 30)
+            for record in self.history_repo.iter_period_history(user_id, 30):
+                duration = record['duration'] or 0
+
+                # Группируем по неделям
+                week_num = datetime.fromisoformat(record['completed_at']).isocalendar()[1]
+                week_total, week_count = weekly_data.get(week_num, (0, 0))
+                weekly_data[week_num] = (week_total + duration, week_count + 1)
+
+                count += 1
+                delta = duration - mean
+                mean += delta / count
+                m2 += delta * (duration - mean)
             
-            if not history:
+            if not count:
                 return {
                     "trend": "stable",
                     "improvement": 0,
                     "consistency": 0
                 }
             
-            # Группируем по неделям
-            weekly_data = {}
-            for record in history:
-                week_num = datetime.fromisoformat(record['completed_at']).isocalendar()[1]
-                if week_num not in weekly_data:
-                    weekly_data[week_num] = []
-                weekly_data[week_num].append(record['duration'])
-            
             # Анализируем тренд
             if len(weekly_data) >= 2:
                 weeks = sorted(weekly_data.keys())
-                first_week_avg = sum(weekly_data[weeks[0]]) / len(weekly_data[weeks[0]])
-                last_week_avg = sum(weekly_data[weeks[-1]]) / len(weekly_data[weeks[-1]])
+                first_total, first_count = weekly_data[weeks[0]]
+                last_total, last_count = weekly_data[weeks[-1]]
+                first_week_avg = first_total / first_count
+                last_week_avg = last_total / last_count
                 
                 improvement = ((last_week_avg - first_week_avg) / first_week_avg * 100 
                               if first_week_avg > 0 else 0)
@@ -503,12 +787,10 @@ class WorkoutController:
                 trend = "stable"
                 improvement = 0
             
-            # Рассчитываем консистентность (стандартное отклонение)
-            durations = [record['duration'] for record in history]
-            if len(durations) > 1:
-                avg_duration = sum(durations) / len(durations)
-                variance = sum((x - avg_duration) ** 2 for x in durations) / len(durations)
-                consistency = max(0, 100 - (variance / avg_duration * 100)) if avg_duration > 0 else 0
+            # Рассчитываем консистентность (дисперсия длительности)
+            if count > 1:
+                variance = m2 / count
+                consistency = max(0, 100 - (variance / mean * 100)) if mean > 0 else 0
             else:
                 consistency = 0
             
@@ -516,8 +798,8 @@ class WorkoutController:
                 "trend": trend,
                 "improvement": round(improvement, 1),
                 "consistency": round(consistency, 1),
-                "total_sessions": len(history),
-                "avg_duration": round(sum(durations) / len(durations) if durations else 0, 1)
+                "total_sessions": count,
+                "avg_duration": round(mean, 1)
             }
             
         except Exception:
@@ -534,6 +816,9 @@ class WorkoutController:
         """
         Генерация отчета по тренировкам
         
+        Итоги, популярные тренировки и распределение по дням недели
+        считаются агрегатными запросами SQL.
+        
         Args:
             user_id: ID пользователя
             start_date: Начальная дата (YYYY-MM-DD)
@@ -543,46 +828,33 @@ class WorkoutController:
             Dict с отчетом
         """
         try:
-            # Получаем данные за период
-            history = self.history_repo.get_date_range_history(
-                user_id, start_date, end_date
-            )
+            # Агрегируем данные за период
+            summary = self.history_repo.get_date_range_history(user_id, start_date, end_date)
+            total_sessions = summary['total_sessions']
+            total_duration = summary['total_duration']
             
-            if not history:
+            if not total_sessions:
                 return {
                     "success": False,
                     "message": "Нет данных за указанный период"
                 }
             
-            # Агрегируем данные
-            total_duration = sum(record['duration'] for record in history)
-            total_sessions = len(history)
-            avg_duration = total_duration / total_sessions if total_sessions > 0 else 0
+            avg_duration = total_duration / total_sessions
             
-            # Самые популярные тренировки
-            workout_counts = {}
-            for record in history:
-                workout_id = record['workout_id']
-                workout_counts[workout_id] = workout_counts.get(workout_id, 0) + 1
-            
-            top_workouts = sorted(workout_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-            
-            # Преобразуем в читаемый формат
-            top_workouts_info = []
-            for workout_id, count in top_workouts:
-                workout = self.workout_repo.get_by_id(workout_id, user_id)
-                if workout:
-                    top_workouts_info.append({
-                        'name': workout['name'],
-                        'count': count,
-                        'percentage': round(count / total_sessions * 100, 1)
-                    })
+            # Самые популярные тренировки (название из той же выборки)
+            top_workouts_info = [
+                {
+                    'name': workout['name'],
+                    'count': workout['count'],
+                    'percentage': round(workout['count'] / total_sessions * 100, 1)
+                }
+                for workout in self.history_repo.get_date_range_top_workouts(
+                    user_id, start_date, end_date, limit=3
+                )
+            ]
             
             # Распределение по дням недели
-            day_stats = {i: 0 for i in range(7)}  # 0=Понедельник, 6=Воскресенье
-            for record in history:
-                day_of_week = datetime.fromisoformat(record['completed_at']).weekday()
-                day_stats[day_of_week] += 1
+            day_stats = self.history_repo.get_date_range_weekday_counts(user_id, start_date, end_date)
             
             return {
                 "success": True,
@@ -599,7 +871,9 @@ class WorkoutController:
                     },
                     "top_workouts": top_workouts_info,
                     "day_distribution": day_stats,
-                    "recommendations": self._generate_recommendations(history)
+                    "recommendations": self._generate_recommendations(
+                        total_sessions, avg_duration, summary['distinct_workouts']
+                    )
                 }
             }
             
@@ -610,41 +884,41 @@ class WorkoutController:
             }
     
     @staticmethod
-    def _generate_recommendations(history: List[Dict]) -> List[str]:
+    def _generate_recommendations(total_sessions: int, avg_duration: float,
+                                  distinct_workouts: int) -> List[str]:
         """
-        Генерация рекомендаций на основе истории
+        Генерация рекомендаций на основе агрегатов истории
         
         Args:
-            history: История тренировок
+            total_sessions: Количество подходов
+            avg_duration: Средняя длительность подхода (сек)
+            distinct_workouts: Количество разных тренировок
             
         Returns:
             Список рекомендаций
         """
         recommendations = []
         
-        if not history:
+        if not total_sessions:
             recommendations.append("Начните свою первую тренировку!")
             return recommendations
         
         # Анализируем частоту тренировок
-        if len(history) < 4:
+        if total_sessions < 4:
             recommendations.append("Увеличьте частоту тренировок до 3-4 раз в неделю")
         
         # Анализируем время тренировок
-        durations = [record['duration'] for record in history]
-        avg_duration = sum(durations) / len(durations)
-        
         if avg_duration < 300:  # Менее 5 минут
             recommendations.append("Попробуйте увеличить продолжительность тренировок")
         elif avg_duration > 1800:  # Более 30 минут
             recommendations.append("Рассмотрите возможность разделения длинных тренировок")
         
         # Анализируем консистентность
-        if len(set([record['workout_id'] for record in history])) == 1:
+        if distinct_workouts == 1:
             recommendations.append("Добавьте разнообразия в ваши тренировки")
         
         # Положительные моменты
-        if len(history) >= 8:
+        if total_sessions >= 8:
             recommendations.append("Отличная регулярность! Продолжайте в том же духе!")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
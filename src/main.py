@@ -7,21 +7,47 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent.parent.absolute()
 sys.path.insert(0, str(ROOT_DIR))
 
-from PyQt6.QtWidgets import QApplication
-from controllers.main_controller import MainController
+from startup_profiler import (
+    timeline, is_profile_requested, is_profile_child, parse_budget,
+    run_profile, install_first_paint_hook
+)
 
 
 def main():
+    from config import config, setup_logging
+
+    # Режим профилирования: приложение запускается повторно в дочернем процессе
+    if is_profile_requested(sys.argv):
+        budget_ms = parse_budget(sys.argv, config.STARTUP_BUDGET_MS)
+        sys.exit(run_profile(sys.argv, budget_ms))
+
+    # Побочные эффекты конфигурации выполняются при запуске, а не при импорте
+    config.create_directories()
+    setup_logging(config)
+    timeline.mark("config_and_logging")
+
+    # Qt и окна импортируются только при запуске приложения
+    from PyQt6.QtWidgets import QApplication
+    timeline.mark("import_qt")
     app = QApplication(sys.argv)
-   
+    timeline.mark("qapplication")
+
     # Устанавливаем стили
     app.setStyle("Fusion")
-    
+
+    from controllers.main_controller import MainController
+    timeline.mark("import_app_modules")
+
     # Создаем и запускаем контроллер
     controller = MainController()
+    timeline.mark("main_controller_init")
     controller.run()
-    
+    timeline.mark("show_window")
+
+    if is_profile_child():
+        install_first_paint_hook(controller.view, app)
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
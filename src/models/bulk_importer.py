@@ -0,0 +1,295 @@
+# src/models/bulk_importer.py
+"""
+Массовый импорт истории тренировок из CSV/JSONL
+
+Строка файла - один подход: exercise, workout, set_number, reps, duration
+и необязательные created_at, workout_name, rest_time. Подходы одной
+тренировки (одинаковое значение workout) должны идти подряд.
+
+Файл читается потоково, упражнения сопоставляются по имени через словарь
+в памяти (недостающие создаются), тренировки и подходы записываются
+пакетами executemany - одна транзакция на пакет. Индексы при этом
+сохраняются: приложение и другие экземпляры продолжают работать с БД.
+
+Режим defer_indexes - для импорта, когда БД не используется приложением:
+весь импорт выполняется одной транзакцией записи, в которой вторичные
+индексы workouts и history удаляются и в конце строятся заново. Другие
+соединения до фиксации читают прежний снимок с индексами, а при сбое
+откатывается и удаление индексов. Запись другими соединениями на это
+время блокируется.
+"""
+import csv
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import config, get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+REQUIRED_COLUMNS = ("exercise", "workout", "set_number", "reps", "duration")
+OPTIONAL_COLUMNS = ("created_at", "workout_name", "rest_time")
+
+# Таблицы, вторичные индексы которых откладываются до конца импорта
+DEFERRED_INDEX_TABLES = ("workouts", "history")
+
+
+class BulkImporter:
+    """Потоковый импорт подходов пользователя пакетными транзакциями"""
+
+    def __init__(self, db, chunk_rows: int = None, defer_indexes: bool = None):
+        """
+        Args:
+            db: Экземпляр Database
+            chunk_rows: Подходов в одной транзакции (по умолчанию config.BULK_IMPORT_CHUNK_ROWS)
+            defer_indexes: Импорт одной транзакцией с построением вторичных индексов
+                           в конце (по умолчанию config.BULK_IMPORT_DEFER_INDEXES)
+        """
+        self.db = db
+        self.chunk_rows = chunk_rows or config.BULK_IMPORT_CHUNK_ROWS
+        self.defer_indexes = config.BULK_IMPORT_DEFER_INDEXES if defer_indexes is None else defer_indexes
+
+    def import_file(self, path, user_id: int,
+                    progress: Callable[[int, int, int], None] = None,
+                    cancel_event: threading.Event = None) -> Dict[str, Any]:
+        """
+        Импорт файла истории
+
+        При отмене (cancel_event) уже записанные пакеты сохраняются:
+        в БД попадают только целые тренировки.
+
+        Args:
+            path: Файл .csv или .jsonl
+            user_id: Пользователь, которому принадлежат тренировки
+            progress: Функция (прочитано_байт, всего_байт, записано_подходов)
+            cancel_event: Событие отмены (проверяется между пакетами)
+
+        Returns:
+            Dict: workouts, sets, exercises_created, cancelled, elapsed
+        """
+        path = Path(path)
+        started = time.perf_counter()
+        stats = {"workouts": 0, "sets": 0, "exercises_created": 0, "cancelled": False}
+
+        try:
+            if self.defer_indexes:
+                # Одна транзакция: удаление индексов не фиксируется без их построения
+                with self.db.get_connection() as conn, _foreign_keys_off(self.db, conn):
+                    indexes = self._drop_indexes()
+                    self._import_records(path, user_id, stats, progress, cancel_event)
+                    self._create_indexes(indexes)
+            else:
+                self._import_records(path, user_id, stats, progress, cancel_event)
+        finally:
+            # Кэш чтения мог содержать списки тренировок без импортированных
+            self.db.cache.clear()
+
+        stats["elapsed"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Импорт {path.name}: тренировок {stats['workouts']}, подходов {stats['sets']} "
+            f"за {stats['elapsed']} с" + (" (отменен)" if stats["cancelled"] else "")
+        )
+        return stats
+
+    def _import_records(self, path: Path, user_id: int, stats: Dict[str, Any],
+                        progress: Optional[Callable[[int, int, int], None]],
+                        cancel_event: Optional[threading.Event]):
+        """Чтение файла и запись тренировок пакетами (отмена сохраняет записанные пакеты)"""
+        total_bytes = path.stat().st_size
+        exercise_ids = self._load_exercise_ids(user_id)
+
+        # Прогресс - по позиции в двоичном файле под текстовой оберткой
+        with open(path, "rb") as raw, io.TextIOWrapper(raw, encoding="utf-8-sig", newline="") as text:
+            pending: List[tuple] = []  # законченные тренировки пакета
+            pending_sets = 0
+            for workout in self._iter_workouts(self._iter_records(text, path.suffix.lower())):
+                name = workout[0]
+                if name not in exercise_ids:
+                    exercise_ids[name] = self._create_exercise(user_id, name)
+                    stats["exercises_created"] += 1
+                pending.append((exercise_ids[name],) + workout[1:])
+                pending_sets += len(workout[-1])
+
+                if pending_sets >= self.chunk_rows:
+                    self._write_chunk(user_id, pending, stats)
+                    pending, pending_sets = [], 0
+                    if progress is not None:
+                        progress(raw.tell(), total_bytes, stats["sets"])
+                    if cancel_event is not None and cancel_event.is_set():
+                        stats["cancelled"] = True
+                        return
+
+            if pending:
+                self._write_chunk(user_id, pending, stats)
+            if progress is not None:
+                progress(total_bytes, total_bytes, stats["sets"])
+
+    @staticmethod
+    def _iter_records(text, suffix: str) -> Iterator[tuple]:
+        """
+        Записи файла в порядке столбцов REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+        Числовые поля (и rest_time, если указан) преобразуются в int,
+        отсутствующие необязательные - None. Ошибка формата сообщает номер строки.
+        """
+        columns = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+        if suffix == ".jsonl":
+            rows = (json.loads(line) for line in text if line.strip())
+            for line_number, row in enumerate(rows, 1):
+                try:
+                    yield (row["exercise"], row["workout"], int(row["set_number"]),
+                           int(row["reps"]), int(row["duration"]), row.get("created_at"),
+                           row.get("workout_name"), _optional_int(row.get("rest_time")))
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"Строка {line_number}: {e}") from e
+            return
+
+        if suffix != ".csv":
+            raise ValueError(f"Неподдерживаемый формат файла: {suffix}")
+
+        reader = csv.reader(text)
+        header = next(reader, None) or []
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise ValueError(f"В файле нет столбцов: {', '.join(missing)}")
+        positions = [header.index(column) if column in header else None for column in columns]
+        e_pos, w_pos, n_pos, r_pos, d_pos, c_pos, name_pos, rest_pos = positions
+
+        for line_number, row in enumerate(reader, 2):
+            if not row:
+                continue
+            try:
+                yield (row[e_pos], row[w_pos], int(row[n_pos]), int(row[r_pos]), int(row[d_pos]),
+                       (row[c_pos] or None) if c_pos is not None else None,
+                       (row[name_pos] or None) if name_pos is not None else None,
+                       _optional_int(row[rest_pos]) if rest_pos is not None else None)
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"Строка {line_number}: {e}") from e
+
+    @staticmethod
+    def _iter_workouts(records: Iterator[tuple]) -> Iterator[tuple]:
+        """
+        Группировка подходов в тренировки с подсчетом итогов
+        (как WorkoutRepository.recalculate_totals: сумма времени и повторений, номер последнего подхода)
+
+        Yields:
+            (упражнение, название, created_at, rest_time, work_time, reps, sets, [подходы])
+        """
+        current_key, current, sets = None, None, []
+        work_time = total_reps = last_set = 0
+        for exercise, key, set_number, reps, duration, created_at, workout_name, rest_time in records:
+            if key != current_key or current is None:
+                if current is not None:
+                    yield current + (work_time, total_reps, last_set, sets)
+                current_key, current, sets = key, (exercise, workout_name or exercise, created_at, rest_time), []
+                work_time = total_reps = last_set = 0
+            sets.append((set_number, reps, duration))
+            work_time += duration
+            total_reps += reps
+            if set_number > last_set:
+                last_set = set_number
+        if current is not None:
+            yield current + (work_time, total_reps, last_set, sets)
+
+    def _write_chunk(self, user_id: int, workouts: List[tuple], stats: Dict[str, Any]):
+        """Запись пакета тренировок и их подходов одной транзакцией"""
+        with self.db.get_connection() as conn, _foreign_keys_off(self.db, conn):
+            # id назначаются явно, чтобы подходы ссылались на них без обратных запросов;
+            # пакет пишется в одной транзакции записи, поэтому диапазон id не пересекается
+            row = conn.execute("""
+                SELECT MAX(COALESCE((SELECT MAX(id) FROM workouts), 0),
+                           COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'workouts'), 0))
+            """).fetchone()
+            next_id = row[0] + 1
+
+            workout_rows, history_rows = [], []
+            for offset, (exercise_id, name, created_at, rest_time, work_time, reps, sets_count, sets) \
+                    in enumerate(workouts):
+                workout_id = next_id + offset
+                workout_rows.append((workout_id, user_id, exercise_id, name, work_time,
+                                     rest_time, sets_count, reps, created_at))
+                history_rows.extend((workout_id,) + item for item in sets)
+
+            conn.executemany("""
+                INSERT INTO workouts (id, user_id, exercise_id, name, work_time, rest_time, sets, reps, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, workout_rows)
+            conn.executemany("""
+                INSERT INTO history (workout_id, set_number, reps, duration)
+                VALUES (?, ?, ?, ?)
+            """, history_rows)
+
+        stats["workouts"] += len(workout_rows)
+        stats["sets"] += len(history_rows)
+
+    def _load_exercise_ids(self, user_id: int) -> Dict[str, int]:
+        """Словарь имя упражнения -> id"""
+        with self.db.get_connection() as conn:
+            rows = conn.execute("SELECT name, id FROM exercises WHERE user_id = ?", (user_id,)).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _create_exercise(self, user_id: int, name: str) -> int:
+        with self.db.get_connection(write=True) as conn:
+            cursor = conn.execute("INSERT INTO exercises (user_id, name) VALUES (?, ?)", (user_id, name))
+            return cursor.lastrowid
+
+    def _drop_indexes(self) -> List[Tuple[str, str]]:
+        """Удаление вторичных индексов в транзакции импорта; возвращает (имя, SQL) для построения"""
+        placeholders = ", ".join("?" for _ in DEFERRED_INDEX_TABLES)
+        with self.db.get_connection(write=True) as conn:
+            indexes = [tuple(row) for row in conn.execute(f"""
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+            """, DEFERRED_INDEX_TABLES)]
+            for name, _ in indexes:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+        return indexes
+
+    def _create_indexes(self, indexes: List[Tuple[str, str]]):
+        """Построение отложенных индексов"""
+        started = time.perf_counter()
+        with self.db.get_connection(write=True) as conn:
+            for _, sql in indexes:
+                conn.execute(sql)
+            # Статистика планировщика обновляется только при необходимости
+            conn.execute("PRAGMA optimize")
+        logger.info(f"Индексы после импорта построены за {time.perf_counter() - started:.2f} с")
+
+
+def _optional_int(value) -> Optional[int]:
+    """Необязательное целое поле: пустое значение - None"""
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+@contextmanager
+def _foreign_keys_off(db, conn):
+    """
+    Отключение проверки внешних ключей на время пакета
+
+    Подходы ссылаются на тренировки, вставленные в том же пакете, поэтому
+    проверка на каждую строку избыточна. PRAGMA действует только вне
+    транзакции, поэтому во вложенном вызове проверка остается включенной.
+    """
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        db.begin_write(conn)
+        # Пакет фиксируется здесь, чтобы включить проверку вне транзакции
+        yield
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
@@ -0,0 +1,193 @@
+# src/models/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Потокобезопасный LRU-кэш с ограничением размера и временем жизни записей
+
+    Ключи - кортежи вида (пространство, владелец, ...), например
+    ("exercise", user_id, exercise_id), поэтому записи можно сбрасывать
+    точечно (invalidate) или группой по началу ключа (invalidate_prefix).
+
+    Пока значение загружается (get_or_load), у ключа есть номер поколения:
+    сброс ключа во время загрузки увеличивает его, и загруженное значение
+    (прочитанное, возможно, до изменения) не сохраняется.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize: Максимальное количество записей (0 - кэш отключен)
+            ttl: Время жизни записи в секундах (None - без ограничения)
+            clock: Источник времени (монотонные секунды)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Ключ -> [количество идущих загрузок, поколение]
+        self._loading: Dict[Tuple, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_loads = 0  # загрузки, сброшенные во время чтения из БД
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Tuple, default: Any = None) -> Any:
+        """Значение по ключу (default - если записи нет или она устарела)"""
+        with self._lock:
+            value = self._get(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple, value: Any, ttl: float = None):
+        """
+        Сохранение значения; при переполнении вытесняется давно не использованная запись
+
+        Args:
+            ttl: Время жизни этой записи (не больше общего ttl кэша)
+        """
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def get_or_load(self, key: Tuple, loader: Callable[[], Any], copy: Callable[[Any], Any] = None) -> Any:
+        """
+        Чтение через кэш: при промахе значение загружается loader() и сохраняется
+
+        Args:
+            key: Ключ записи
+            loader: Функция загрузки значения (например, запрос к БД)
+            copy: Функция копирования, чтобы вызывающий код не изменял
+                  значение в кэше (применяется и к загруженному значению)
+        """
+        with self._lock:
+            value = self._get(key)
+            if value is not _MISSING:
+                self.hits += 1
+            else:
+                self.misses += 1
+                loading = self._loading.setdefault(key, [0, 0])
+                loading[0] += 1
+                generation = loading[1]
+
+        if value is not _MISSING:
+            return copy(value) if copy is not None else value
+
+        try:
+            value = loader()
+        except BaseException:
+            with self._lock:
+                self._finish_load(key)
+            raise
+
+        with self._lock:
+            # Ключ сброшен во время загрузки: значение может быть прочитано до изменения
+            if self._finish_load(key) == generation:
+                self._set(key, value)
+            else:
+                self.stale_loads += 1
+        return copy(value) if copy is not None else value
+
+    def invalidate(self, *keys: Tuple) -> int:
+        """Удаление записей по точным ключам; возвращает количество удаленных"""
+        removed = 0
+        with self._lock:
+            for key in keys:
+                if self._data.pop(key, _MISSING) is not _MISSING:
+                    removed += 1
+                if key in self._loading:
+                    self._loading[key][1] += 1
+            self.invalidations += removed
+        return removed
+
+    def invalidate_prefix(self, *prefix: Hashable) -> int:
+        """Удаление всех записей, ключ которых начинается с prefix"""
+        size = len(prefix)
+        return self.invalidate_if(lambda key: key[:size] == prefix)
+
+    def invalidate_if(self, predicate: Callable[[Tuple], bool]) -> int:
+        """Удаление всех записей, для ключей которых predicate(key) истинно"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            for key, loading in self._loading.items():
+                if predicate(key):
+                    loading[1] += 1
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """Удаление всех записей (счетчики сохраняются)"""
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+            for loading in self._loading.values():
+                loading[1] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_loads": self.stale_loads,
+            }
+
+    def _set(self, key: Tuple, value: Any, ttl: float = None):
+        """Сохранение значения (вызывается под блокировкой)"""
+        if self.maxsize <= 0:
+            return
+        if ttl is not None and ttl <= 0:
+            return
+        if self.ttl is not None:
+            ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        expires = self._clock() + ttl if ttl is not None else None
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _finish_load(self, key: Tuple) -> int:
+        """Завершение загрузки ключа; возвращает поколение ключа (вызывается под блокировкой)"""
+        loading = self._loading[key]
+        loading[0] -= 1
+        if loading[0] == 0:
+            del self._loading[key]
+        return loading[1]
+
+    def _get(self, key: Tuple) -> Any:
+        """Значение записи или _MISSING (вызывается под блокировкой)"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        expires, value = entry
+        if expires is not None and self._clock() >= expires:
+            del self._data[key]
+            self.expirations += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
@@ -0,0 +1,133 @@
+# src/models/connection_pool.py
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+from config import get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+class PoolClosedError(sqlite3.ProgrammingError):
+    """Попытка получить соединение из закрытого пула"""
+
+
+class ConnectionPool:
+    """
+    Пул долгоживущих соединений SQLite
+
+    Соединения создаются лениво (не больше size штук) и возвращаются в пул
+    после использования. Одно соединение в каждый момент времени используется
+    только одним потоком, поэтому они открываются с check_same_thread=False.
+    """
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int,
+                 timeout: float = 10.0, health_check_interval: float = 30.0):
+        """
+        Args:
+            factory: Функция создания нового соединения
+            size: Максимальное количество соединений
+            timeout: Время ожидания свободного соединения (сек)
+            health_check_interval: Через сколько секунд простоя соединение проверяется перед выдачей
+        """
+        if size < 1:
+            raise ValueError("Размер пула должен быть положительным")
+        self._factory = factory
+        self._size = size
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()  # (соединение, время последнего использования)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def acquire(self) -> sqlite3.Connection:
+        """Получение соединения из пула (ожидает, если все соединения заняты)"""
+        if self._closed:
+            raise PoolClosedError("Пул соединений закрыт")
+
+        try:
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._try_create()
+            if conn is not None:
+                return conn
+            try:
+                conn, last_used = self._idle.get(timeout=self._timeout)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    f"Нет свободных соединений в пуле (ожидание {self._timeout} сек)"
+                ) from None
+
+        if time.monotonic() - last_used > self._health_check_interval and not self._is_healthy(conn):
+            logger.warning("Соединение из пула не прошло проверку и будет пересоздано")
+            self._discard(conn)
+            conn = self._try_create()
+            if conn is None:
+                # Место освободилось при _discard, поэтому сюда попадаем только при гонке
+                return self.acquire()
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Возврат соединения в пул"""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def close(self):
+        """Закрытие пула и всех простаивающих соединений"""
+        self._closed = True
+        closed = 0
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+            closed += 1
+        logger.debug(f"Пул соединений закрыт, закрыто соединений: {closed}")
+
+    def _try_create(self):
+        """Создание нового соединения, если не достигнут лимит"""
+        with self._lock:
+            if self._created >= self._size:
+                return None
+            self._created += 1
+        try:
+            return self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Закрытие соединения и освобождение места в пуле"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """Проверка работоспособности соединения"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
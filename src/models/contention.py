@@ -0,0 +1,154 @@
+# src/models/contention.py
+"""
+Нагрузочная проверка нескольких процессов-писателей одной БД
+
+Каждый процесс (как отдельный экземпляр приложения на киоске) записывает
+результаты подходов своей тренировки: подход и пересчет итогов тренировки
+в одной транзакции записи. Отчет - пропускная способность, задержки записи,
+ожидания блокировок и повторы после SQLITE_BUSY.
+
+Запуск из корня проекта:
+    PYTHONPATH=src python -m models.contention [процессов] [подходов на процесс] [файл БД]
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _writer(db_path: str, workout_id: int, sets: int, start_event, results):
+    """Процесс-писатель: sets транзакций «подход + итоги тренировки»"""
+    from models.database import Database
+    from models.locking import DatabaseBusyError
+    from models.repositories.history_repository import WorkoutHistoryRepository
+    from models.repositories.workout_repository import WorkoutRepository
+
+    db = Database(db_path, pool_size=1)
+    history_repo = WorkoutHistoryRepository(db)
+    workout_repo = WorkoutRepository(db)
+
+    def save_set(set_number: int):
+        def transaction(conn):
+            history_repo.save_result(workout_id, set_number, 10, 30)
+            workout_repo.recalculate_totals([workout_id])
+        db.run_write(transaction)
+
+    latencies, failed = [], 0
+    start_event.wait()
+    started = time.perf_counter()
+    for set_number in range(1, sets + 1):
+        begin = time.perf_counter()
+        try:
+            save_set(set_number)
+        except DatabaseBusyError:
+            failed += 1
+            continue
+        latencies.append((time.perf_counter() - begin) * 1000)
+    elapsed = time.perf_counter() - started
+    db.close()
+    results.put({
+        "workout_id": workout_id,
+        "saved": len(latencies),
+        "failed": failed,
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "locks": db.lock_stats.to_dict(),
+    })
+
+
+def run_contention(processes: int = 4, sets: int = 200, db_path=None) -> Dict[str, Any]:
+    """
+    Запуск processes писателей по sets подходов
+
+    Returns:
+        Сводка: saved, failed, rows_in_db, sets_per_sec, задержки (мс), счетчики блокировок
+    """
+    from models.database import Database
+
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp()) / "contention.db"
+    db = Database(db_path, pool_size=1)
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES (?, ?, '')",
+            (f"bench_{time.time_ns()}", f"bench_{time.time_ns()}@example.com")
+        ).lastrowid
+        exercise_id = conn.execute(
+            "INSERT INTO exercises (user_id, name) VALUES (?, 'Нагрузочный тест')", (user_id,)
+        ).lastrowid
+        workout_ids = [
+            conn.execute(
+                "INSERT INTO workouts (user_id, exercise_id, name) VALUES (?, ?, ?)",
+                (user_id, exercise_id, f"Писатель {index + 1}")
+            ).lastrowid
+            for index in range(processes)
+        ]
+    db.close()
+
+    context = multiprocessing.get_context()
+    start_event = context.Event()
+    results = context.Queue()
+    workers = [
+        context.Process(target=_writer, args=(str(db_path), workout_id, sets, start_event, results))
+        for workout_id in workout_ids
+    ]
+    for worker in workers:
+        worker.start()
+    started = time.perf_counter()
+    start_event.set()
+    reports = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+
+    db = Database(db_path, pool_size=1)
+    with db.get_connection() as conn:
+        placeholders = ", ".join("?" for _ in workout_ids)
+        rows_in_db = conn.execute(
+            f"SELECT COUNT(*) FROM history WHERE workout_id IN ({placeholders})", workout_ids
+        ).fetchone()[0]
+    db.close()
+
+    latencies = [value for report in reports for value in report["latencies"]]
+    locks = {key: 0 for key in reports[0]["locks"]}
+    for report in reports:
+        for key, value in report["locks"].items():
+            locks[key] = max(locks[key], value) if key.startswith("max_") else locks[key] + value
+    locks = {key: round(value, 1) for key, value in locks.items()}
+    saved = sum(report["saved"] for report in reports)
+    return {
+        "processes": processes,
+        "saved": saved,
+        "failed": sum(report["failed"] for report in reports),
+        "rows_in_db": rows_in_db,
+        "elapsed": round(elapsed, 2),
+        "sets_per_sec": round(saved / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(_percentile(latencies, 0.50), 1),
+        "latency_p99_ms": round(_percentile(latencies, 0.99), 1),
+        "latency_max_ms": round(max(latencies, default=0.0), 1),
+        "locks": locks,
+        "db_path": str(db_path),
+    }
+
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sets = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    db_path = sys.argv[3] if len(sys.argv) > 3 else None
+
+    report = run_contention(processes, sets, db_path)
+    print(f"Процессов: {report['processes']}, подходов записано: {report['saved']}, "
+          f"не записано (БД занята): {report['failed']}, строк в БД: {report['rows_in_db']}")
+    print(f"Время: {report['elapsed']} с, {report['sets_per_sec']} подходов/с")
+    print(f"Задержка записи: p50 {report['latency_p50_ms']} мс, p99 {report['latency_p99_ms']} мс, "
+          f"макс. {report['latency_max_ms']} мс")
+    print(f"Блокировки: {report['locks']}")
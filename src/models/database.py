@@ -1,130 +1,212 @@
 # src/models/database.py
+import os
 import sqlite3
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-import hashlib
 from contextlib import contextmanager
-# from config import DB_PATH
-# from typing import Optional, Generator
+from typing import Any, Callable
 
-from config import get_logger
+from config import config, get_logger
+from .cache import LRUCache
+from .connection_pool import ConnectionPool
+from .locking import DatabaseBusyError, LockStats, backoff_delay, is_busy_error
+from .migrations import apply_migrations, ensure_indexes, get_schema_version, latest_version
+from .passwords import get_password_hasher
 
 # Получаем логгер для текущего модуля
 logger = get_logger(__name__)
 
 class Database:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, pool_size: int = None, pragma_profile: str = None):
+        """
+        Args:
+            db_path: Путь к файлу БД (по умолчанию config.DB_PATH)
+            pool_size: Размер пула соединений (0 - новое соединение на каждый вызов,
+                       по умолчанию config.DB_POOL_SIZE)
+            pragma_profile: Имя профиля PRAGMA из config.DB_PRAGMA_PROFILES
+                            (по умолчанию config.DB_PRAGMA_PROFILE)
+        """
         logger.debug("Инициализация Database")
-        self.db_path = Path(db_path)
+        self.db_path = Path(db_path if db_path is not None else config.DB_PATH)
+        self.pool_size = config.DB_POOL_SIZE if pool_size is None else pool_size
+        self.pragma_profile = pragma_profile or config.DB_PRAGMA_PROFILE
+        if self.pragma_profile not in config.DB_PRAGMA_PROFILES:
+            raise ValueError(f"Неизвестный профиль PRAGMA: {self.pragma_profile}")
+        self._pragmas = config.DB_PRAGMA_PROFILES[self.pragma_profile]
+        self._local = threading.local()  # соединение, открытое текущим потоком
+        self.cache = LRUCache(config.CACHE_MAX_SIZE, config.CACHE_TTL)  # кэш чтения репозиториев
+        self.lock_stats = LockStats()  # ожидания блокировок записи
+        self._pool = None
+        if self.pool_size > 0:
+            self._pool = ConnectionPool(
+                self._connect,
+                self.pool_size,
+                timeout=config.DB_POOL_TIMEOUT,
+                health_check_interval=config.DB_HEALTH_CHECK_INTERVAL
+            )
         self.init_db()
 
     def init_db(self):
-        """Инициализация базы данных"""
+        """Инициализация базы данных: применение миграций схемы и проверка индексов"""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        # Создание таблиц
         with self.get_connection() as conn:
-            # -- Таблица пользователей
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1,
-                    last_login TIMESTAMP
-                )
-            """)
-            # -- Таблица настроек тренировки
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS exercises (
-                    id                INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id           INTEGER NOT NULL,
-                    name              TEXT NOT NULL,
-                    description       TEXT,
-                    sets              INTEGER DEFAULT 3,    -- количество подходов
-                    reps              INTEGER,  -- целевое количество повторений
-                    rest_time         INTEGER DEFAULT 30,    -- время отдыха между подходами в сек
-                    prepare_time      INTEGER DEFAULT 10,    -- время подготовки в сек
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id)
-                    REFERENCES users (id) ON DELETE CASCADE
-                    -- UNIQUE (user_id, name)
-                    );
-                """)
-            
-            # -- Таблица тренировок
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS workouts (
-                    id         INTEGER   PRIMARY KEY AUTOINCREMENT,
-                    user_id    INTEGER   NOT NULL,
-                    exercise_id INTEGER NOT NULL,
-                    name       TEXT     NOT NULL,                    
-                    work_time  INTEGER,
-                    rest_time  INTEGER,
-                    sets       INTEGER,
-                    reps       INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY ( user_id )
-                    REFERENCES users (id) ON DELETE CASCADE
-                    );
-                """)
-
-            # -- Таблица подходов (основная таблица с данными выполнения)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS history (
-                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                    workout_id  INTEGER NOT NULL,
-                    -- exercise_id INTEGER NOT NULL,
-                    set_number  INTEGER NOT NULL,
-                    reps        INTEGER,
-                    duration    INTEGER,
-                    --rest_time   INTEGER,
-                    --sets        INTEGER,
-                    --notes       TEXT,
-                    FOREIGN KEY (workout_id)
-                    REFERENCES workouts (id) ON DELETE CASCADE
-                    -- FOREIGN KEY (exercise_id)
-                    -- REFERENCES exercises (id),
-                    -- UNIQUE (
-                    --     workout_id,
-                    --     exercise_id,
-                    --     set_number
-                    -- )
-                );
-            """)
-
-            # Таблица сессий (для запоминания входа)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS user_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    session_token TEXT UNIQUE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    expires_at TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
+            self.schema_version = apply_migrations(conn)
+            ensure_indexes(conn)
 
-    @contextmanager
-    def get_connection(self):
-        """Контекстный менеджер для соединения с БД"""
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self) -> sqlite3.Connection:
+        """Создание нового соединения с БД"""
+        # Соединения из пула переходят между потоками (но используются одним потоком за раз)
+        # timeout - время ожидания блокировки внутри SQLite (busy_timeout)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=config.DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=self._pool is None
+        )
         conn.row_factory = sqlite3.Row  # НАСТРОЙКА ФОРМАТА ВОЗВРАЩАЕМЫХ ДАННЫХ
         # Теперь строки можно получать как словари: row['column_name']
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """Применение профиля PRAGMA к соединению"""
+        # journal_mode идет первым: остальные настройки от него не зависят
+        for name, value in self._pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+    @contextmanager
+    def get_connection(self, write: bool = False):
+        """
+        Контекстный менеджер для соединения с БД
+
+        Вложенные вызовы в том же потоке получают уже открытое соединение,
+        поэтому несколько операций репозиториев выполняются в одной транзакции,
+        а фиксация происходит при выходе из внешнего блока with.
 
+        Args:
+            write: Начать транзакцию записи (BEGIN IMMEDIATE), если она еще не начата
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if write and not conn.in_transaction:
+                self.begin_write(conn)
+            yield conn
+            return
+
+        conn = self._pool.acquire() if self._pool else self._connect()
+        self._local.conn = conn
+        self._local.after_transaction = []
         try:
+            if write:
+                self.begin_write(conn)
             yield conn  # Остановка здесь, пока выполняется код в with
-            conn.commit()   # Фиксируем изменения в БД
+            self._commit(conn)   # Фиксируем изменения в БД
         except Exception:
             conn.rollback()     # Отменяем все изменения транзакции
             raise   # Пробрасываем исключение дальше
         finally:
-            conn.close()    # Освобождаем ресурсы
+            callbacks = self._local.after_transaction
+            self._local.conn = None
+            self._local.after_transaction = None
+            if self._pool:
+                self._pool.release(conn)    # Возвращаем соединение в пул
+            else:
+                conn.close()    # Освобождаем ресурсы
+            self._run_after_transaction(callbacks)
+
+    @property
+    def in_transaction(self) -> bool:
+        """Текущий поток выполняет код внутри get_connection"""
+        return getattr(self._local, 'conn', None) is not None
+
+    def after_transaction(self, callback: Callable[[], None]):
+        """
+        Вызов callback после завершения транзакции текущего потока
+
+        Вызывается и после фиксации, и после отката (например, для сброса
+        кэша: до фиксации другие потоки еще читают прежние данные).
+        Вне транзакции callback вызывается сразу.
+        """
+        if not self.in_transaction:
+            callback()
+            return
+        self._local.after_transaction.append(callback)
+
+    @staticmethod
+    def _run_after_transaction(callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Ошибка обработчика завершения транзакции: {e}")
+
+    def begin_write(self, conn: sqlite3.Connection):
+        """
+        Начало транзакции записи BEGIN IMMEDIATE
+
+        Блокировка записи берется сразу: транзакция не завершится ошибкой
+        SQLITE_BUSY на середине при переходе от чтения к записи. Если другой
+        процесс держит блокировку дольше busy_timeout, попытка повторяется
+        с задержкой (config.DB_BUSY_RETRIES раз).
+
+        Raises:
+            DatabaseBusyError: Блокировка не получена после всех повторов
+        """
+        started = time.perf_counter()
+        self._retry_busy(lambda: conn.execute("BEGIN IMMEDIATE"))
+        self.lock_stats.record_acquired((time.perf_counter() - started) * 1000)
+
+    def run_write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Выполнение fn(conn) в транзакции записи с повтором при SQLITE_BUSY
+
+        Повторяется вся транзакция, поэтому fn не должна иметь побочных
+        эффектов вне БД. Внутри внешней транзакции повтор невозможен
+        (ее часть уже выполнена), и ошибка передается вызывающему коду.
+        """
+        def transaction():
+            with self.get_connection(write=True) as conn:
+                return fn(conn)
+
+        if getattr(self._local, 'conn', None) is not None:
+            return transaction()
+        return self._retry_busy(transaction)
+
+    def _commit(self, conn: sqlite3.Connection):
+        """Фиксация с повтором: при SQLITE_BUSY транзакция остается открытой"""
+        self._retry_busy(conn.commit)
+
+    def _retry_busy(self, operation: Callable[[], Any]) -> Any:
+        """
+        Повтор операции при SQLITE_BUSY с экспоненциальной задержкой
+
+        DatabaseBusyError вложенной операции не повторяется: ее повторы уже исчерпаны.
+        """
+        attempt = 0
+        while True:
+            try:
+                return operation()
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                attempt += 1
+                if attempt > config.DB_BUSY_RETRIES:
+                    self.lock_stats.record_busy(retried=False)
+                    logger.warning(f"БД занята, попыток: {attempt}")
+                    raise DatabaseBusyError() from e
+                self.lock_stats.record_busy(retried=True)
+                time.sleep(backoff_delay(attempt, config.DB_BUSY_BACKOFF_BASE, config.DB_BUSY_BACKOFF_MAX))
+
+    def close(self):
+        """Закрытие пула соединений (при завершении приложения)"""
+        if self._pool:
+            self._pool.close()
 
     @staticmethod
     def hash_password(password: str) -> str:
-        """Хеширование пароля"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Хеширование пароля (scrypt с солью, см. models.passwords)"""
+        return get_password_hasher().hash(password)
 
     def get_database_info(self) -> dict:
         """Получение информации о базе данных"""
@@ -152,44 +234,140 @@ class Database:
                     "exists": self.db_path.exists(),
                     "table_counts": counts,
                     "sqlite_version": sqlite_version,
+                    "schema_version": self.schema_version,
+                    "pragma_profile": self.pragma_profile,
+                    "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+                    "cache": self.cache.stats(),
+                    "locks": self.lock_stats.to_dict(),
                     "config_source": "custom" if hasattr(self, '_custom_path') else "default"
                 }
         except Exception as e:
             logger.error(f"Error getting database info: {e}")
             return {"error": str(e)}
-        
-
-# # Функция для удобного создания экземпляра Database
-# def create_database(db_path: Optional[str] = None) -> Database:
-#     """
-#     Создание экземпляра Database
-    
-#     Args:
-#         db_path: Путь к базе данных (опционально)
-        
-#     Returns:
-#         Экземпляр Database
-#     """
-#     return Database(db_path)
-
-
-# # Глобальный экземпляр для использования во всем приложении
-# # (опционально, можно создавать экземпляры по мере необходимости)
-# _database_instance = None
-
-# def get_database(db_path: Optional[str] = None) -> Database:
-#     """
-#     Получение глобального экземпляра Database (синглтон)
-    
-#     Args:
-#         db_path: Путь к базе данных (только для первого вызова)
-        
-#     Returns:
-#         Экземпляр Database
-#     """
-#     global _database_instance
-    
-#     if _database_instance is None:
-#         _database_instance = create_database(db_path)
-    
-#     return _database_instance
\ No newline at end of file
+
+    def backup_to(self, path=None, progress: Callable[[int, int], None] = None,
+                  pages: int = None) -> Path:
+        """
+        Онлайн-копия БД через SQLite backup API
+
+        Копия читается внутри одной транзакции чтения, поэтому в режиме WAL
+        она соответствует одному моменту времени, даже если другие соединения
+        продолжают запись, и не перезапускается из-за изменений. Страницы
+        копируются пакетами, между ними вызывается progress. Копия пишется во
+        временный файл и переименовывается только после завершения.
+
+        Args:
+            path: Файл копии (по умолчанию DB_BACKUP_DIR/<имя>_<время>.db)
+            progress: Функция (скопировано_страниц, всего_страниц)
+            pages: Страниц за один шаг (по умолчанию config.DB_BACKUP_PAGES)
+
+        Returns:
+            Путь к созданной копии
+        """
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = config.DB_BACKUP_DIR / f"{self.db_path.stem}_{timestamp}{self.db_path.suffix}"
+        path = Path(path)
+        if path.resolve() == self.db_path.resolve():
+            raise ValueError("Файл копии совпадает с файлом базы данных")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+
+        def on_progress(status, remaining, total):
+            if progress is not None:
+                progress(total - remaining, total)
+
+        # Отдельное соединение: копирование не занимает соединения пула
+        source = self._connect()
+        target = sqlite3.connect(tmp_path)
+        try:
+            # Открытая транзакция чтения фиксирует снимок на все время копирования
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            source.backup(target, pages=pages or config.DB_BACKUP_PAGES, progress=on_progress)
+            source.rollback()
+            # Копия не зависит от журнала WAL исходной БД
+            target.execute("PRAGMA journal_mode = DELETE")
+        except Exception:
+            target.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            source.close()
+        target.close()
+
+        os.replace(tmp_path, path)
+        logger.info(f"Создана резервная копия БД: {path}")
+        return path
+
+    def restore_from(self, path, progress: Callable[[int, int], None] = None) -> int:
+        """
+        Восстановление БД из копии без перезапуска приложения
+
+        Копия проверяется (quick_check, версия схемы), затем копируется в
+        рабочую БД одним шагом backup API: другие соединения видят либо
+        старые, либо новые данные целиком. После восстановления применяются
+        недостающие миграции и сбрасывается кэш чтения.
+
+        Args:
+            path: Файл резервной копии
+            progress: Функция (скопировано_страниц, всего_страниц)
+
+        Returns:
+            Версия схемы восстановленной БД
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Файл резервной копии не найден: {path}")
+
+        source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            check = source.execute("PRAGMA quick_check").fetchone()[0]
+            if check != "ok":
+                raise ValueError(f"Резервная копия повреждена: {check}")
+            version = get_schema_version(source)
+            if version > latest_version():
+                raise ValueError(
+                    f"Резервная копия создана более новой версией приложения (схема {version})"
+                )
+
+            def on_progress(status, remaining, total):
+                if progress is not None:
+                    progress(total - remaining, total)
+
+            with self.get_connection() as conn:
+                if conn.in_transaction:
+                    conn.commit()
+                source.backup(conn, pages=-1, progress=on_progress)
+                self.schema_version = apply_migrations(conn)
+                ensure_indexes(conn)
+        finally:
+            source.close()
+
+        self.cache.clear()
+        logger.info(f"База данных восстановлена из копии: {path}")
+        return self.schema_version
+
+
+# Глобальный экземпляр для использования во всем приложении
+_database_instance = None
+_database_lock = threading.Lock()
+
+
+def get_database(db_path=None) -> Database:
+    """
+    Получение глобального экземпляра Database (синглтон)
+
+    Args:
+        db_path: Путь к базе данных (только для первого вызова)
+
+    Returns:
+        Экземпляр Database
+    """
+    global _database_instance
+
+    with _database_lock:
+        if _database_instance is None:
+            _database_instance = Database(db_path)
+        return _database_instance
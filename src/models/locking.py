@@ -0,0 +1,87 @@
+# src/models/locking.py
+"""
+Обработка блокировок SQLite при нескольких процессах-писателях
+
+SQLite допускает одного писателя: остальные получают SQLITE_BUSY после
+ожидания busy_timeout. Транзакции записи начинаются с BEGIN IMMEDIATE
+(блокировка берется сразу, а не при первой записи), а при SQLITE_BUSY
+попытка повторяется с экспоненциальной задержкой со случайным разбросом,
+чтобы процессы не повторяли попытки одновременно.
+"""
+import random
+import sqlite3
+import threading
+from typing import Any, Dict
+
+# Коды ошибок SQLite
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+class DatabaseBusyError(sqlite3.OperationalError):
+    """БД занята другим писателем дольше допустимого (все повторы исчерпаны)"""
+
+    def __init__(self, message: str = None):
+        super().__init__(message or
+                         "База данных занята другим экземпляром приложения. Повторите попытку позже.")
+
+
+def is_busy_error(error: Exception) -> bool:
+    """Ошибка вызвана блокировкой БД (SQLITE_BUSY/SQLITE_LOCKED)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message or "table is locked" in message
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Задержка перед повтором attempt (с 1): случайная в [0, min(maximum, base * 2^attempt)]"""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class LockStats:
+    """Счетчики ожидания блокировок записи (для диагностики)"""
+
+    # Получение блокировки дольше порога считается ожиданием
+    WAIT_THRESHOLD_MS = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.write_transactions = 0
+        self.lock_waits = 0
+        self.lock_wait_ms = 0.0
+        self.max_lock_wait_ms = 0.0
+        self.busy_errors = 0
+        self.retries = 0
+        self.failures = 0
+
+    def record_acquired(self, wait_ms: float):
+        with self._lock:
+            self.write_transactions += 1
+            if wait_ms >= self.WAIT_THRESHOLD_MS:
+                self.lock_waits += 1
+                self.lock_wait_ms += wait_ms
+            self.max_lock_wait_ms = max(self.max_lock_wait_ms, wait_ms)
+
+    def record_busy(self, retried: bool):
+        with self._lock:
+            self.busy_errors += 1
+            if retried:
+                self.retries += 1
+            else:
+                self.failures += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "write_transactions": self.write_transactions,
+                "lock_waits": self.lock_waits,
+                "lock_wait_ms": round(self.lock_wait_ms, 1),
+                "max_lock_wait_ms": round(self.max_lock_wait_ms, 1),
+                "busy_errors": self.busy_errors,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
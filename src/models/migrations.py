@@ -0,0 +1,424 @@
+# src/models/migrations.py
+import re
+import sqlite3
+from typing import Dict, List
+
+from config import get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+# Список миграций схемы: (версия, описание, шаги)
+# Шаг - SQL-строка или функция, принимающая соединение.
+# Текущая версия схемы хранится в PRAGMA user_version.
+# Новые миграции добавляются только в конец списка, существующие не изменяются.
+MIGRATIONS = [
+    (1, "Базовая схема", [
+        # -- Таблица пользователей
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1,
+            last_login TIMESTAMP
+        )
+        """,
+        # -- Таблица настроек тренировки
+        """
+        CREATE TABLE IF NOT EXISTS exercises (
+            id                INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id           INTEGER NOT NULL,
+            name              TEXT NOT NULL,
+            description       TEXT,
+            sets              INTEGER DEFAULT 3,    -- количество подходов
+            reps              INTEGER,  -- целевое количество повторений
+            rest_time         INTEGER DEFAULT 30,    -- время отдыха между подходами в сек
+            prepare_time      INTEGER DEFAULT 10,    -- время подготовки в сек
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id)
+            REFERENCES users (id) ON DELETE CASCADE
+        )
+        """,
+        # -- Таблица тренировок
+        """
+        CREATE TABLE IF NOT EXISTS workouts (
+            id         INTEGER   PRIMARY KEY AUTOINCREMENT,
+            user_id    INTEGER   NOT NULL,
+            exercise_id INTEGER NOT NULL,
+            name       TEXT     NOT NULL,
+            work_time  INTEGER,
+            rest_time  INTEGER,
+            sets       INTEGER,
+            reps       INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY ( user_id )
+            REFERENCES users (id) ON DELETE CASCADE
+        )
+        """,
+        # -- Таблица подходов (основная таблица с данными выполнения)
+        """
+        CREATE TABLE IF NOT EXISTS history (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            workout_id  INTEGER NOT NULL,
+            set_number  INTEGER NOT NULL,
+            reps        INTEGER,
+            duration    INTEGER,
+            FOREIGN KEY (workout_id)
+            REFERENCES workouts (id) ON DELETE CASCADE
+        )
+        """,
+        # Таблица сессий (для запоминания входа)
+        """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            session_token TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+    ]),
+    (2, "Индексы для запросов тренировок, истории и упражнений", [
+        # WorkoutRepository.get_user_workouts / get_user_stats
+        "CREATE INDEX IF NOT EXISTS idx_workouts_user_created ON workouts (user_id, created_at)",
+        # WorkoutRepository.get_last_workout_id
+        "CREATE INDEX IF NOT EXISTS idx_workouts_exercise_created ON workouts (exercise_id, created_at)",
+        # WorkoutHistoryRepository.get_data_by_workout_id (и каскадное удаление)
+        "CREATE INDEX IF NOT EXISTS idx_history_workout ON history (workout_id, set_number)",
+        # ExerciseRepository.get_user_exercises
+        "CREATE INDEX IF NOT EXISTS idx_exercises_user_created ON exercises (user_id, created_at)",
+        # SessionRepository.delete_user_sessions / create_session
+        "CREATE INDEX IF NOT EXISTS idx_sessions_user ON user_sessions (user_id)",
+    ]),
+    (3, "Сводная статистика пользователей, поддерживаемая триггерами", [
+        # Итоги по пользователю
+        """
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id        INTEGER PRIMARY KEY,
+            total_workouts INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            total_reps     INTEGER NOT NULL DEFAULT 0,
+            total_sets     INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        # Итоги по упражнениям пользователя
+        """
+        CREATE TABLE IF NOT EXISTS user_exercise_stats (
+            user_id        INTEGER NOT NULL,
+            exercise_id    INTEGER NOT NULL,
+            total_workouts INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            total_reps     INTEGER NOT NULL DEFAULT 0,
+            total_sets     INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, exercise_id)
+        )
+        """,
+        # Итоги по неделям ('week', 'ГГГГ-НН') и месяцам ('month', 'ГГГГ-ММ')
+        """
+        CREATE TABLE IF NOT EXISTS user_period_stats (
+            user_id        INTEGER NOT NULL,
+            period         TEXT    NOT NULL,
+            bucket         TEXT    NOT NULL,
+            total_workouts INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            total_reps     INTEGER NOT NULL DEFAULT 0,
+            total_sets     INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, period, bucket)
+        )
+        """,
+        lambda conn: _create_user_stats_triggers(conn),
+        lambda conn: _backfill_user_stats(conn),
+    ]),
+    (4, "Полнотекстовый индекс упражнений (FTS5)", [
+        lambda conn: _create_exercises_fts(conn),
+    ]),
+    (5, "Индекс последних тренировок пользователя по упражнению", [
+        # WorkoutRepository.get_last_workout_with_sets / get_recent_workouts_with_sets
+        "CREATE INDEX IF NOT EXISTS idx_workouts_user_exercise_created ON workouts (user_id, exercise_id, created_at)",
+    ]),
+    (6, "Время сессий в секундах эпохи (UTC)", [
+        """
+        CREATE TABLE user_sessions_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            session_token TEXT UNIQUE NOT NULL,
+            created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            expires_at INTEGER,  -- секунды эпохи UTC, NULL - без срока действия
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        # Нераспознанный срок действия считается истекшим
+        """
+        INSERT INTO user_sessions_new (id, user_id, session_token, created_at, expires_at)
+        SELECT id, user_id, session_token,
+               COALESCE(CAST(strftime('%s', created_at) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER)),
+               CASE WHEN expires_at IS NULL THEN NULL
+                    ELSE COALESCE(CAST(strftime('%s', expires_at) AS INTEGER), 0) END
+        FROM user_sessions
+        """,
+        "DROP TABLE user_sessions",
+        "ALTER TABLE user_sessions_new RENAME TO user_sessions",
+        # SessionRepository.delete_user_sessions / create_session
+        "CREATE INDEX IF NOT EXISTS idx_sessions_user ON user_sessions (user_id)",
+        # SessionRepository.sweep_expired
+        "CREATE INDEX IF NOT EXISTS idx_sessions_expires ON user_sessions (expires_at)",
+    ]),
+]
+
+
+# Таблицы сводной статистики: (таблица, ключевые столбцы, выражения ключа от строки workouts)
+# Выражения используют префикс строки ({row}.), который подставляется как NEW/OLD или w.
+_USER_STATS_TARGETS = [
+    ("user_stats", ("user_id",), ("{row}.user_id",)),
+    ("user_exercise_stats", ("user_id", "exercise_id"), ("{row}.user_id", "{row}.exercise_id")),
+    ("user_period_stats", ("user_id", "period", "bucket"),
+     ("{row}.user_id", "'week'", "strftime('%Y-%W', {row}.created_at)")),
+    ("user_period_stats", ("user_id", "period", "bucket"),
+     ("{row}.user_id", "'month'", "strftime('%Y-%m', {row}.created_at)")),
+]
+
+
+def _stats_add_sql(table: str, key_columns: tuple, key_exprs: tuple, row: str) -> str:
+    """UPSERT: добавление тренировки строки row к итогам"""
+    keys = ", ".join(key_columns)
+    values = ", ".join(expr.format(row=row) for expr in key_exprs)
+    return f"""
+        INSERT INTO {table} ({keys}, total_workouts, total_duration, total_reps, total_sets)
+        VALUES ({values}, 1, COALESCE({row}.work_time, 0), COALESCE({row}.reps, 0), COALESCE({row}.sets, 0))
+        ON CONFLICT ({keys}) DO UPDATE SET
+            total_workouts = total_workouts + 1,
+            total_duration = total_duration + excluded.total_duration,
+            total_reps = total_reps + excluded.total_reps,
+            total_sets = total_sets + excluded.total_sets;
+    """
+
+
+def _stats_subtract_sql(table: str, key_columns: tuple, key_exprs: tuple, row: str) -> str:
+    """Вычитание тренировки строки row из итогов (строка итогов только обновляется)"""
+    condition = " AND ".join(
+        f"{column} = {expr.format(row=row)}" for column, expr in zip(key_columns, key_exprs)
+    )
+    return f"""
+        UPDATE {table} SET
+            total_workouts = total_workouts - 1,
+            total_duration = total_duration - COALESCE({row}.work_time, 0),
+            total_reps = total_reps - COALESCE({row}.reps, 0),
+            total_sets = total_sets - COALESCE({row}.sets, 0)
+        WHERE {condition};
+    """
+
+
+def _create_user_stats_triggers(conn: sqlite3.Connection):
+    """Триггеры на workouts, поддерживающие сводную статистику"""
+    add_new = "".join(_stats_add_sql(*target, "NEW") for target in _USER_STATS_TARGETS)
+    subtract_old = "".join(_stats_subtract_sql(*target, "OLD") for target in _USER_STATS_TARGETS)
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_workouts_stats_insert AFTER INSERT ON workouts
+        BEGIN {add_new} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_workouts_stats_update
+        AFTER UPDATE OF user_id, exercise_id, work_time, reps, sets, created_at ON workouts
+        BEGIN {subtract_old} {add_new} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_workouts_stats_delete AFTER DELETE ON workouts
+        BEGIN {subtract_old} END
+    """)
+    # Строки статистики не ссылаются на users внешним ключом, поэтому удаляются триггером
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_users_stats_delete AFTER DELETE ON users
+        BEGIN
+            DELETE FROM user_stats WHERE user_id = OLD.id;
+            DELETE FROM user_exercise_stats WHERE user_id = OLD.id;
+            DELETE FROM user_period_stats WHERE user_id = OLD.id;
+        END
+    """)
+
+
+def _backfill_user_stats(conn: sqlite3.Connection):
+    """Заполнение сводной статистики по существующим тренировкам"""
+    for table, key_columns, key_exprs in _USER_STATS_TARGETS:
+        keys = ", ".join(key_columns)
+        exprs = ", ".join(expr.format(row="w") for expr in key_exprs)
+        conn.execute(f"""
+            INSERT INTO {table} ({keys}, total_workouts, total_duration, total_reps, total_sets)
+            SELECT {exprs}, COUNT(*), COALESCE(SUM(w.work_time), 0),
+                   COALESCE(SUM(w.reps), 0), COALESCE(SUM(w.sets), 0)
+            FROM workouts w
+            GROUP BY {exprs}
+        """)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Текущая версия схемы БД"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version() -> int:
+    """Версия схемы после применения всех миграций"""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Применение недостающих миграций
+
+    Каждая миграция выполняется в отдельной транзакции вместе с обновлением
+    user_version, поэтому при ошибке схема остается в предыдущей версии.
+
+    Args:
+        conn: Соединение с БД (без открытой транзакции)
+
+    Returns:
+        Версия схемы после применения миграций
+    """
+    if conn.in_transaction:
+        conn.commit()
+
+    version = get_schema_version(conn)
+    for migration_version, description, steps in MIGRATIONS:
+        if migration_version <= version:
+            continue
+
+        # BEGIN IMMEDIATE - блокируем запись, чтобы другой процесс не применил ту же миграцию
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= migration_version:
+                conn.rollback()
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {int(migration_version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Ошибка миграции {migration_version} ({description})")
+            raise
+
+        version = migration_version
+        logger.info(f"Применена миграция схемы {migration_version}: {description}")
+
+    return version
+
+
+_CREATE_INDEX = re.compile(r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+_DROP_INDEX = re.compile(r"^\s*DROP\s+INDEX\s+(?:IF\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+
+
+def expected_indexes() -> Dict[str, str]:
+    """Индексы, которые создают миграции: имя -> DDL последней создавшей его миграции"""
+    indexes = {}
+    for _, _, steps in MIGRATIONS:
+        for step in steps:
+            if callable(step):
+                continue
+            created = _CREATE_INDEX.match(step)
+            if created:
+                indexes[created.group(1)] = step
+                continue
+            dropped = _DROP_INDEX.match(step)
+            if dropped:
+                indexes.pop(dropped.group(1), None)
+    return indexes
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> List[str]:
+    """
+    Создание индексов схемы, которых нет в БД
+
+    user_version не отражает индексы, удаленные после миграции (например,
+    прерванной операцией обслуживания), поэтому при запуске недостающие
+    индексы создаются заново по DDL миграций. Так же создается индекс FTS5
+    упражнений, если миграция 4 прошла на сборке SQLite без FTS5, а текущая
+    сборка его поддерживает.
+
+    Args:
+        conn: Соединение с БД (без открытой транзакции)
+
+    Returns:
+        Имена созданных индексов
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'table')")}
+    missing = {name: sql for name, sql in expected_indexes().items() if name not in existing}
+    if "exercises_fts" not in existing and fts5_available(conn):
+        missing["exercises_fts"] = _create_exercises_fts
+    if not missing:
+        return []
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for step in missing.values():
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.warning(f"Восстановлены отсутствовавшие индексы: {', '.join(missing)}")
+    return list(missing)
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Поддерживает ли сборка SQLite модуль FTS5"""
+    options = {row[0] for row in conn.execute("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def _create_exercises_fts(conn: sqlite3.Connection):
+    """
+    Индекс FTS5 по exercises(name, description) с синхронизацией триггерами
+
+    Без FTS5 миграция ничего не создает, поиск работает через LIKE.
+    """
+    if not fts5_available(conn):
+        logger.warning("SQLite собран без FTS5, поиск упражнений будет работать без индекса")
+        return
+
+    # Внешнее содержимое: текст хранится только в exercises, индекс - в exercises_fts.
+    # prefix - дополнительные индексы префиксов для быстрого поиска по началу слова
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS exercises_fts USING fts5(
+            name, description,
+            content='exercises', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='1 2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_exercises_fts_insert AFTER INSERT ON exercises
+        BEGIN
+            INSERT INTO exercises_fts (rowid, name, description)
+            VALUES (NEW.id, NEW.name, NEW.description);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_exercises_fts_delete AFTER DELETE ON exercises
+        BEGIN
+            INSERT INTO exercises_fts (exercises_fts, rowid, name, description)
+            VALUES ('delete', OLD.id, OLD.name, OLD.description);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_exercises_fts_update AFTER UPDATE OF name, description ON exercises
+        BEGIN
+            INSERT INTO exercises_fts (exercises_fts, rowid, name, description)
+            VALUES ('delete', OLD.id, OLD.name, OLD.description);
+            INSERT INTO exercises_fts (rowid, name, description)
+            VALUES (NEW.id, NEW.name, NEW.description);
+        END
+    """)
+    # Индексируем уже существующие упражнения
+    conn.execute("INSERT INTO exercises_fts (exercises_fts) VALUES ('rebuild')")
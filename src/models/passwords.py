@@ -0,0 +1,155 @@
+# src/models/passwords.py
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Optional
+
+from config import config, get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+SCRYPT_PREFIX = "scrypt"
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _is_legacy_sha256(password_hash: str) -> bool:
+    """Хеш старого формата: SHA-256 без соли (64 шестнадцатеричных символа)"""
+    if len(password_hash) != 64:
+        return False
+    try:
+        bytes.fromhex(password_hash)
+    except ValueError:
+        return False
+    return True
+
+
+class PasswordHasher:
+    """
+    Хеширование паролей через scrypt с солью пользователя
+
+    Хеш хранится в формате 'scrypt$n$r$p$соль$ключ' (base64 без '='),
+    поэтому параметры стоимости можно менять: старые хеши проверяются
+    со своими параметрами, а needs_rehash() сообщает, что хеш пора обновить.
+    Проверяются и хеши старого формата (SHA-256 без соли).
+    """
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1,
+                 salt_size: int = 16, key_size: int = 32):
+        """
+        Args:
+            n: Стоимость по CPU/памяти (степень двойки)
+            r: Размер блока
+            p: Параллелизм
+            salt_size: Длина соли в байтах
+            key_size: Длина ключа в байтах
+        """
+        if n < 2 or n & (n - 1):
+            raise ValueError("Параметр n должен быть степенью двойки")
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+        self.key_size = key_size
+
+    def hash(self, password: str) -> str:
+        """Хеш пароля с новой случайной солью"""
+        salt = secrets.token_bytes(self.salt_size)
+        key = self._derive(password, salt, self.n, self.r, self.p, self.key_size)
+        return f"{SCRYPT_PREFIX}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        """Проверка пароля (сравнение за постоянное время)"""
+        if not password_hash:
+            return False
+        if _is_legacy_sha256(password_hash):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, password_hash.lower())
+
+        try:
+            prefix, n, r, p, salt, key = password_hash.split("$")
+            if prefix != SCRYPT_PREFIX:
+                return False
+            expected = _b64decode(key)
+            actual = self._derive(password, _b64decode(salt), int(n), int(r), int(p), len(expected))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Некорректный формат хеша пароля: {e}")
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, password_hash: Optional[str]) -> bool:
+        """Нужно ли пересчитать хеш (старый формат или другие параметры стоимости)"""
+        if not password_hash or _is_legacy_sha256(password_hash):
+            return True
+        parts = password_hash.split("$")
+        if len(parts) != 6 or parts[0] != SCRYPT_PREFIX:
+            return True
+        return parts[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int, key_size: int) -> bytes:
+        # scrypt требует около 128 * n * r байт памяти; запас - на параллелизм
+        maxmem = 128 * n * r * (p + 1) + 1024 * 1024
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                              maxmem=maxmem, dklen=key_size)
+
+
+def calibrate(target_ms: float = 250, r: int = 8, p: int = 1,
+              min_n: int = 2 ** 12, max_n: int = 2 ** 20) -> dict:
+    """
+    Подбор параметра n под целевое время хеширования на этом компьютере
+
+    n удваивается, пока время одного хеша меньше target_ms; выбирается
+    наибольшее n, не превышающее цель (но не меньше min_n).
+
+    Returns:
+        Dict: n, r, p, elapsed_ms (время хеша с выбранным n), measurements {n: мс}
+    """
+    measurements = {}
+    chosen = min_n
+    n = min_n
+    while n <= max_n:
+        start = time.perf_counter()
+        PasswordHasher(n, r, p).hash("calibration")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        measurements[n] = round(elapsed_ms, 1)
+        if elapsed_ms > target_ms:
+            break
+        chosen = n
+        n *= 2
+    return {"n": chosen, "r": r, "p": p, "elapsed_ms": measurements[chosen], "measurements": measurements}
+
+
+_default_hasher = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Хешер с параметрами из конфигурации (PASSWORD_SCRYPT_N/R/P)"""
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = PasswordHasher(
+            config.PASSWORD_SCRYPT_N, config.PASSWORD_SCRYPT_R, config.PASSWORD_SCRYPT_P
+        )
+    return _default_hasher
+
+
+if __name__ == "__main__":
+    # Подбор стоимости хеширования из корня проекта:
+    #   PYTHONPATH=src python -m models.passwords [целевое время, мс]
+    import sys
+
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    result = calibrate(target)
+    for cost, elapsed in result["measurements"].items():
+        print(f"n = {cost:>8}: {elapsed:8.1f} мс")
+    print(f"Рекомендуемое значение PASSWORD_SCRYPT_N = {result['n']} "
+          f"({result['elapsed_ms']} мс при цели {target:g} мс)")
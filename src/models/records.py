@@ -0,0 +1,154 @@
+# src/models/records.py
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+
+def _compile_row_factory(cls) -> staticmethod:
+    """
+    row_factory класса записи с присваиванием полей одной распаковкой строки
+
+    Код генерируется по __slots__ (как в collections.namedtuple): цикл
+    setattr по полям на каждую строку делал загрузку записей медленнее,
+    чем dict(row).
+    """
+    fields = ", ".join(f"record.{name}" for name in cls.__slots__)
+    source = (
+        "def row_factory(cursor, row):\n"
+        "    record = new(cls)\n"
+        f"    {fields}, = row\n"
+        "    return record\n"
+    )
+    namespace = {"new": object.__new__, "cls": cls}
+    exec(source, namespace)
+    return staticmethod(namespace["row_factory"])
+
+
+class Record:
+    """
+    Легкая запись строки таблицы на основе __slots__
+
+    Занимает меньше памяти, чем dict, и создается быстрее. Поддерживает
+    обращение как к словарю (record['name'], record.get('name'), dict(record)),
+    поэтому представления работают с записями так же, как со словарями.
+    Поля перечисляются в __slots__ в порядке столбцов таблицы.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values, **fields):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name in self.__slots__[len(values):]:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def matches(cls, columns: Sequence[str]) -> bool:
+        """Совпадают ли столбцы результата запроса с полями записи"""
+        return tuple(columns) == cls.__slots__
+
+    @classmethod
+    def row_factory(cls, cursor, row: tuple) -> "Record":
+        """row_factory для курсора sqlite3 (столбцы должны совпадать с полями)"""
+        record = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, row):
+            setattr(record, name, value)
+        return record
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.__slots__:
+            cls.row_factory = _compile_row_factory(cls)
+
+    # ========== ДОСТУП КАК К СЛОВАРЮ ==========
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def values(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    def items(self) -> list:
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def copy(self) -> "Record":
+        """Независимая копия записи"""
+        return type(self).row_factory(None, self.values())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class UserRecord(Record):
+    """Строка таблицы users"""
+    __slots__ = ('id', 'username', 'email', 'password_hash', 'created_at', 'is_active', 'last_login')
+
+
+class ExerciseRecord(Record):
+    """Строка таблицы exercises"""
+    __slots__ = ('id', 'user_id', 'name', 'description', 'sets', 'reps', 'rest_time',
+                 'prepare_time', 'created_at')
+
+
+class WorkoutRecord(Record):
+    """Строка таблицы workouts"""
+    __slots__ = ('id', 'user_id', 'exercise_id', 'name', 'work_time', 'rest_time', 'sets',
+                 'reps', 'created_at')
+
+
+class HistoryRecord(Record):
+    """Строка таблицы history (результат подхода)"""
+    __slots__ = ('id', 'workout_id', 'set_number', 'reps', 'duration')
+
+
+class SessionRecord(Record):
+    """Строка таблицы user_sessions"""
+    __slots__ = ('id', 'user_id', 'session_token', 'created_at', 'expires_at')
+
+
+# Классы записей по имени таблицы
+RECORD_CLASSES = {
+    'users': UserRecord,
+    'exercises': ExerciseRecord,
+    'workouts': WorkoutRecord,
+    'history': HistoryRecord,
+    'user_sessions': SessionRecord,
+}
+
+
+def record_class_for(table_name: str) -> Optional[type]:
+    """Класс записи для таблицы (None, если таблица неизвестна)"""
+    return RECORD_CLASSES.get(table_name)
@@ -1,12 +1,22 @@
 # src/models/base_repository.py
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple
+
+from ..records import record_class_for
+from .pagination import BACKWARD, FORWARD, decode_page_token, encode_page_token
 
 class BaseRepository(ABC):
     """Базовый класс для всех репозиториев"""
+
+    # Возвращать строки своей таблицы как записи Record вместо словарей
+    use_records = False
+    # Строк в одной порции iter_select
+    fetch_batch_size = 500
     
-    def __init__(self, db):
+    def __init__(self, db, use_records: bool = None):
         self.db = db
+        if use_records is not None:
+            self.use_records = use_records
     
     @abstractmethod
     def table_name(self) -> str:
@@ -14,29 +24,142 @@ class BaseRepository(ABC):
         pass
 
     def execute_select(self, query: str, params: tuple = ()) -> List[Dict]:
-        """Выполняет SELECT запросы и возвращает список словарей"""
+        """
+        Выполняет SELECT запросы и возвращает список словарей
+
+        В режиме use_records строки, столбцы которых совпадают со столбцами
+        таблицы репозитория, возвращаются как записи Record (доступ как к словарю).
+        """
         with self.db.get_connection() as conn:
             cursor = conn.execute(query, params)
+            record_class = self._record_class_for(cursor)
+            if record_class is not None:
+                cursor.row_factory = record_class.row_factory
+                return cursor.fetchall()
             return [dict(row) for row in cursor.fetchall()]
 
+    def iter_select(self, select: str, where: str, params: tuple, key_columns: Tuple[str, ...],
+                    key_fields: Tuple[str, ...], batch_size: int = None) -> Iterator[Dict]:
+        """
+        Потоковое выполнение SELECT порциями по ключу (keyset)
+
+        Каждая порция - отдельный короткий запрос с условием на ключ последней
+        прочитанной строки, поэтому соединение не удерживается между порциями:
+        генератор можно бросить недочитанным, и запись в БД этого потока не
+        окажется внутри его соединения. Строки идут по возрастанию ключа.
+
+        Args:
+            select: Часть запроса SELECT ... FROM ... (без WHERE)
+            where: Условие отбора записей (без ключа)
+            params: Параметры условия отбора
+            key_columns: Выражения уникального ключа в SQL, например ("w.created_at", "w.id", "h.id")
+            key_fields: Имена полей ключа в строке результата
+            batch_size: Строк в порции (по умолчанию fetch_batch_size)
+        """
+        batch_size = batch_size or self.fetch_batch_size
+        key_sql = f"({', '.join(key_columns)})"
+        order = ", ".join(key_columns)
+        key = None
+        while True:
+            conditions = [where]
+            query_params = list(params)
+            if key is not None:
+                conditions.append(f"{key_sql} > ({', '.join('?' * len(key))})")
+                query_params.extend(key)
+            query = f"""
+                {select}
+                WHERE {" AND ".join(f"({condition})" for condition in conditions)}
+                ORDER BY {order}
+                LIMIT ?
+            """
+            rows = self.execute_select(query, tuple(query_params) + (batch_size,))
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            key = tuple(rows[-1][field] for field in key_fields)
+
+    def select_page(self, select: str, where: str, params: tuple, key_columns: Tuple[str, str],
+                    key_fields: Tuple[str, str], limit: int, page_token: str = None) -> Dict:
+        """
+        Страница выборки с постраничным переходом по ключу (keyset pagination)
+
+        Записи отсортированы от новых к старым по ключу (created_at, id).
+        Вместо OFFSET страница начинается с условия на ключ граничной записи,
+        поэтому переход к любой странице - это поиск по индексу.
+
+        Args:
+            select: Часть запроса SELECT ... FROM ... (без WHERE)
+            where: Условие отбора записей (без ключа страницы)
+            params: Параметры условия отбора
+            key_columns: Выражения ключа в SQL, например ("w.created_at", "w.id")
+            key_fields: Имена полей ключа в строке результата
+            limit: Размер страницы
+            page_token: Токен страницы из предыдущего ответа (None - первая страница)
+
+        Returns:
+            Dict: items, next_token (к более старым), prev_token (к более новым)
+        """
+        direction, key = decode_page_token(page_token)
+        key_sql = f"({', '.join(key_columns)})"
+        forward = direction == FORWARD
+        conditions = [where]
+        query_params = list(params)
+        if key is not None:
+            conditions.append(f"{key_sql} {'<' if forward else '>'} (?, ?)")
+            query_params.extend(key)
+
+        order = "DESC" if forward else "ASC"
+        query = f"""
+            {select}
+            WHERE {" AND ".join(f"({condition})" for condition in conditions)}
+            ORDER BY {", ".join(f"{column} {order}" for column in key_columns)}
+            LIMIT ?
+        """
+        # Одна лишняя запись показывает, есть ли следующая страница в этом направлении
+        rows = self.execute_select(query, tuple(query_params) + (limit + 1,))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not forward:
+            rows.reverse()
+
+        def token(direction: str, row) -> str:
+            return encode_page_token(direction, tuple(row[field] for field in key_fields))
+
+        if forward:
+            has_older, has_newer = has_more, key is not None
+        else:
+            has_older, has_newer = True, has_more
+
+        return {
+            "items": rows,
+            "next_token": token(FORWARD, rows[-1]) if rows and has_older else None,
+            "prev_token": token(BACKWARD, rows[0]) if rows and has_newer else None,
+        }
+
+    def _record_class_for(self, cursor):
+        """Класс записи для результата запроса или None, если нужны словари"""
+        if not self.use_records or cursor.description is None:
+            return None
+        record_class = record_class_for(self.table_name())
+        if record_class is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return record_class if record_class.matches(columns) else None
+
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Выполняет INSERT и возвращает ID новой записи"""
-        with self.db.get_connection() as conn:
-            cursor = conn.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
+        return self.db.run_write(lambda conn: conn.execute(query, params).lastrowid)
 
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Выполняет UPDATE и возвращает количество обновленных строк"""
-        with self.db.get_connection() as conn:
-            cursor = conn.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
+        return self.db.run_write(lambda conn: conn.execute(query, params).rowcount)
 
     def execute_delete(self, query: str, params: tuple = ()) -> int:
         """Выполняет DELETE и возвращает количество удаленных строк"""
-        with self.db.get_connection() as conn:
-            cursor = conn.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
-    
+        return self.db.run_write(lambda conn: conn.execute(query, params).rowcount)
+
+    def execute_many(self, query: str, params_seq) -> int:
+        """Выполняет запрос для набора параметров (executemany) и возвращает количество затронутых строк"""
+        # Параметры материализуются: при повторе после SQLITE_BUSY генератор был бы уже исчерпан
+        params_seq = list(params_seq)
+        return self.db.run_write(lambda conn: conn.executemany(query, params_seq).rowcount)
@@ -0,0 +1,169 @@
+# src/models/repositories/cached_repositories.py
+from typing import Dict, List, Optional
+
+from ..records import Record
+from .exercise_repository import ExerciseRepository
+from .history_repository import WorkoutHistoryRepository
+from .workout_repository import WorkoutRepository
+
+
+def copy_result(value):
+    """Копия результата запроса: изменения вызывающего кода не попадают в кэш"""
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, Record):
+        return value.copy()
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    return value
+
+
+class CachedRepositoryMixin:
+    """
+    Чтение через кэш БД (db.cache) для репозиториев
+
+    Ключи записей начинаются с пространства и ID пользователя, методы
+    изменения сбрасывают только связанные с ними записи. Сброс выполняется
+    сразу и повторно после завершения транзакции: пока она не зафиксирована,
+    другой поток может прочитать и закэшировать прежние данные. Изменения
+    в обход репозиториев (другие процессы, ручная правка БД) видны после
+    истечения времени жизни записей (config.CACHE_TTL).
+    """
+
+    def _cached(self, key: tuple, loader):
+        return self.db.cache.get_or_load(key, loader, copy_result)
+
+    def _after_write(self, invalidate):
+        """Сброс записей кэша сейчас и после завершения транзакции записи"""
+        invalidate()
+        if self.db.in_transaction:
+            self.db.after_transaction(invalidate)
+
+    def _invalidate(self, *keys: tuple):
+        self._after_write(lambda: self.db.cache.invalidate(*keys))
+
+    def _invalidate_prefix(self, *prefix):
+        self._after_write(lambda: self.db.cache.invalidate_prefix(*prefix))
+
+    def _invalidate_history(self, workout_ids):
+        """Сброс подходов тренировок (ключ содержит владельца, который здесь неизвестен)"""
+        workout_ids = frozenset(workout_ids)
+        self._after_write(lambda: self.db.cache.invalidate_if(
+            lambda key: key[0] == "history" and key[2] in workout_ids
+        ))
+
+    def _invalidate_last_workouts(self, user_id: int = None):
+        """Сброс последних тренировок с подходами (пользователя или всех)"""
+        scope = (user_id,) if user_id is not None else ()
+        self._invalidate_prefix("last_workout", *scope)
+        self._invalidate_prefix("recent_workouts", *scope)
+
+
+class CachedExerciseRepository(CachedRepositoryMixin, ExerciseRepository):
+    """Репозиторий упражнений с кэшированием списка и карточек упражнений"""
+
+    def create(self, user_id: int, *args, **kwargs) -> int:
+        exercise_id = super().create(user_id, *args, **kwargs)
+        self._invalidate(("exercises", user_id))
+        return exercise_id
+
+    def update(self, exercise_id: int, user_id: int, *args, **kwargs) -> bool:
+        result = super().update(exercise_id, user_id, *args, **kwargs)
+        self._invalidate(("exercise", user_id, exercise_id), ("exercises", user_id))
+        return result
+
+    def delete(self, exercise_id: int, user_id: int) -> bool:
+        result = super().delete(exercise_id, user_id)
+        self._invalidate(("exercise", user_id, exercise_id), ("exercises", user_id))
+        return result
+
+    def get_user_exercises(self, user_id: int) -> List[dict]:
+        return self._cached(("exercises", user_id), lambda: super(CachedExerciseRepository, self).get_user_exercises(user_id))
+
+    def get_by_id(self, exercise_id: int, user_id: int = None) -> Optional[dict]:
+        # Без владельца ключ записи не определен - запрос идет в БД
+        if not user_id:
+            return super().get_by_id(exercise_id)
+        return self._cached(("exercise", user_id, exercise_id),
+                            lambda: super(CachedExerciseRepository, self).get_by_id(exercise_id, user_id))
+
+
+class CachedWorkoutRepository(CachedRepositoryMixin, WorkoutRepository):
+    """Репозиторий тренировок с кэшированием тренировок и последних тренировок упражнений"""
+
+    def create(self, user_id: int, *args, **kwargs) -> int:
+        workout_id = super().create(user_id, *args, **kwargs)
+        self._invalidate(("workouts", user_id))
+        self._invalidate_last_workouts(user_id)
+        return workout_id
+
+    def update(self, workout_id: int, user_id: int, *args, **kwargs) -> bool:
+        result = super().update(workout_id, user_id, *args, **kwargs)
+        self._invalidate(("workout", user_id, workout_id), ("workouts", user_id))
+        self._invalidate_last_workouts(user_id)
+        return result
+
+    def delete(self, workout_id: int, user_id: int) -> bool:
+        result = super().delete(workout_id, user_id)
+        # Подходы удаляются каскадно
+        self._invalidate(("workout", user_id, workout_id), ("workouts", user_id),
+                         ("history", user_id, workout_id))
+        self._invalidate_last_workouts(user_id)
+        return result
+
+    def recalculate_totals(self, workout_ids: List[int]) -> int:
+        result = super().recalculate_totals(workout_ids)
+        # Владельцы тренировок неизвестны (восстановление при запуске)
+        self._invalidate_prefix("workout")
+        self._invalidate_prefix("workouts")
+        self._invalidate_last_workouts()
+        return result
+
+    def get_user_workouts(self, user_id: int) -> List[dict]:
+        return self._cached(("workouts", user_id), lambda: super(CachedWorkoutRepository, self).get_user_workouts(user_id))
+
+    def get_by_id(self, workout_id: int, user_id: int = None) -> Optional[dict]:
+        if not user_id:
+            return super().get_by_id(workout_id)
+        return self._cached(("workout", user_id, workout_id),
+                            lambda: super(CachedWorkoutRepository, self).get_by_id(workout_id, user_id))
+
+    def get_last_workout_with_sets(self, user_id: int, exercise_id: int) -> Optional[dict]:
+        return self._cached(("last_workout", user_id, exercise_id),
+                            lambda: super(CachedWorkoutRepository, self).get_last_workout_with_sets(user_id, exercise_id))
+
+    def get_recent_workouts_with_sets(self, user_id: int, exercise_id: int = None,
+                                      limit: int = 5) -> Dict[int, List[dict]]:
+        return self._cached(("recent_workouts", user_id, exercise_id, limit),
+                            lambda: super(CachedWorkoutRepository, self).get_recent_workouts_with_sets(
+                                user_id, exercise_id, limit))
+
+
+class CachedWorkoutHistoryRepository(CachedRepositoryMixin, WorkoutHistoryRepository):
+    """Репозиторий истории с кэшированием подходов тренировки"""
+
+    def save_result(self, workout_id: int, set_number: int, reps: int, duration: int) -> int:
+        result = super().save_result(workout_id, set_number, reps, duration)
+        self._invalidate_history([workout_id])
+        self._invalidate_last_workouts()
+        return result
+
+    def save_results(self, results: List[tuple]) -> int:
+        count = super().save_results(results)
+        # Владелец тренировки по подходам неизвестен - последние тренировки сбрасываются у всех
+        self._invalidate_history(row[0] for row in results)
+        self._invalidate_last_workouts()
+        return count
+
+    def restore_results(self, results: List[tuple]) -> int:
+        count = super().restore_results(results)
+        self._invalidate_history(row[0] for row in results)
+        self._invalidate_last_workouts()
+        return count
+
+    def get_data_by_workout_id(self, workout_id: int, user_id: int = None) -> List[dict]:
+        if not user_id:
+            return super().get_data_by_workout_id(workout_id)
+        return self._cached(("history", user_id, workout_id),
+                            lambda: super(CachedWorkoutHistoryRepository, self).get_data_by_workout_id(
+                                workout_id, user_id))
@@ -1,4 +1,6 @@
 # src/models/repositories/exercise_repository.py
+import re
+import sqlite3
 from typing import List, Optional
 from .base_repository import BaseRepository
 
@@ -59,3 +61,62 @@ class ExerciseRepository(BaseRepository):
         return results[0] if results else None
     
 
+    def search(self, user_id: int, query: str, limit: int = 100) -> List[dict]:
+        """
+        Поиск упражнений пользователя по названию и описанию
+
+        Каждое слово запроса ищется как начало слова (префикс). Сначала идут
+        упражнения, у которых все слова найдены в названии, затем - найденные
+        по описанию; внутри группы - от новых к старым. Сортировка по rowid
+        выполняется самим индексом FTS5, поэтому запрос читает только limit
+        совпадений, а не ранжирует все найденные строки.
+        Пустой запрос возвращает все упражнения (без ограничения limit).
+
+        Args:
+            user_id: ID пользователя
+            query: Текст запроса
+            limit: Максимальное количество результатов
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return self.get_user_exercises(user_id)
+
+        # Слова берутся в кавычки, поэтому операторы FTS5 в запросе не интерпретируются
+        match = " AND ".join(f'"{word}"*' for word in words)
+        in_name = f"name : ({match})"
+        sql = f"""
+            SELECT e.* FROM exercises_fts f
+            CROSS JOIN {self.table_name()} e ON e.id = f.rowid
+            WHERE exercises_fts MATCH ? AND e.user_id = ?
+            ORDER BY f.rowid DESC
+            LIMIT ?
+        """
+        results = []
+        try:
+            for tier in (in_name, f"({match}) NOT {in_name}"):
+                results.extend(self.execute_select(sql, (tier, user_id, limit - len(results))))
+                if len(results) >= limit:
+                    break
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            return self._search_like(user_id, words, limit)
+        return results
+
+    def _search_like(self, user_id: int, words: List[str], limit: int) -> List[dict]:
+        """Поиск без FTS5: все слова должны встречаться в названии или описании"""
+        conditions = " AND ".join(
+            "(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')" for _ in words
+        )
+        params = []
+        for word in words:
+            # Слова состоят из \w, из спецсимволов LIKE в них возможен только '_'
+            pattern = "%" + word.replace("_", "\\_") + "%"
+            params.extend((pattern, pattern))
+        sql = f"""
+            SELECT * FROM {self.table_name()}
+            WHERE user_id = ? AND {conditions}
+            ORDER BY created_at DESC
+            LIMIT ?
+        """
+        return self.execute_select(sql, (user_id, *params, limit))
@@ -0,0 +1,149 @@
+# src/models/repositories/history_buffer.py
+import json
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from config import get_logger
+from .history_repository import WorkoutHistoryRepository
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+class HistoryWriteBuffer:
+    """
+    Буфер отложенной записи подходов в таблицу history
+
+    Результаты подходов накапливаются в памяти и записываются одной транзакцией
+    (executemany). Каждый подход дублируется в журнал восстановления на диске,
+    поэтому после аварийного завершения приложения незаписанные подходы
+    восстанавливаются при следующем запуске.
+    """
+
+    def __init__(self, history_repo: WorkoutHistoryRepository, journal_path: Path, max_pending: int = 10):
+        """
+        Args:
+            history_repo: Репозиторий истории тренировок
+            journal_path: Путь к журналу восстановления (JSON Lines)
+            max_pending: Количество подходов, при котором буфер считается заполненным
+        """
+        self.history_repo = history_repo
+        self.journal_path = Path(journal_path)
+        self.max_pending = max_pending
+        self._pending: List[tuple] = []
+        self._lock = threading.RLock()
+        self._journal = None
+
+    @property
+    def pending_count(self) -> int:
+        """Количество незаписанных подходов"""
+        return len(self._pending)
+
+    @property
+    def is_full(self) -> bool:
+        """Буфер заполнен и должен быть записан"""
+        return len(self._pending) >= self.max_pending
+
+    def add(self, workout_id: int, set_number: int, reps: int, duration: int) -> int:
+        """
+        Добавление результата подхода в буфер
+
+        Запись в БД выполняет владелец буфера через flush(), когда is_full
+        или по таймеру, чтобы вместе с подходами записать и связанные данные.
+
+        Returns:
+            Количество подходов в буфере после добавления
+        """
+        row = (workout_id, set_number, reps, duration)
+        with self._lock:
+            self._write_journal(row)
+            self._pending.append(row)
+            return len(self._pending)
+
+    def flush(self, extra_writes: Optional[Callable[[], None]] = None) -> int:
+        """
+        Запись накопленных подходов одной транзакцией
+
+        Вызывается вне открытой транзакции: журнал очищается только после фиксации.
+
+        Args:
+            extra_writes: Дополнительные операции, выполняемые в той же транзакции
+
+        Returns:
+            Количество записанных подходов
+        """
+        with self._lock:
+            rows = list(self._pending)
+            if not rows and extra_writes is None:
+                return 0
+
+            with self.history_repo.db.get_connection(write=True):
+                if rows:
+                    self.history_repo.save_results(rows)
+                if extra_writes is not None:
+                    extra_writes()
+
+            self._pending.clear()
+            self._truncate_journal()
+            if rows:
+                logger.debug(f"Записано подходов из буфера: {len(rows)}")
+            return len(rows)
+
+    def recover(self) -> List[int]:
+        """
+        Восстановление подходов из журнала после аварийного завершения
+
+        Returns:
+            Список ID тренировок, для которых были восстановлены подходы
+        """
+        with self._lock:
+            rows = self._read_journal()
+            if not rows:
+                return []
+
+            restored = self.history_repo.restore_results(rows)
+            self._truncate_journal()
+            logger.warning(f"Восстановлено подходов из журнала: {restored} из {len(rows)}")
+            return sorted({row[0] for row in rows})
+
+    def close(self):
+        """Запись оставшихся подходов и закрытие журнала"""
+        with self._lock:
+            self.flush()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    # ========== ЖУРНАЛ ВОССТАНОВЛЕНИЯ ==========
+
+    def _write_journal(self, row: tuple):
+        """Дозапись подхода в журнал"""
+        if self._journal is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(row) + "\n")
+        # Без fsync: журнал защищает от падения приложения, а не от отключения питания
+        self._journal.flush()
+
+    def _truncate_journal(self):
+        """Очистка журнала после успешной записи"""
+        if self._journal is not None:
+            self._journal.seek(0)
+            self._journal.truncate()
+        elif self.journal_path.exists():
+            self.journal_path.write_text("", encoding='utf-8')
+
+    def _read_journal(self) -> List[tuple]:
+        """Чтение журнала (поврежденная последняя строка пропускается)"""
+        if not self.journal_path.exists():
+            return []
+
+        rows = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rows.append(tuple(json.loads(line)))
+                except ValueError:
+                    logger.warning("Пропущена поврежденная запись журнала подходов")
+        return rows
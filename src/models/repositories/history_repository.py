@@ -1,9 +1,12 @@
 # src/models/repositories/workout_repository.py
-from typing import List, Optional
+from typing import Iterator, List
 from .base_repository import BaseRepository
 
 class WorkoutHistoryRepository(BaseRepository):
     """Репозиторий для истории тренировок"""
+
+    # Подходов много, поэтому строки возвращаются как легкие записи
+    use_records = True
     
     def table_name(self):
         return "history"
@@ -15,6 +18,39 @@ class WorkoutHistoryRepository(BaseRepository):
             VALUES (?, ?, ?, ?)
         """
         return self.execute_insert(query, (workout_id, set_number, reps, duration ))
+
+    def save_results(self, results: List[tuple]) -> int:
+        """
+        Пакетное сохранение подходов одним executemany
+
+        Args:
+            results: Список кортежей (workout_id, set_number, reps, duration)
+
+        Returns:
+            Количество сохраненных подходов
+        """
+        query = f"""
+            INSERT INTO {self.table_name()} (workout_id, set_number, reps, duration)
+            VALUES (?, ?, ?, ?)
+        """
+        return self.execute_many(query, results)
+
+    def restore_results(self, results: List[tuple]) -> int:
+        """
+        Сохранение подходов из журнала восстановления
+
+        Пропускает подходы, которые уже записаны (workout_id, set_number),
+        и подходы удаленных тренировок.
+        """
+        query = f"""
+            INSERT INTO {self.table_name()} (workout_id, set_number, reps, duration)
+            SELECT ?1, ?2, ?3, ?4
+            WHERE EXISTS (SELECT 1 FROM workouts WHERE id = ?1)
+              AND NOT EXISTS (
+                  SELECT 1 FROM {self.table_name()} WHERE workout_id = ?1 AND set_number = ?2
+              )
+        """
+        return self.execute_many(query, results)
     
     # def get_user_workouts(self, user_id: int, limit: int= 5) -> List[dict]:
     #     """Получение тренировок пользователя"""
@@ -25,8 +61,156 @@ class WorkoutHistoryRepository(BaseRepository):
     #     """
     #     return self.execute_select(query, (user_id, ))  
 
-    def get_data_by_workout_id(self, workout_id: int) -> Optional[dict]:
-        """Получение данных тренировки по ID"""
+    def get_data_by_workout_id(self, workout_id: int, user_id: int = None) -> List[dict]:
+        """Получение подходов тренировки по ID (с проверкой владельца, если указан)"""
+        if user_id:
+            query = f"""
+                SELECT h.* FROM {self.table_name()} h
+                JOIN workouts w ON w.id = h.workout_id
+                WHERE h.workout_id = ? AND w.user_id = ?
+            """
+            return self.execute_select(query, (workout_id, user_id))
         query = f"SELECT * FROM {self.table_name()} WHERE workout_id = ?"
         results = self.execute_select(query, (workout_id, ))
-        return results
\ No newline at end of file
+        return results
+
+    @staticmethod
+    def _date_range_filter(user_id: int, start_date: str = None, end_date: str = None):
+        """Условие WHERE и параметры для выборки подходов пользователя за период (алиас w - workouts)"""
+        conditions = ["w.user_id = ?"]
+        params = [user_id]
+        if start_date:
+            conditions.append("w.created_at >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("w.created_at < date(?, '+1 day')")
+            params.append(end_date)
+        return " AND ".join(conditions), tuple(params)
+
+    def iter_date_range_history(self, user_id: int, start_date: str = None,
+                                end_date: str = None) -> Iterator[dict]:
+        """
+        Потоковое чтение подходов пользователя за период
+
+        Args:
+            user_id: ID пользователя
+            start_date: Начальная дата включительно (YYYY-MM-DD), None - с начала
+            end_date: Конечная дата включительно (YYYY-MM-DD), None - до сегодня
+
+        Returns:
+            Генератор подходов с датой тренировки (completed_at)
+        """
+        where, params = self._date_range_filter(user_id, start_date, end_date)
+        return self._iter_user_sets(where, params)
+
+    def get_date_range_history(self, user_id: int, start_date: str = None,
+                               end_date: str = None) -> dict:
+        """
+        Итоги подходов пользователя за период (агрегаты SQL)
+
+        Returns:
+            Dict: total_sessions, total_duration, distinct_workouts
+        """
+        where, params = self._date_range_filter(user_id, start_date, end_date)
+        query = f"""
+            SELECT COUNT(*) AS total_sessions,
+                   COALESCE(SUM(h.duration), 0) AS total_duration,
+                   COUNT(DISTINCT h.workout_id) AS distinct_workouts
+            FROM {self.table_name()} h
+            JOIN workouts w ON w.id = h.workout_id
+            WHERE {where}
+        """
+        return self.execute_select(query, params)[0]
+
+    def get_date_range_top_workouts(self, user_id: int, start_date: str = None,
+                                    end_date: str = None, limit: int = 3) -> List[dict]:
+        """
+        Тренировки с наибольшим количеством подходов за период
+
+        Returns:
+            Список словарей: workout_id, name, count
+        """
+        where, params = self._date_range_filter(user_id, start_date, end_date)
+        query = f"""
+            SELECT h.workout_id, w.name, COUNT(*) AS count
+            FROM {self.table_name()} h
+            JOIN workouts w ON w.id = h.workout_id
+            WHERE {where}
+            GROUP BY h.workout_id
+            ORDER BY count DESC, h.workout_id
+            LIMIT ?
+        """
+        return self.execute_select(query, params + (limit,))
+
+    def get_date_range_weekday_counts(self, user_id: int, start_date: str = None,
+                                      end_date: str = None) -> dict:
+        """
+        Количество подходов по дням недели за период
+
+        Returns:
+            Dict {день недели: количество}, 0=Понедельник, 6=Воскресенье
+        """
+        where, params = self._date_range_filter(user_id, start_date, end_date)
+        query = f"""
+            SELECT CAST(strftime('%w', w.created_at) AS INTEGER) AS weekday,
+                   COUNT(*) AS count
+            FROM {self.table_name()} h
+            JOIN workouts w ON w.id = h.workout_id
+            WHERE {where}
+            GROUP BY weekday
+        """
+        day_stats = {i: 0 for i in range(7)}
+        for row in self.execute_select(query, params):
+            # strftime('%w'): 0=Воскресенье -> weekday(): 6=Воскресенье
+            day_stats[(row['weekday'] + 6) % 7] = row['count']
+        return day_stats
+
+    def get_user_history_page(self, user_id: int, limit: int, page_token: str = None) -> dict:
+        """
+        Страница подходов пользователя (сначала новые тренировки)
+
+        Ключ страницы - (дата тренировки, ID подхода).
+
+        Returns:
+            Dict: items (подходы с названием и датой тренировки), next_token, prev_token
+        """
+        return self.select_page(
+            select=f"""
+                SELECT h.id, h.workout_id, h.set_number, h.reps, h.duration,
+                       w.name, w.created_at AS completed_at
+                FROM {self.table_name()} h
+                JOIN workouts w ON w.id = h.workout_id
+            """,
+            where="w.user_id = ?",
+            params=(user_id,),
+            key_columns=("w.created_at", "h.id"),
+            key_fields=("completed_at", "id"),
+            limit=limit,
+            page_token=page_token
+        )
+
+    def iter_period_history(self, user_id: int, days: int) -> Iterator[dict]:
+        """Потоковое чтение подходов пользователя за последние days дней"""
+        return self._iter_user_sets(
+            "w.user_id = ? AND w.created_at >= datetime('now', ?)",
+            (user_id, f"-{int(days)} days")
+        )
+
+    def _iter_user_sets(self, where: str, params: tuple) -> Iterator[dict]:
+        """
+        Подходы с датой тренировки (completed_at) по условию на тренировки (алиас w)
+
+        Порядок - по дате тренировки, затем по подходам; ключ порций ведет
+        по индексу тренировок пользователя (user_id, created_at).
+        """
+        select = f"""
+            SELECT h.id, h.workout_id, h.set_number, h.reps, h.duration,
+                   w.created_at AS completed_at
+            FROM {self.table_name()} h
+            JOIN workouts w ON w.id = h.workout_id
+        """
+        return self.iter_select(
+            select, where, params,
+            key_columns=("w.created_at", "w.id", "h.id"),
+            key_fields=("completed_at", "workout_id", "id")
+        )
@@ -0,0 +1,40 @@
+# src/models/repositories/pagination.py
+import base64
+import json
+from typing import Optional, Tuple
+
+# Направления перехода по страницам (сортировка от новых к старым)
+FORWARD = "next"    # к более старым записям
+BACKWARD = "prev"   # к более новым записям
+
+
+def encode_page_token(direction: str, key: tuple) -> str:
+    """
+    Токен страницы: направление и ключ (created_at, id) граничной записи
+
+    Токен непрозрачен для вызывающего кода и передается обратно без изменений.
+    """
+    payload = json.dumps({"d": direction, "k": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(token: Optional[str]) -> Tuple[str, Optional[tuple]]:
+    """
+    Разбор токена страницы
+
+    Returns:
+        (направление, ключ); для пустого токена - первая страница (FORWARD, None)
+
+    Raises:
+        ValueError: Токен поврежден
+    """
+    if not token:
+        return FORWARD, None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        direction, key = payload["d"], tuple(payload["k"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Некорректный токен страницы") from e
+    if direction not in (FORWARD, BACKWARD) or len(key) != 2:
+        raise ValueError("Некорректный токен страницы")
+    return direction, key
@@ -1,76 +1,191 @@
 # src/models/repositories/session_repository.py
 import secrets
-from datetime import datetime, timedelta, timezone
+import threading
+import time
 from typing import Optional, Dict, Any
+
+from config import config, get_logger
 from .base_repository import BaseRepository
 
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
 class SessionRepository(BaseRepository):
-    """Репозиторий для управления сессиями"""
-    
+    """
+    Репозиторий для управления сессиями
+
+    Время в user_sessions хранится в секундах эпохи UTC (миграция 6),
+    поэтому проверка срока действия - сравнение целых чисел по индексу.
+    Проверенные сессии кэшируются в db.cache до истечения срока действия.
+    """
+
+    # Срок действия сессии в секундах
+    SESSION_TTL = 15 * 60
+    REMEMBER_ME_TTL = 30 * 24 * 60 * 60
+
     def table_name(self):
         return "user_sessions"
-    
+
     def create_session(self, user_id: int, remember_me: bool = False) -> str:
         """Создание новой сессии"""
+        now = int(time.time())
 
         # удаляем старые сессии пользователя
         self.execute_update(
             f"DELETE FROM {self.table_name()} WHERE user_id = ? AND (expires_at < ? OR expires_at IS NULL)",
-            (user_id, datetime.now())
+            (user_id, now)
         )
 
         # Генерируем токен
         token = secrets.token_urlsafe(32)
-        
-        now_utc = datetime.now(timezone.utc)
+
         # Устанавливаем срок действия
-        expires_at = None
-        if remember_me:
-            expires_at = now_utc + timedelta(days=30)
-        else:
-            expires_at = now_utc + timedelta(minutes=15)
-        
+        expires_at = now + (self.REMEMBER_ME_TTL if remember_me else self.SESSION_TTL)
+
         query = f"""
-            INSERT INTO {self.table_name()} (user_id, session_token, expires_at)
-            VALUES (?, ?, ?)
+            INSERT INTO {self.table_name()} (user_id, session_token, created_at, expires_at)
+            VALUES (?, ?, ?, ?)
         """
-        self.execute_update(query, (user_id, token, expires_at))
-        
+        self.execute_update(query, (user_id, token, now, expires_at))
+
         return token
-    
+
     def validate_session(self, session_token: str) -> Optional[Dict[str, Any]]:
         """Валидация сессии и получение пользователя"""
+        now = int(time.time())
+        cached = self.db.cache.get(("session", session_token))
+        if cached is not None:
+            user, expires_at = cached
+            if expires_at is None or expires_at > now:
+                return dict(user)
+            self.db.cache.invalidate(("session", session_token))
+
         query = f"""
-            SELECT u.id, u.username, u.email, u.is_active
+            SELECT u.id, u.username, u.email, u.is_active, s.expires_at
             FROM {self.table_name()} s
             JOIN users u ON s.user_id = u.id
-            WHERE s.session_token = ? 
+            WHERE s.session_token = ?
             AND u.is_active = 1
-            AND (s.expires_at IS NULL OR s.expires_at > CURRENT_TIMESTAMP)
+            AND (s.expires_at IS NULL OR s.expires_at > ?)
         """
-        
-        results = self.execute_select(query, (session_token,))
+
+        results = self.execute_select(query, (session_token, now))
         if results:
             # Обновляем время действия сессии
             # self._update_session(session_token)
-            return results[0]
+            user = results[0]
+            expires_at = user.pop('expires_at')
+            # Запись кэша живет не дольше сессии
+            ttl = expires_at - now if expires_at is not None else None
+            self.db.cache.set(("session", session_token), (dict(user), expires_at), ttl=ttl)
+            return user
         return None
-    
+
     def delete_session(self, session_token: str):
         """Удаление сессии"""
         query = f"DELETE FROM {self.table_name()} WHERE session_token = ?"
         self.execute_update(query, (session_token,))
-    
+        self.db.cache.invalidate(("session", session_token))
+
     def delete_user_sessions(self, user_id: int):
         """Удаление всех сессий пользователя"""
         query = f"DELETE FROM {self.table_name()} WHERE user_id = ?"
         self.execute_update(query, (user_id,))
-    
+        # Ключ кэша - токен, поэтому сбрасываются все проверенные сессии
+        self.db.cache.invalidate_prefix("session")
+
+    def sweep_expired(self, batch_size: int = 500) -> int:
+        """
+        Удаление истекших сессий пакетами
+
+        Каждый пакет удаляется отдельной короткой транзакцией,
+        чтобы не блокировать запись в БД надолго.
+
+        Returns:
+            Количество удаленных сессий
+        """
+        now = int(time.time())
+        query = f"""
+            DELETE FROM {self.table_name()}
+            WHERE id IN (
+                SELECT id FROM {self.table_name()}
+                WHERE expires_at < ?
+                LIMIT ?
+            )
+        """
+        total = 0
+        while True:
+            deleted = self.execute_delete(query, (now, batch_size))
+            total += deleted
+            if deleted < batch_size:
+                break
+        return total
+
     def _update_session(self, session_token: str):
         """Обновление времени сессии"""
         query = f"""
-            UPDATE {self.table_name()} 
-            SET expires_at = DATETIME(CURRENT_TIMESTAMP, '+30 days')
+            UPDATE {self.table_name()}
+            SET expires_at = CAST(strftime('%s', 'now', '+30 days') AS INTEGER)
             WHERE session_token = ? AND expires_at IS NOT NULL
         """
-        self.execute_update(query, (session_token,))
\ No newline at end of file
+        self.execute_update(query, (session_token,))
+        self.db.cache.invalidate(("session", session_token))
+
+
+class SessionSweeper:
+    """
+    Фоновое удаление истекших сессий
+
+    Поток-демон вызывает SessionRepository.sweep_expired при запуске
+    и затем каждые interval секунд.
+    """
+
+    def __init__(self, session_repo: SessionRepository, interval: float = None, batch_size: int = None):
+        """
+        Args:
+            session_repo: Репозиторий сессий
+            interval: Период очистки в секундах (по умолчанию config.SESSION_SWEEP_INTERVAL)
+            batch_size: Размер пакета удаления (по умолчанию config.SESSION_SWEEP_BATCH)
+        """
+        self.session_repo = session_repo
+        self.interval = interval if interval is not None else config.SESSION_SWEEP_INTERVAL
+        self.batch_size = batch_size or config.SESSION_SWEEP_BATCH
+        self.total_deleted = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Запуск потока очистки"""
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Остановка потока очистки"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def sweep(self) -> int:
+        """Однократная очистка истекших сессий"""
+        try:
+            deleted = self.session_repo.sweep_expired(self.batch_size)
+        except Exception as e:
+            logger.error(f"Ошибка очистки истекших сессий: {e}")
+            return 0
+        self.total_deleted += deleted
+        if deleted:
+            logger.info(f"Удалено истекших сессий: {deleted}")
+        return deleted
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sweep()
+            self._stop.wait(self.interval)
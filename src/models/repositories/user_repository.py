@@ -1,37 +1,138 @@
 # src/models/repositories/user_repository.py
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable
 from datetime import datetime, timedelta
-import secrets
+import os
+import sqlite3
+from config import get_logger
+from ..passwords import PasswordHasher, get_password_hasher
 from .base_repository import BaseRepository
 
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+class DuplicateUserError(ValueError):
+    """Имя пользователя или email уже заняты"""
+
+
+class DuplicateEmailError(DuplicateUserError):
+    """Пользователь с таким email уже существует"""
+
+
+class DuplicateUsernameError(DuplicateUserError):
+    """Пользователь с таким именем уже существует"""
+
+
 class UserRepository(BaseRepository):
     """Репозиторий для работы с пользователями"""
+
+    def __init__(self, db, password_hasher: PasswordHasher = None):
+        super().__init__(db)
+        self.password_hasher = password_hasher or get_password_hasher()
     
     def table_name(self):
         return "users"
     
     def create_user(self, username: str, email: str, password: str) -> Dict[str, Any]:
-        """Создание нового пользователя"""
-        # Проверяем, существует ли пользователь
-        if self.get_by_email(email):
-            raise ValueError("Пользователь с таким email уже существует")
-        
-        if self.get_by_username(username):
-            raise ValueError("Пользователь с таким именем уже существует")
-        
+        """
+        Создание нового пользователя одним запросом INSERT ... RETURNING
+
+        Уникальность имени и email проверяют ограничения UNIQUE таблицы.
+
+        Raises:
+            DuplicateEmailError: Пользователь с таким email уже существует
+            DuplicateUsernameError: Пользователь с таким именем уже существует
+        """
         # Хешируем пароль
         password_hash = self._hash_password(password)
-        
-        query = f"""
-            INSERT INTO {self.table_name()} (username, email, password_hash)
-            VALUES (?, ?, ?)
+
+        return self.db.run_write(lambda conn: self._insert_user(conn, username, email, password_hash))
+
+    def create_users(self, users: Iterable[Dict[str, str]], skip_existing: bool = False,
+                     workers: int = None) -> Dict[str, Any]:
         """
-        
-        user_id = self.execute_update(query, (username, email, password_hash))
-        
-        # Возвращаем созданного пользователя
-        return self.get_by_id(user_id)
-    
+        Массовое создание пользователей одной транзакцией
+
+        Пароли хешируются параллельно в пуле потоков (scrypt освобождает GIL),
+        затем все строки вставляются в одной транзакции.
+
+        Args:
+            users: Словари с ключами username, email, password
+                   (или готовым password_hash)
+            skip_existing: Пропускать пользователей с занятым именем или email;
+                           иначе первая же ошибка отменяет всю вставку
+            workers: Количество потоков хеширования (по умолчанию - по числу CPU)
+
+        Returns:
+            Dict: created (количество созданных), skipped (список пропущенных
+            {index, username, email, reason})
+
+        Raises:
+            DuplicateEmailError, DuplicateUsernameError: Если skip_existing=False
+            ValueError: Не заполнены обязательные поля
+        """
+        users = list(users)
+        for index, user in enumerate(users):
+            if not user.get('username') or not user.get('email') or \
+                    not (user.get('password') or user.get('password_hash')):
+                raise ValueError(f"Строка {index + 1}: имя, email и пароль обязательны")
+
+        def password_hash_of(user: Dict[str, str]) -> str:
+            return user.get('password_hash') or self._hash_password(user['password'])
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            hashes = list(executor.map(password_hash_of, users))
+
+        created = 0
+        skipped = []
+        with self.db.get_connection(write=True) as conn:
+            for index, (user, password_hash) in enumerate(zip(users, hashes)):
+                # Нарушение UNIQUE отменяет только текущий INSERT, транзакция продолжается
+                try:
+                    self._insert_user(conn, user['username'], user['email'], password_hash)
+                    created += 1
+                except DuplicateUserError as e:
+                    if not skip_existing:
+                        raise type(e)(f"Строка {index + 1}: {e}") from e
+                    skipped.append({
+                        "index": index,
+                        "username": user['username'],
+                        "email": user['email'],
+                        "reason": str(e),
+                    })
+
+        logger.info(f"Массовое создание пользователей: создано {created}, пропущено {len(skipped)}")
+        return {"created": created, "skipped": skipped}
+
+    def _insert_user(self, conn, username: str, email: str, password_hash: str) -> Dict[str, Any]:
+        """Вставка пользователя в открытом соединении; возвращает пользователя без пароля"""
+        try:
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                cursor = conn.execute(f"""
+                    INSERT INTO {self.table_name()} (username, email, password_hash)
+                    VALUES (?, ?, ?)
+                    RETURNING id, username, email, created_at, is_active, last_login
+                """, (username, email, password_hash))
+                return dict(cursor.fetchone())
+
+            # SQLite до 3.35 не поддерживает RETURNING
+            cursor = conn.execute(f"""
+                INSERT INTO {self.table_name()} (username, email, password_hash)
+                VALUES (?, ?, ?)
+            """, (username, email, password_hash))
+            return dict(conn.execute("""
+                SELECT id, username, email, created_at, is_active, last_login
+                FROM users WHERE id = ?
+            """, (cursor.lastrowid,)).fetchone())
+        except sqlite3.IntegrityError as e:
+            message = str(e)
+            if "users.email" in message:
+                raise DuplicateEmailError("Пользователь с таким email уже существует") from e
+            if "users.username" in message:
+                raise DuplicateUsernameError("Пользователь с таким именем уже существует") from e
+            raise
+
     def get_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Получение пользователя по ID (без пароля)"""
         query = """
@@ -66,6 +167,11 @@ class UserRepository(BaseRepository):
         
         # Проверяем пароль
         if self._verify_password(password, user['password_hash']) and user['is_active']:
+            # Хеш старого формата или с прежними параметрами пересчитывается при входе
+            if self.password_hasher.needs_rehash(user['password_hash']):
+                self.update_password(user['id'], password)
+                logger.info(f"Хеш пароля пользователя {user['id']} обновлен")
+
             # Обновляем время последнего входа
             self.update_last_login(user['id'])
             
@@ -118,13 +224,10 @@ class UserRepository(BaseRepository):
         session_repo = SessionRepository(self.db)
         return session_repo.validate_session(session_token)
     
-    @staticmethod
-    def _hash_password(password: str) -> str:
+    def _hash_password(self, password: str) -> str:
         """Хеширование пароля"""
-        import hashlib
-        return hashlib.sha256(password.encode()).hexdigest()
+        return self.password_hasher.hash(password)
     
-    @staticmethod
-    def _verify_password(password: str, password_hash: str) -> bool:
+    def _verify_password(self, password: str, password_hash: str) -> bool:
         """Проверка пароля"""
-        return UserRepository._hash_password(password) == password_hash
\ No newline at end of file
+        return self.password_hasher.verify(password, password_hash)
\ No newline at end of file
@@ -0,0 +1,178 @@
+# src/models/repositories/user_stats_repository.py
+from typing import Dict, List
+
+from config import get_logger
+from .base_repository import BaseRepository
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+STATS_COLUMNS = ('total_workouts', 'total_duration', 'total_reps', 'total_sets')
+
+# Формат ключа периода для strftime
+PERIOD_FORMATS = {
+    'week': '%Y-%W',
+    'month': '%Y-%m',
+}
+
+
+class UserStatsRepository(BaseRepository):
+    """
+    Репозиторий сводной статистики пользователей
+
+    Таблицы user_stats, user_exercise_stats и user_period_stats обновляются
+    триггерами на workouts (миграция 3), поэтому чтение статистики не зависит
+    от количества тренировок. Для проверки сводка пересчитывается по workouts.
+    """
+
+    # Ключевые столбцы таблиц сводки
+    KEY_COLUMNS = {
+        'user_stats': ('user_id',),
+        'user_exercise_stats': ('user_id', 'exercise_id'),
+        'user_period_stats': ('user_id', 'period', 'bucket'),
+    }
+
+    def table_name(self):
+        return "user_stats"
+
+    # ========== ЧТЕНИЕ ==========
+
+    def get_totals(self, user_id: int) -> dict:
+        """Итоги пользователя (нули, если тренировок еще не было)"""
+        query = f"SELECT {', '.join(STATS_COLUMNS)} FROM user_stats WHERE user_id = ?"
+        results = self.execute_select(query, (user_id,))
+        return results[0] if results else dict.fromkeys(STATS_COLUMNS, 0)
+
+    def get_exercise_totals(self, user_id: int) -> List[dict]:
+        """Итоги по упражнениям пользователя (сначала самые частые)"""
+        query = f"""
+            SELECT exercise_id, {', '.join(STATS_COLUMNS)}
+            FROM user_exercise_stats
+            WHERE user_id = ? AND total_workouts > 0
+            ORDER BY total_workouts DESC, exercise_id
+        """
+        return self.execute_select(query, (user_id,))
+
+    def get_current_period(self, user_id: int, period: str) -> dict:
+        """Итоги текущей недели ('week') или месяца ('month')"""
+        query = f"""
+            SELECT bucket, {', '.join(STATS_COLUMNS)}
+            FROM user_period_stats
+            WHERE user_id = ? AND period = ? AND bucket = strftime(?, 'now')
+        """
+        results = self.execute_select(query, (user_id, period, PERIOD_FORMATS[period]))
+        if results:
+            return results[0]
+        empty = dict.fromkeys(STATS_COLUMNS, 0)
+        empty['bucket'] = None
+        return empty
+
+    def get_recent_periods(self, user_id: int, period: str, limit: int = 4) -> List[dict]:
+        """Итоги последних limit недель или месяцев (от последнего к первому)"""
+        query = f"""
+            SELECT bucket, {', '.join(STATS_COLUMNS)}
+            FROM user_period_stats
+            WHERE user_id = ? AND period = ? AND total_workouts > 0
+            ORDER BY bucket DESC
+            LIMIT ?
+        """
+        return self.execute_select(query, (user_id, period, limit))
+
+    # ========== ПРОВЕРКА И ПЕРЕСЧЕТ ==========
+
+    @staticmethod
+    def _source_query(table: str, user_id: int = None):
+        """Запрос, вычисляющий содержимое таблицы сводки по workouts"""
+        aggregates = """COUNT(*) AS total_workouts,
+                   COALESCE(SUM(work_time), 0) AS total_duration,
+                   COALESCE(SUM(reps), 0) AS total_reps,
+                   COALESCE(SUM(sets), 0) AS total_sets"""
+        where = "WHERE user_id = ?" if user_id is not None else ""
+
+        if table == 'user_stats':
+            selects = [f"SELECT user_id, {aggregates} FROM workouts {where} GROUP BY user_id"]
+        elif table == 'user_exercise_stats':
+            selects = [f"""SELECT user_id, exercise_id, {aggregates}
+                FROM workouts {where} GROUP BY user_id, exercise_id"""]
+        else:
+            selects = [
+                f"""SELECT user_id, '{period}' AS period, strftime('{fmt}', created_at) AS bucket, {aggregates}
+                FROM workouts {where} GROUP BY user_id, bucket"""
+                for period, fmt in PERIOD_FORMATS.items()
+            ]
+
+        params = (user_id,) * len(selects) if user_id is not None else ()
+        return " UNION ALL ".join(selects), params
+
+    def check_consistency(self, user_id: int = None) -> Dict[str, List[dict]]:
+        """
+        Сравнение сводки с пересчетом по таблице workouts
+
+        Args:
+            user_id: Проверить только этого пользователя (None - всех)
+
+        Returns:
+            Dict {таблица: список расхождений {key, expected, actual}}; пустой, если расхождений нет
+        """
+        differences = {}
+        for table, key_columns in self.KEY_COLUMNS.items():
+            query, params = self._source_query(table, user_id)
+            expected = self._rows_by_key(self.execute_select(query, params), key_columns)
+
+            actual_query = f"SELECT * FROM {table}"
+            actual_params = ()
+            if user_id is not None:
+                actual_query += " WHERE user_id = ?"
+                actual_params = (user_id,)
+            actual = self._rows_by_key(self.execute_select(actual_query, actual_params), key_columns)
+
+            table_diffs = []
+            for key in sorted(expected.keys() | actual.keys(), key=str):
+                if expected.get(key) != actual.get(key):
+                    table_diffs.append({
+                        "key": dict(zip(key_columns, key)),
+                        "expected": expected.get(key),
+                        "actual": actual.get(key),
+                    })
+            if table_diffs:
+                differences[table] = table_diffs
+
+        if differences:
+            logger.warning(f"Расхождения в сводной статистике: {sum(len(d) for d in differences.values())}")
+        return differences
+
+    def rebuild(self, user_id: int = None) -> int:
+        """
+        Пересчет сводки по таблице workouts одной транзакцией
+
+        Args:
+            user_id: Пересчитать только этого пользователя (None - всех)
+
+        Returns:
+            Количество записанных строк сводки
+        """
+        written = 0
+        with self.db.get_connection(write=True) as conn:
+            for table, key_columns in self.KEY_COLUMNS.items():
+                if user_id is None:
+                    conn.execute(f"DELETE FROM {table}")
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+
+                query, params = self._source_query(table, user_id)
+                columns = ", ".join(key_columns + STATS_COLUMNS)
+                cursor = conn.execute(f"INSERT INTO {table} ({columns}) {query}", params)
+                written += cursor.rowcount
+        logger.info(f"Сводная статистика пересчитана, строк: {written}")
+        return written
+
+    @staticmethod
+    def _rows_by_key(rows: List[dict], key_columns: tuple) -> Dict[tuple, dict]:
+        """Строки сводки по ключу (нулевые строки после удаления тренировок не учитываются)"""
+        result = {}
+        for row in rows:
+            if not any(row[column] for column in STATS_COLUMNS):
+                continue
+            key = tuple(row[column] for column in key_columns)
+            result[key] = {column: row[column] for column in STATS_COLUMNS}
+        return result
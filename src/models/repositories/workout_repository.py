@@ -1,5 +1,6 @@
 # src/models/repositories/workout_repository.py
-from typing import List, Optional
+from typing import Dict, List, Optional
+from ..records import HistoryRecord
 from .base_repository import BaseRepository
 
 class WorkoutRepository(BaseRepository):
@@ -46,6 +47,23 @@ class WorkoutRepository(BaseRepository):
             ORDER BY created_at DESC
         """
         return self.execute_select(query, (user_id,))    
+
+    def get_user_workouts_page(self, user_id: int, limit: int, page_token: str = None) -> dict:
+        """
+        Страница тренировок пользователя (сначала новые), переход по ключу (created_at, id)
+
+        Returns:
+            Dict: items, next_token, prev_token
+        """
+        return self.select_page(
+            select=f"SELECT * FROM {self.table_name()}",
+            where="user_id = ?",
+            params=(user_id,),
+            key_columns=("created_at", "id"),
+            key_fields=("created_at", "id"),
+            limit=limit,
+            page_token=page_token
+        )
    
     def get_by_id(self, workout_id: int, user_id: int = None) -> Optional[dict]:
         """Получение тренировки по ID с проверкой владельца"""
@@ -68,10 +86,111 @@ class WorkoutRepository(BaseRepository):
         """
         return self.execute_select(query, (user_id,))
     
-    def get_last_workout_id(self, exercise_id: int) -> int:
-        """ Получение последней тренировки по ID упражнения """
-        query = f"SELECT id FROM {self.table_name()} WHERE exercise_id = ? ORDER BY created_at DESC LIMIT 1"
-        results = self.execute_select(query, (exercise_id,))
+    def get_last_workout_id(self, exercise_id: int, user_id: int = None) -> int:
+        """ Получение последней тренировки по ID упражнения (для пользователя, если указан) """
+        if user_id:
+            query = f"""
+                SELECT id FROM {self.table_name()}
+                WHERE user_id = ? AND exercise_id = ?
+                ORDER BY created_at DESC LIMIT 1
+            """
+            results = self.execute_select(query, (user_id, exercise_id))
+        else:
+            query = f"SELECT id FROM {self.table_name()} WHERE exercise_id = ? ORDER BY created_at DESC LIMIT 1"
+            results = self.execute_select(query, (exercise_id,))
         return results[0]['id'] if results else None
-    
 
+    # Столбцы подходов в объединенной выборке тренировок с подходами
+    _SETS_COLUMNS = """h.id AS set_id, h.set_number AS set_number,
+                       h.reps AS set_reps, h.duration AS set_duration"""
+
+    def get_last_workout_with_sets(self, user_id: int, exercise_id: int) -> Optional[dict]:
+        """
+        Последняя тренировка пользователя по упражнению вместе с подходами
+
+        Один запрос: тренировка выбирается по индексу (user_id, exercise_id, created_at)
+        и соединяется с подходами.
+
+        Returns:
+            Dict тренировки с ключом "history" (подходы по порядку) или None
+        """
+        query = f"""
+            SELECT w.*, {self._SETS_COLUMNS}
+            FROM (
+                SELECT * FROM {self.table_name()}
+                WHERE user_id = ? AND exercise_id = ?
+                ORDER BY created_at DESC, id DESC
+                LIMIT 1
+            ) w
+            LEFT JOIN history h ON h.workout_id = w.id
+            ORDER BY h.set_number
+        """
+        workouts = self._group_sets(self.execute_select(query, (user_id, exercise_id)))
+        return workouts[0] if workouts else None
+
+    def get_recent_workouts_with_sets(self, user_id: int, exercise_id: int = None,
+                                      limit: int = 5) -> Dict[int, List[dict]]:
+        """
+        Последние limit тренировок по каждому упражнению пользователя вместе с подходами
+
+        Один запрос: тренировки нумеруются оконной функцией ROW_NUMBER()
+        в пределах упражнения (от новых к старым).
+
+        Args:
+            user_id: ID пользователя
+            exercise_id: Только это упражнение (None - все упражнения)
+            limit: Количество тренировок на упражнение
+
+        Returns:
+            Dict {ID упражнения: список тренировок с ключом "history", от новых к старым}
+        """
+        conditions = "user_id = ?"
+        params = [user_id]
+        if exercise_id is not None:
+            conditions += " AND exercise_id = ?"
+            params.append(exercise_id)
+        query = f"""
+            WITH ranked AS (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY exercise_id ORDER BY created_at DESC, id DESC
+                ) AS position
+                FROM {self.table_name()}
+                WHERE {conditions}
+            )
+            SELECT w.*, {self._SETS_COLUMNS}
+            FROM ranked w
+            LEFT JOIN history h ON h.workout_id = w.id
+            WHERE w.position <= ?
+            ORDER BY w.exercise_id, w.position, h.set_number
+        """
+        result = {}
+        for workout in self._group_sets(self.execute_select(query, tuple(params) + (limit,))):
+            workout.pop('position', None)
+            result.setdefault(workout['exercise_id'], []).append(workout)
+        return result
+
+    @staticmethod
+    def _group_sets(rows: List[dict]) -> List[dict]:
+        """Свертка строк "тренировка + подход" в тренировки со списком подходов (порядок сохраняется)"""
+        workouts = {}
+        for row in rows:
+            set_id = row.pop('set_id')
+            set_row = HistoryRecord(set_id, row['id'], row.pop('set_number'),
+                                    row.pop('set_reps'), row.pop('set_duration'))
+            workout = workouts.get(row['id'])
+            if workout is None:
+                workout = workouts[row['id']] = dict(row, history=[])
+            if set_id is not None:
+                workout['history'].append(set_row)
+        return list(workouts.values())
+
+    def recalculate_totals(self, workout_ids: List[int]) -> int:
+        """Пересчет итогов тренировок (время, повторения, подходы) по таблице history"""
+        query = f"""
+            UPDATE {self.table_name()}
+            SET work_time = (SELECT COALESCE(SUM(duration), 0) FROM history WHERE workout_id = ?1),
+                reps = (SELECT COALESCE(SUM(reps), 0) FROM history WHERE workout_id = ?1),
+                sets = (SELECT COALESCE(MAX(set_number), 0) FROM history WHERE workout_id = ?1)
+            WHERE id = ?1
+        """
+        return self.execute_many(query, [(workout_id,) for workout_id in workout_ids])
@@ -0,0 +1,334 @@
+# src/models/snapshots.py
+"""
+Инкрементальные резервные копии БД
+
+Снимок - согласованная копия БД (Database.backup_to), разрезанная на блоки
+фиксированного размера (кратного странице SQLite). Блоки хранятся по
+SHA-256 содержимого (chunks/ab/abcd...), поэтому в хранилище попадают только
+страницы, изменившиеся с прошлых снимков; манифест снимка - список хешей.
+Любой сохраненный снимок собирается обратно из блоков.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from config import config, get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+class SnapshotStore:
+    """Хранилище снимков БД с дедупликацией блоков по содержимому"""
+
+    def __init__(self, root=None, chunk_size: int = None):
+        """
+        Args:
+            root: Каталог хранилища (по умолчанию config.SNAPSHOT_DIR)
+            chunk_size: Размер блока в байтах (по умолчанию config.SNAPSHOT_CHUNK_SIZE)
+        """
+        self.root = Path(root if root is not None else config.SNAPSHOT_DIR)
+        self.chunk_size = chunk_size or config.SNAPSHOT_CHUNK_SIZE
+        self.chunks_dir = self.root / "chunks"
+        self.manifests_dir = self.root / "snapshots"
+        self._lock = threading.Lock()  # снимок, очистка и сборка мусора не пересекаются
+
+    def create(self, db) -> Dict:
+        """
+        Создание снимка БД
+
+        Returns:
+            Манифест снимка (new_chunks/new_bytes - сколько добавлено в хранилище)
+        """
+        with self._lock:
+            self.manifests_dir.mkdir(parents=True, exist_ok=True)
+            snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S_%f")
+            staging = self.root / f"{snapshot_id}.staging.db"
+            started = time.perf_counter()
+            try:
+                db.backup_to(staging)
+                chunks, new_chunks, new_bytes = [], 0, 0
+                with open(staging, "rb") as f:
+                    while True:
+                        data = f.read(self.chunk_size)
+                        if not data:
+                            break
+                        digest = hashlib.sha256(data).hexdigest()
+                        written = self._write_chunk(digest, data)
+                        if written:
+                            new_chunks += 1
+                            new_bytes += written
+                        chunks.append(digest)
+                size = staging.stat().st_size
+            finally:
+                staging.unlink(missing_ok=True)
+
+            manifest = {
+                "id": snapshot_id,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "schema_version": db.schema_version,
+                "size_bytes": size,
+                "chunk_size": self.chunk_size,
+                "chunks": chunks,
+                "new_chunks": new_chunks,
+                "new_bytes": new_bytes,
+            }
+            self._write_atomic(self._manifest_path(snapshot_id), json.dumps(manifest).encode("utf-8"))
+
+        logger.info(
+            f"Снимок БД {snapshot_id}: {len(chunks)} блоков, новых {new_chunks} "
+            f"({new_bytes / 1024:.1f} КБ), {(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+        return manifest
+
+    def list(self) -> List[Dict]:
+        """Манифесты снимков от старых к новым"""
+        if not self.manifests_dir.exists():
+            return []
+        manifests = []
+        for path in sorted(self.manifests_dir.glob("*.json")):
+            try:
+                manifests.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Пропущен поврежденный манифест {path.name}: {e}")
+        return manifests
+
+    def latest(self) -> Optional[Dict]:
+        """Последний снимок (None - снимков нет)"""
+        manifests = self.list()
+        return manifests[-1] if manifests else None
+
+    def get(self, snapshot_id: str) -> Dict:
+        path = self._manifest_path(snapshot_id)
+        if not path.exists():
+            raise FileNotFoundError(f"Снимок не найден: {snapshot_id}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def materialize(self, snapshot_id: str, path,
+                    progress: Callable[[int, int], None] = None) -> Path:
+        """
+        Сборка файла БД из блоков снимка
+
+        Хеш каждого блока проверяется; файл пишется во временный и
+        переименовывается после завершения.
+        """
+        manifest = self.get(snapshot_id)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        total = len(manifest["chunks"])
+        try:
+            with open(tmp_path, "wb") as f:
+                for index, digest in enumerate(manifest["chunks"], 1):
+                    data = self._read_chunk(digest)
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f"Блок {digest} поврежден")
+                    f.write(data)
+                    if progress is not None:
+                        progress(index, total)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+        return path
+
+    def restore(self, snapshot_id: str, db, progress: Callable[[int, int], None] = None) -> int:
+        """
+        Восстановление рабочей БД из снимка (см. Database.restore_from)
+
+        Returns:
+            Версия схемы восстановленной БД
+        """
+        staging = self.root / f"{snapshot_id}.restore.db"
+        try:
+            self.materialize(snapshot_id, staging, progress)
+            return db.restore_from(staging)
+        finally:
+            staging.unlink(missing_ok=True)
+
+    def prune(self, keep_last: int = None, keep_daily: int = None) -> List[str]:
+        """
+        Удаление снимков по политике хранения и сборка мусора в блоках
+
+        Сохраняются keep_last последних снимков и последний снимок каждого
+        дня за keep_daily дней.
+
+        Returns:
+            Идентификаторы удаленных снимков
+        """
+        keep_last = config.SNAPSHOT_KEEP_LAST if keep_last is None else keep_last
+        keep_daily = config.SNAPSHOT_KEEP_DAILY if keep_daily is None else keep_daily
+
+        with self._lock:
+            manifests = self.list()
+            keep = {m["id"] for m in manifests[-keep_last:]} if keep_last > 0 else set()
+            since = (datetime.now() - timedelta(days=keep_daily)).date()
+            daily = {}
+            for manifest in manifests:
+                day = datetime.fromisoformat(manifest["created_at"]).date()
+                if day > since:
+                    daily[day] = manifest["id"]  # список упорядочен: остается последний за день
+            keep.update(daily.values())
+
+            removed = [m["id"] for m in manifests if m["id"] not in keep]
+            for snapshot_id in removed:
+                self._manifest_path(snapshot_id).unlink(missing_ok=True)
+            if removed:
+                self._collect_garbage([m for m in manifests if m["id"] in keep])
+
+        if removed:
+            logger.info(f"Удалено снимков по политике хранения: {len(removed)}")
+        return removed
+
+    def stats(self) -> Dict:
+        """Размер хранилища и снимков"""
+        manifests = self.list()
+        chunk_files = list(self.chunks_dir.glob("*/*")) if self.chunks_dir.exists() else []
+        return {
+            "snapshots": len(manifests),
+            "chunks": len(chunk_files),
+            "stored_bytes": sum(path.stat().st_size for path in chunk_files),
+            "logical_bytes": sum(m["size_bytes"] for m in manifests),
+            "latest": manifests[-1]["id"] if manifests else None,
+        }
+
+    def _collect_garbage(self, manifests: List[Dict]) -> int:
+        """Удаление блоков, на которые не ссылается ни один снимок (под блокировкой)"""
+        referenced = {digest for manifest in manifests for digest in manifest["chunks"]}
+        removed = 0
+        for path in self.chunks_dir.glob("*/*"):
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _manifest_path(self, snapshot_id: str) -> Path:
+        return self.manifests_dir / f"{snapshot_id}.json"
+
+    def _write_chunk(self, digest: str, data: bytes) -> int:
+        """Сохранение блока, если его еще нет; возвращает записанный размер (0 - уже есть)"""
+        path = self._chunk_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        self._write_atomic(path, compressed)
+        return len(compressed)
+
+    def _read_chunk(self, digest: str) -> bytes:
+        path = self._chunk_path(digest)
+        if not path.exists():
+            raise FileNotFoundError(f"Блок снимка отсутствует: {digest}")
+        return zlib.decompress(path.read_bytes())
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class BackupScheduler:
+    """
+    Периодические снимки БД (настройка auto_backup)
+
+    Поток-демон создает снимок, когда с последнего прошло interval секунд
+    (время берется из хранилища, поэтому перезапуск приложения не сбивает
+    расписание), затем применяет политику хранения.
+    """
+
+    def __init__(self, db, store: SnapshotStore = None, interval: float = None):
+        """
+        Args:
+            db: Экземпляр Database
+            store: Хранилище снимков (по умолчанию SnapshotStore())
+            interval: Период снимков в секундах (по умолчанию config.SNAPSHOT_INTERVAL)
+        """
+        self.db = db
+        self.store = store or SnapshotStore()
+        self.interval = interval if interval is not None else config.SNAPSHOT_INTERVAL
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Запуск потока снимков"""
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Остановка потока снимков (текущий снимок завершается)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def seconds_until_due(self) -> float:
+        """Секунд до следующего снимка (0 - пора)"""
+        latest = self.store.latest()
+        if latest is None:
+            return 0.0
+        elapsed = (datetime.now() - datetime.fromisoformat(latest["created_at"])).total_seconds()
+        return max(0.0, self.interval - elapsed)
+
+    def run_once(self) -> Optional[Dict]:
+        """Снимок и очистка старых снимков; None - при ошибке"""
+        try:
+            manifest = self.store.create(self.db)
+            self.store.prune()
+            return manifest
+        except Exception as e:
+            logger.error(f"Ошибка создания снимка БД: {e}")
+            return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.seconds_until_due()
+            except Exception as e:
+                logger.error(f"Ошибка чтения хранилища снимков: {e}")
+                delay = self.interval
+            if delay > 0:
+                self._stop.wait(delay)
+                continue
+            if self.run_once() is None:
+                # Повтор после ошибки не раньше чем через интервал
+                self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    # Работа со снимками из корня проекта:
+    #   PYTHONPATH=src python -m models.snapshots [list | create | restore ID | export ID ФАЙЛ]
+    import sys
+    from models.database import get_database
+
+    store = SnapshotStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "create":
+        result = store.create(get_database())
+        print(f"{result['id']}: новых блоков {result['new_chunks']} ({result['new_bytes']} байт)")
+    elif command == "restore":
+        print(f"Версия схемы: {store.restore(sys.argv[2], get_database())}")
+    elif command == "export":
+        print(store.materialize(sys.argv[2], sys.argv[3]))
+    else:
+        for manifest in store.list():
+            print(f"{manifest['id']}  {manifest['created_at']}  {manifest['size_bytes']:>12} байт  "
+                  f"новых {manifest['new_bytes']:>10} байт")
+        print(store.stats())
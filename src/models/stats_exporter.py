@@ -0,0 +1,151 @@
+# src/models/stats_exporter.py
+"""
+Инкрементальный экспорт статистики (настройка auto_export)
+
+Для каждой таблицы хранится отметка - последний выгруженный id, поэтому
+каждый запуск читает только новые строки (id > отметки) порциями по
+первичному ключу и записывает их в отдельный файл-часть. Часть пишется во
+временный файл и переименовывается, затем атомарно сохраняются отметки.
+Имя части определяется первой строкой, поэтому повтор после сбоя между
+переименованием и сохранением отметок перезаписывает ту же часть.
+"""
+import csv
+import itertools
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from config import config, get_logger
+
+# Получаем логгер для текущего модуля
+logger = get_logger(__name__)
+
+
+class StatsExporter:
+    """Выгрузка новых тренировок и подходов пользователя в CSV/JSONL"""
+
+    # Таблица -> (столбцы, запрос новых строк пользователя после отметки)
+    TABLES: Dict[str, Tuple[List[str], str]] = {
+        "workouts": (
+            ["id", "exercise_id", "name", "work_time", "rest_time", "sets", "reps", "created_at"],
+            """
+            SELECT id, exercise_id, name, work_time, rest_time, sets, reps, created_at
+            FROM workouts
+            WHERE user_id = ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+        ),
+        "history": (
+            ["id", "workout_id", "exercise_id", "set_number", "reps", "duration"],
+            """
+            SELECT h.id, h.workout_id, w.exercise_id, h.set_number, h.reps, h.duration
+            FROM history h
+            JOIN workouts w ON w.id = h.workout_id
+            WHERE w.user_id = ? AND h.id > ?
+            ORDER BY h.id
+            LIMIT ?
+            """,
+        ),
+    }
+    FORMATS = ("csv", "jsonl")
+
+    def __init__(self, db, export_dir=None, fmt: str = None, batch_size: int = None):
+        """
+        Args:
+            db: Экземпляр Database
+            export_dir: Каталог выгрузки (по умолчанию config.EXPORT_DIR)
+            fmt: Формат файлов "csv" или "jsonl" (по умолчанию config.EXPORT_FORMAT)
+            batch_size: Строк в одном запросе (по умолчанию config.EXPORT_BATCH_SIZE)
+        """
+        self.db = db
+        self.export_dir = Path(export_dir if export_dir is not None else config.EXPORT_DIR)
+        self.fmt = fmt or config.EXPORT_FORMAT
+        if self.fmt not in self.FORMATS:
+            raise ValueError(f"Неизвестный формат экспорта: {self.fmt}")
+        self.batch_size = batch_size or config.EXPORT_BATCH_SIZE
+
+    def export(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Выгрузка строк, добавленных после прошлого запуска
+
+        Returns:
+            Таблица -> {"rows", "last_id", "file"} (file - None, если новых строк нет)
+        """
+        user_dir = self.export_dir / f"user_{user_id}"
+        watermarks = self.load_watermarks(user_id)
+        result = {}
+        for table in self.TABLES:
+            after_id = watermarks.get(table, 0)
+            rows, last_id, path = self._export_table(user_dir, table, user_id, after_id)
+            if rows:
+                watermarks[table] = last_id
+                self._write_atomic(user_dir / "export_state.json", json.dumps(watermarks, indent=2))
+            result[table] = {"rows": rows, "last_id": last_id, "file": str(path) if path else None}
+
+        exported = {table: info["rows"] for table, info in result.items()}
+        logger.info(f"Экспорт статистики пользователя {user_id}: {exported}")
+        return result
+
+    def load_watermarks(self, user_id: int) -> Dict[str, int]:
+        """Последние выгруженные id по таблицам"""
+        path = self.export_dir / f"user_{user_id}" / "export_state.json"
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def iter_new_rows(self, table: str, user_id: int, after_id: int) -> Iterator[tuple]:
+        """
+        Строки таблицы с id > after_id по возрастанию id
+
+        Каждая порция - отдельный короткий запрос по первичному ключу,
+        поэтому таблица не загружается в память и запись в БД не блокируется.
+        """
+        _, query = self.TABLES[table]
+        while True:
+            with self.db.get_connection() as conn:
+                batch = conn.execute(query, (user_id, after_id, self.batch_size)).fetchall()
+            for row in batch:
+                yield tuple(row)
+            if len(batch) < self.batch_size:
+                return
+            after_id = batch[-1][0]
+
+    def _export_table(self, user_dir: Path, table: str, user_id: int, after_id: int):
+        """Запись новых строк таблицы в файл-часть; возвращает (строк, последний id, путь)"""
+        columns, _ = self.TABLES[table]
+        rows = self.iter_new_rows(table, user_id, after_id)
+        first = next(rows, None)
+        if first is None:
+            return 0, after_id, None
+
+        table_dir = user_dir / table
+        table_dir.mkdir(parents=True, exist_ok=True)
+        path = table_dir / f"{table}_{first[0]:012d}.{self.fmt}"
+        tmp_path = path.with_name(path.name + ".tmp")
+        count, last_id = 0, after_id
+        try:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                if self.fmt == "csv":
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    write = writer.writerow
+                else:
+                    write = lambda row: f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+                for row in itertools.chain([first], rows):
+                    write(row)
+                    count += 1
+                    last_id = row[0]
+            os.replace(tmp_path, path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return count, last_id, path
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str):
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
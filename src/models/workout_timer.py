@@ -0,0 +1,160 @@
+# src/models/workout_timer.py
+import math
+import time
+from enum import Enum
+from typing import Callable, List, Optional, Tuple
+
+
+class TimerPhase(Enum):
+    """Этапы тренировки"""
+    IDLE = "idle"                  # Таймер не запущен
+    PREPARE = "prepare"            # Подготовка к первому подходу
+    WAIT_EXECUTE = "wait_execute"  # Выполнение подхода, ожидание нажатия 'Выполнено'
+    REST = "rest"                  # Отдых между подходами
+    FINISHED = "finished"          # Тренировка завершена
+
+
+class TimerEvent(Enum):
+    """События таймера, передаваемые подписчикам"""
+    PHASE_CHANGED = "phase_changed"  # Смена этапа (подписчик читает timer.phase)
+    COUNTDOWN = "countdown"          # Очередная секунда обратного отсчета перед подходом
+
+
+class WorkoutTimer:
+    """
+    Таймер тренировки без зависимости от Qt
+
+    Оставшееся и прошедшее время вычисляется от контрольных моментов
+    монотонных часов, а не подсчетом тиков, поэтому задержки GUI
+    (модальные диалоги, медленная запись в БД) не сдвигают таймер
+    и не искажают длительность подходов. Владелец вызывает tick()
+    с любой периодичностью - он только обнаруживает наступившие переходы.
+    """
+
+    def __init__(self, total_sets: int, rest_time: float, prepare_time: float = 10,
+                 countdown_time: int = 0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            total_sets: Количество подходов
+            rest_time: Время отдыха между подходами (сек)
+            prepare_time: Время подготовки к первому подходу (сек)
+            countdown_time: За сколько секунд до конца отдыха подавать сигналы отсчета
+            clock: Источник монотонного времени в секундах (подменяется в тестах)
+        """
+        self.total_sets = total_sets
+        self.rest_time = rest_time
+        self.prepare_time = prepare_time
+        self.countdown_time = countdown_time
+        self._clock = clock
+        self._listeners: List[Callable[[TimerEvent, "WorkoutTimer"], None]] = []
+        self.reset()
+
+    def reset(self):
+        """Сброс таймера в исходное состояние"""
+        self.phase = TimerPhase.IDLE
+        self.current_set = 1
+        self.completed_sets = 0
+        self.durations: List[float] = []
+        self._phase_started = None
+        self._deadline = None
+        self._last_countdown = None
+
+    def add_listener(self, listener: Callable[[TimerEvent, "WorkoutTimer"], None]):
+        """Подписка на события таймера"""
+        self._listeners.append(listener)
+
+    # ========== УПРАВЛЕНИЕ ==========
+
+    def start(self):
+        """Запуск тренировки с этапа подготовки"""
+        self.reset()
+        self._enter(TimerPhase.PREPARE, self._clock(), self.prepare_time)
+
+    def tick(self):
+        """Обработка переходов, наступивших к текущему моменту"""
+        now = self._clock()
+
+        if self.phase in (TimerPhase.PREPARE, TimerPhase.REST) and now >= self._deadline:
+            # Подход начинается в момент окончания отсчета, даже если tick опоздал
+            self._enter(TimerPhase.WAIT_EXECUTE, self._deadline)
+        elif self.phase == TimerPhase.REST and self.countdown_time:
+            seconds_left = math.ceil(self._deadline - now)
+            if seconds_left <= self.countdown_time and seconds_left != self._last_countdown:
+                self._last_countdown = seconds_left
+                self._notify(TimerEvent.COUNTDOWN)
+
+    def complete_set(self) -> Tuple[int, float]:
+        """
+        Завершение текущего подхода (нажатие 'Выполнено')
+
+        Длительность фиксируется в момент вызова. После последнего подхода
+        тренировка завершается, иначе начинается отдых.
+
+        Returns:
+            (номер подхода, длительность в секундах)
+        """
+        if self.phase != TimerPhase.WAIT_EXECUTE:
+            raise RuntimeError(f"Подход нельзя завершить на этапе {self.phase.value}")
+
+        now = self._clock()
+        set_number = self.current_set
+        duration = now - self._phase_started
+        self.durations.append(duration)
+        self.completed_sets = set_number
+
+        if set_number >= self.total_sets:
+            self._enter(TimerPhase.FINISHED, now)
+        else:
+            self.current_set += 1
+            self._enter(TimerPhase.REST, now, self.rest_time)
+        return set_number, duration
+
+    def stop(self):
+        """Досрочная остановка тренировки"""
+        if self.phase not in (TimerPhase.IDLE, TimerPhase.FINISHED):
+            self._enter(TimerPhase.FINISHED, self._clock())
+
+    # ========== СОСТОЯНИЕ ==========
+
+    @property
+    def is_running(self) -> bool:
+        return self.phase not in (TimerPhase.IDLE, TimerPhase.FINISHED)
+
+    @property
+    def remaining(self) -> float:
+        """Оставшееся время обратного отсчета (сек)"""
+        if self._deadline is None:
+            return 0.0
+        return max(0.0, self._deadline - self._clock())
+
+    @property
+    def elapsed(self) -> float:
+        """Время с начала текущего этапа (сек)"""
+        if self._phase_started is None:
+            return 0.0
+        return max(0.0, self._clock() - self._phase_started)
+
+    @property
+    def display_seconds(self) -> int:
+        """Значение для отображения: отсчет вниз на подготовке и отдыхе, вверх при выполнении"""
+        if self.phase in (TimerPhase.PREPARE, TimerPhase.REST):
+            return math.ceil(self.remaining)
+        if self.phase == TimerPhase.WAIT_EXECUTE:
+            return int(self.elapsed)
+        if self.phase == TimerPhase.IDLE:
+            return math.ceil(self.prepare_time)
+        return 0
+
+    # ========== ВНУТРЕННИЕ МЕТОДЫ ==========
+
+    def _enter(self, phase: TimerPhase, started: float, duration: Optional[float] = None):
+        """Переход на этап, начавшийся в момент started"""
+        self.phase = phase
+        self._phase_started = started
+        self._deadline = started + duration if duration is not None else None
+        self._last_countdown = None
+        self._notify(TimerEvent.PHASE_CHANGED)
+
+    def _notify(self, event: TimerEvent):
+        for listener in self._listeners:
+            listener(event, self)
@@ -0,0 +1,163 @@
+# src/startup_profiler.py
+"""
+Профилирование запуска приложения (--profile-startup)
+
+Приложение перезапускается в дочернем процессе с python -X importtime.
+Дочерний процесс отмечает этапы запуска до первой отрисовки главного окна,
+печатает их и завершается; родительский процесс разбирает время импортов
+из stderr, печатает отчет и возвращает код 1, если запуск дольше бюджета.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_FLAG = "--profile-startup"
+BUDGET_FLAG = "--startup-budget"
+CHILD_ENV = "TRAINING_APP_PROFILE_CHILD"
+REPORT_PREFIX = "STARTUP_PROFILE "
+
+
+class StartupTimeline:
+    """Отметки этапов запуска (мс от создания)"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._last = self._start
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, name: str):
+        """Завершение этапа name"""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def total_ms(self) -> float:
+        return (self._last - self._start) * 1000
+
+
+# Создается при первом импорте модуля (в самом начале main)
+timeline = StartupTimeline()
+
+
+def is_profile_requested(argv: List[str]) -> bool:
+    return PROFILE_FLAG in argv and not is_profile_child()
+
+
+def is_profile_child() -> bool:
+    return os.environ.get(CHILD_ENV) == "1"
+
+
+def parse_budget(argv: List[str], default_ms: float) -> float:
+    """Бюджет запуска из --startup-budget=МС или --startup-budget МС"""
+    for index, arg in enumerate(argv):
+        if arg.startswith(BUDGET_FLAG + "="):
+            return float(arg.split("=", 1)[1])
+        if arg == BUDGET_FLAG and index + 1 < len(argv):
+            return float(argv[index + 1])
+    return default_ms
+
+
+def install_first_paint_hook(window, app):
+    """
+    Дочерний процесс: отметка первой отрисовки окна, печать этапов и выход
+
+    Отчет печатается в следующей итерации цикла событий, когда кадр уже отрисован.
+    """
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and not self.painted:
+                self.painted = True
+                timeline.mark("first_paint")
+                QTimer.singleShot(0, finish)
+            return False
+
+    def finish():
+        report = {"phases": timeline.phases, "total_ms": timeline.total_ms}
+        print(REPORT_PREFIX + json.dumps(report), flush=True)
+        app.exit(0)
+
+    paint_filter = FirstPaintFilter(window)
+    paint_filter.painted = False
+    window.installEventFilter(paint_filter)
+
+
+def parse_import_times(stderr: str) -> List[Dict]:
+    """Строки 'import time: self [us] | cumulative | imported package' из -X importtime"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # строка заголовка
+        name = parts[2].rstrip()
+        imports.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": self_us / 1000,
+            "cumulative_ms": cumulative_us / 1000,
+        })
+    return imports
+
+
+def run_profile(argv: List[str], budget_ms: float, top: int = 15) -> int:
+    """
+    Родительский процесс: запуск приложения под -X importtime и отчет
+
+    Returns:
+        Код завершения: 0 - запуск уложился в бюджет, 1 - превышение, 2 - ошибка
+    """
+    env = dict(os.environ, **{CHILD_ENV: "1"})
+    command = [sys.executable, "-X", "importtime", *argv]
+    started = time.perf_counter()
+    process = subprocess.run(command, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    report = _find_report(process.stdout)
+    if report is None:
+        print(f"Профилирование не удалось (код {process.returncode})")
+        print(process.stderr[-2000:])
+        return 2
+
+    imports = parse_import_times(process.stderr)
+    top_level = [item for item in imports if item["depth"] == 0]
+
+    print("=" * 60)
+    print("Профиль запуска (до первой отрисовки окна)")
+    print("=" * 60)
+    print(f"{'Этап':<30}{'мс':>10}")
+    for name, elapsed_ms in report["phases"]:
+        print(f"{name:<30}{elapsed_ms:>10.1f}")
+    print(f"{'Итого до первой отрисовки':<30}{report['total_ms']:>10.1f}")
+    print(f"{'Процесс целиком (с выходом)':<30}{wall_ms:>10.1f}")
+
+    print()
+    print(f"Импорты верхнего уровня (всего {sum(i['cumulative_ms'] for i in top_level):.1f} мс):")
+    for item in sorted(top_level, key=lambda i: i["cumulative_ms"], reverse=True)[:top]:
+        print(f"  {item['module']:<40}{item['cumulative_ms']:>10.1f}")
+    print("Самые медленные модули (собственное время):")
+    for item in sorted(imports, key=lambda i: i["self_ms"], reverse=True)[:top]:
+        print(f"  {item['module']:<40}{item['self_ms']:>10.1f}")
+
+    print()
+    over_budget = report["total_ms"] > budget_ms
+    status = "ПРЕВЫШЕН" if over_budget else "в пределах"
+    print(f"Бюджет запуска {budget_ms:.0f} мс: {status} ({report['total_ms']:.1f} мс)")
+    return 1 if over_budget else 0
+
+
+def _find_report(stdout: str) -> Optional[dict]:
+    for line in stdout.splitlines():
+        if line.startswith(REPORT_PREFIX):
+            return json.loads(line[len(REPORT_PREFIX):])
+    return None
@@ -1,4 +1,12 @@
 # src/views/__init__.py
-from .main_window import MainWindow
+# Главное окно загружается при обращении, диалоги - при первом показе
+
+
+def __getattr__(name):
+    if name == 'MainWindow':
+        from .main_window import MainWindow
+        return MainWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['MainWindow']
\ No newline at end of file
@@ -8,9 +8,12 @@ from PyQt6.QtCore import Qt
 class LoginDialog(QDialog):
     """Диалог входа"""
     
-    def __init__(self, auth_controller, parent=None):
+    def __init__(self, auth_controller, parent=None, data_service=None):
         super().__init__(parent)
         self.auth_controller = auth_controller
+        # Проверка пароля намеренно медленная, поэтому выполняется в потоке БД
+        self.data_service = data_service
+        self._busy = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -75,17 +78,41 @@ class LoginDialog(QDialog):
         password = self.password_input.text()
         remember_me = self.remember_checkbox.isChecked()
         
-        result = self.auth_controller.login(email, password, remember_me)
-        
+        if self.data_service is None:
+            self.on_login_finished(self.auth_controller.login(email, password, remember_me))
+            return
+
+        self.set_busy(True)
+        self.data_service.submit(
+            self.auth_controller.login, email, password, remember_me,
+            callback=self.on_login_finished
+        )
+
+    def on_login_finished(self, result):
+        """Обработка результата входа"""
+        self.set_busy(False)
         if result["success"]:
             QMessageBox.information(self, "Успешно", result["message"])
             self.accept()  # Закрываем диалог с успехом
         else:
             QMessageBox.warning(self, "Ошибка", result["message"])
     
+    def set_busy(self, busy: bool):
+        """Блокировка формы на время проверки пароля"""
+        self._busy = busy
+        for widget in (self.email_input, self.password_input, self.remember_checkbox,
+                       self.login_button, self.cancel_button, self.register_link):
+            widget.setEnabled(not busy)
+        self.login_button.setText("Проверка..." if busy else "Войти")
+
+    def reject(self):
+        # Пока идет проверка, диалог не закрывается: результат придет в этот диалог
+        if not self._busy:
+            super().reject()
+
     def show_register(self):
         """Показать форму регистрации"""
         from .register_dialog import RegisterDialog
-        register_dialog = RegisterDialog(self.auth_controller, self)
+        register_dialog = RegisterDialog(self.auth_controller, self, data_service=self.data_service)
         self.reject()  # Закрываем текущее окно
         register_dialog.exec()
\ No newline at end of file
@@ -3,9 +3,10 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLabel, QPushButton, QMenuBar, QMenu, QStatusBar, QToolBar,
     QMessageBox, QTabWidget, QListWidget, QListWidgetItem,
-    QTableWidget, QTableWidgetItem, QHeaderView, QSplitter,
+    QHeaderView, QSplitter,
     QTextEdit, QFrame, QGroupBox, QSizePolicy, QSpacerItem,
-    QDialog, QApplication, QStackedWidget, QLineEdit, QSpinBox, QInputDialog
+    QDialog, QApplication, QStackedWidget, QLineEdit, QSpinBox, QInputDialog,
+    QTableView, QAbstractItemView, QFileDialog, QProgressDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QSize, QSettings, QThread
 from PyQt6.QtGui import QAction, QIcon, QFont, QColor, QPixmap
@@ -14,12 +15,15 @@ import sys
 from datetime import datetime, timezone
 from pathlib import Path
 import threading
-import winsound
 
 # Добавляем путь для импорта config
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from config import Config
+from controllers.data_service import DataAccessService, EventLoopProbe
+from models.workout_timer import WorkoutTimer, TimerPhase, TimerEvent
+from models.snapshots import BackupScheduler
+from views.table_models import PagedTableModel, TableColumn, format_duration, format_value
 
 
 class MainWindow(QMainWindow):
@@ -38,15 +42,29 @@ class MainWindow(QMainWindow):
         self.auth_controller = auth_controller
         self.exercise_controller = exercise_controller
         self.workout_controller = workout_controller
+
+        # Запросы к БД выполняются в отдельном потоке, результат приходит в callback
+        self.data_service = DataAccessService(self)
+        self.async_auth = self.data_service.wrap(auth_controller)
+        self.async_exercises = self.data_service.wrap(exercise_controller)
+        self.async_workouts = self.data_service.wrap(workout_controller)
+        self.loop_probe = EventLoopProbe(parent=self) if self.config.DEBUG else None
+
         self.current_user = None
         self.current_exercise = None
         self.current_workout = None
         self.beep_thread = BeepThread(frequency=1000, duration=200)
+        self.workout_timer = None
+        self.timer_active = False
         self.last_reps = 0
         # self.workout_history = None
         
         # Настройки приложения
         self.settings = QSettings("TrainingApp", "TrainingApp")
+
+        # Автоматические снимки БД (настройка auto_backup диалога настроек)
+        self.backup_scheduler = BackupScheduler(auth_controller.db)
+        self.apply_backup_settings()
         
         # Инициализация UI
         self.setup_ui()
@@ -240,8 +258,14 @@ class MainWindow(QMainWindow):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Поиск упражнений...")
-        self.search_input.textChanged.connect(self.filter_exercises)
         filter_layout.addWidget(self.search_input)
+
+        # Поиск выполняется после паузы в наборе текста
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.config.SEARCH_DEBOUNCE_INTERVAL)
+        self.search_timer.timeout.connect(self.filter_exercises)
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         layout.addLayout(filter_layout)
         
@@ -368,9 +392,18 @@ class MainWindow(QMainWindow):
         history_group = QGroupBox("Последние выполнения упражнения")
         history_layout = QVBoxLayout()
         
-        self.history_table = QTableWidget()
-        self.history_table.setColumnCount(3)
-        self.history_table.setHorizontalHeaderLabels(["Подход", "Повторений", "Длительность"])
+        # Текст ячеек форматируется моделью только для видимых строк
+        self.history_model = PagedTableModel(
+            columns=[
+                TableColumn("Подход", lambda r: format_value(r['set_number'])),
+                TableColumn("Повторений", lambda r: format_value(r['reps'])),
+                TableColumn("Длительность", lambda r: format_duration(r['duration'])),
+            ],
+            parent=self
+        )
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
+        self.history_table.verticalHeader().setVisible(False)
         self.history_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         # self.history_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
 
@@ -383,14 +416,14 @@ class MainWindow(QMainWindow):
             header.setMinimumSectionSize(min_width)
         
         # Установить начальные ширины (равны минимальным или больше)
-        for i in range(self.history_table.columnCount()):
+        for i in range(self.history_model.columnCount()):
             self.history_table.setColumnWidth(i, min_widths[i])
         
         # for i in range(self.history_table.columnCount()):
         #     header.setSectionResizeMode(i, QHeaderView.ResizeMode.Interactive)
 
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.history_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.history_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         
         history_layout.addWidget(self.history_table)
         history_group.setLayout(history_layout)
@@ -540,6 +573,10 @@ class MainWindow(QMainWindow):
         
         file_menu.addSeparator()
         
+        self.import_history_action = QAction("&Импорт истории...", self)
+        self.import_history_action.triggered.connect(self.import_history)
+        file_menu.addAction(self.import_history_action)
+        
         self.settings_action = QAction("&Настройки", self)
         self.settings_action.triggered.connect(self.show_settings_dialog)
         file_menu.addAction(self.settings_action)
@@ -686,7 +723,15 @@ class MainWindow(QMainWindow):
         
         # Сохранение текущей темы
         self.settings.setValue("dark_mode", self.dark_mode_action.isChecked())
-        
+
+        # Записываем незавершенные подходы (после всех поставленных запросов),
+        # останавливаем фоновые потоки и закрываем пул соединений
+        self.data_service.call(self.workout_controller.flush_results)
+        self.data_service.shutdown()
+        self.auth_controller.stop_session_sweeper()
+        self.backup_scheduler.stop()
+        self.auth_controller.db.close()
+
         event.accept()
     
     def update_user_display(self):
@@ -712,7 +757,7 @@ class MainWindow(QMainWindow):
             self.stacked_widget.setCurrentIndex(1)  # Детали тренировки
             
             # Загружаем статистику
-            # self.load_user_stats()
+            self.load_user_stats()
         else:
             self.user_info_label.setText("Не авторизован")
             self.user_stats_label.setText("")
@@ -747,19 +792,31 @@ class MainWindow(QMainWindow):
         if not self.current_user:
             return
         
+        # При активном поиске список перезагружается с учетом запроса
+        if self.search_input.text().strip():
+            self.filter_exercises()
+            return
+
         # Загрузка тренировок
-        result = self.exercise_controller.get_user_exercises(self.current_user['id'])
-        
+        self.async_exercises.get_user_exercises(
+            self.current_user['id'],
+            callback=self.on_user_exercises_loaded
+        )
+
+        # self.load_exercise_history()
+
+    def on_user_exercises_loaded(self, result):
+        """Обработка загруженного списка тренировок"""
         if result["success"]:
             self.exercises = result["exercises"]
             self.update_exercises_list()
         else:
             self.show_error_message("Ошибка загрузки тренировок", result["message"])
-
-        # self.load_exercise_history()
     
     def update_exercises_list(self):
         """Обновление списка тренировок"""
+        selected_id = self.current_exercise['id'] if self.current_exercise else None
+        self.exercises_list.blockSignals(True)
         self.exercises_list.clear()
         
         for exercise in self.exercises:
@@ -780,14 +837,41 @@ class MainWindow(QMainWindow):
             #     item.setBackground(QColor("#fefcbf"))  # Светло-желтый для приватных
             
             self.exercises_list.addItem(item)
+            if exercise['id'] == selected_id:
+                item.setSelected(True)
+
+        self.exercises_list.blockSignals(False)
+        has_selection = bool(self.exercises_list.selectedItems())
+        self.edit_exercise_btn.setEnabled(has_selection)
+        self.delete_exercise_btn.setEnabled(has_selection)
     
     def filter_exercises(self):
-        """Фильтрация списка тренировок"""
-        search_text = self.search_input.text().lower()
-        
-        for i in range(self.exercises_list.count()):
-            item = self.exercises_list.item(i)
-            item.setHidden(search_text not in item.text().lower())
+        """Фильтрация списка тренировок (полнотекстовый поиск по названию и описанию)"""
+        if not self.current_user:
+            return
+
+        # Очищенное поле поиска возвращает полный список упражнений
+        if not self.search_input.text().strip():
+            self.load_user_data()
+            return
+
+        self.async_exercises.search_exercises(
+            self.current_user['id'],
+            self.search_input.text(),
+            callback=self.on_exercises_found
+        )
+
+    def on_exercises_found(self, result):
+        """Обработка результатов поиска упражнений"""
+        # Ответ на устаревший запрос (текст уже изменился) не показываем
+        if not result["success"]:
+            self.show_error_message("Ошибка поиска упражнений", result["message"])
+            return
+        if result["query"] != self.search_input.text():
+            return
+
+        self.exercises = result["exercises"]
+        self.update_exercises_list()
     
     def on_exercise_selected(self):
         """Обработка выбора тренировки"""
@@ -806,27 +890,46 @@ class MainWindow(QMainWindow):
     def on_exercise_double_clicked(self, item):
         """Обработка двойного клика по тренировке"""
         exercise_id = item.data(Qt.ItemDataRole.UserRole)
-        self.load_exercise_details(exercise_id)
-        self.start_exercise()
+        # Запуск после загрузки деталей упражнения
+        self.load_exercise_details(exercise_id, on_loaded=self.start_exercise)
 
     def on_workout_finished(self):
         """Обработка окончания тренировки"""
         exercise_id = self.current_exercise['id']
         self.load_exercise_history(exercise_id)
+        self.load_user_stats()
+        self.export_stats_if_enabled()
+
+    def export_stats_if_enabled(self):
+        """Выгрузка новых тренировок и подходов (настройка auto_export)"""
+        settings = QSettings(self.config.ORGANIZATION, self.config.APP_NAME)
+        if not self.current_user or not settings.value('workouts/auto_export', False, type=bool):
+            return
+
+        def on_result(result):
+            if not result["success"]:
+                self.status_bar.showMessage(result["message"], 5000)
+
+        # Ставится в очередь потока БД после записи подходов тренировки
+        self.async_workouts.export_stats(self.current_user['id'], callback=on_result)
     
-    def load_exercise_details(self, exercise_id: int):
+    def load_exercise_details(self, exercise_id: int, on_loaded=None):
         """Загрузка деталей выбранной тренировки"""
-        result = self.exercise_controller.get_exercise_by_id(
+        def on_result(result):
+            if result["success"]:
+                self.current_exercise = result["exercise"]
+                self.update_exercise_details()
+                self.load_exercise_history(exercise_id)
+                if on_loaded:
+                    on_loaded()
+            else:
+                self.show_error_message("Ошибка загрузки", result["message"])
+
+        self.async_exercises.get_exercise_by_id(
             exercise_id, 
-            self.current_user['id']
+            self.current_user['id'],
+            callback=on_result
         )
-        
-        if result["success"]:
-            self.current_exercise = result["exercise"]
-            self.update_exercise_details()
-            self.load_exercise_history(exercise_id)
-        else:
-            self.show_error_message("Ошибка загрузки", result["message"])
     
     def update_exercise_details(self):
         """Обновление отображения деталей тренировки"""
@@ -858,8 +961,14 @@ class MainWindow(QMainWindow):
         """Загрузка данных последней тренировки для данного упражнения"""
         if not exercise_id: return      
 
-        result = self.workout_controller.get_exercise_history(self.current_user['id'], exercise_id)
-        
+        self.async_workouts.get_exercise_history(
+            self.current_user['id'],
+            exercise_id,
+            callback=self.on_exercise_history_loaded
+        )
+
+    def on_exercise_history_loaded(self, result):
+        """Обработка загруженной истории упражнения"""
         if result["success"]:
             self.update_history_table(result["history"])
         else:
@@ -867,48 +976,8 @@ class MainWindow(QMainWindow):
     
     def update_history_table(self, history):
         """Обновление таблицы истории"""
-        if not history:
-            self.history_table.setRowCount(0)
-            return
-        self.history_table.setRowCount(len(history))
-        
-        for row, record in enumerate(history):
-            # # Дата
-            # utc_time_str = record.get('created_at', '')
-            #  # Парсим UTC время
-            # utc_dt = datetime.strptime(utc_time_str, "%Y-%m-%d %H:%M:%S")
-            # utc_dt = utc_dt.replace(tzinfo=timezone.utc)
-            
-            # # Конвертируем в локальное
-            # local_dt = utc_dt.astimezone()
-            
-            # # Форматируем для отображения
-            # display_time = local_dt.strftime("%d.%m.%Y %H:%M")
-
-            # date_item = QTableWidgetItem(display_time)
-            # self.history_table.setItem(row, 0, date_item)            
-           
-            # # Наименование тренировки
-            # name_item = QTableWidgetItem(record.get('name', ''))
-            # self.history_table.setItem(row, 1, name_item)
-
-            # Подход
-            sets_item = QTableWidgetItem(str(record.get('set_number', '')))
-            sets_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.history_table.setItem(row, 0, sets_item)
-
-            # Число повторений
-            reps_item = QTableWidgetItem(str(record.get('reps', '')))
-            reps_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.history_table.setItem(row, 1, reps_item)
-
-            # Длительность
-            duration = record.get('duration', 0)
-            minutes = duration // 60
-            seconds = duration % 60
-            duration_item = QTableWidgetItem(f"{minutes}:{seconds:02d}")
-            duration_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.history_table.setItem(row, 2, duration_item)
+        # Подходы одной тренировки - небольшой список, загружается целиком
+        self.history_model.set_rows(history)
 
     
     def load_user_stats(self):
@@ -916,8 +985,13 @@ class MainWindow(QMainWindow):
         if not self.current_user:
             return
         
-        result = self.exercise_controller.get_user_stats(self.current_user['id'])
-        
+        self.async_workouts.get_user_stats(
+            self.current_user['id'],
+            callback=self.on_user_stats_loaded
+        )
+
+    def on_user_stats_loaded(self, result):
+        """Обработка загруженной статистики пользователя"""
         if result["success"]:
             stats = result["stats"]["total"]
             total_sessions = stats.get('total_sessions', 0)
@@ -937,7 +1011,7 @@ class MainWindow(QMainWindow):
         """Показать диалог входа"""
         from views.login_dialog import LoginDialog
         
-        dialog = LoginDialog(self.auth_controller, self)
+        dialog = LoginDialog(self.auth_controller, self, data_service=self.data_service)
         if dialog.exec():
             self.current_user = self.auth_controller.get_current_user()
             self.update_user_display()
@@ -948,7 +1022,7 @@ class MainWindow(QMainWindow):
         """Показать диалог регистрации"""
         from views.register_dialog import RegisterDialog
         
-        dialog = RegisterDialog(self.auth_controller, self)
+        dialog = RegisterDialog(self.auth_controller, self, data_service=self.data_service)
         if dialog.exec():
             self.current_user = self.auth_controller.get_current_user()
             self.update_user_display()
@@ -959,7 +1033,10 @@ class MainWindow(QMainWindow):
         """Показать диалог профиля"""
         from views.profile_dialog import ProfileDialog
         
-        dialog = ProfileDialog(self.auth_controller, self.workout_controller, self.current_user, self)
+        dialog = ProfileDialog(
+            self.auth_controller, self.workout_controller, self.current_user, self,
+            data_service=self.data_service
+        )
 
         if dialog.exec():
             # Обновляем данные пользователя
@@ -993,15 +1070,23 @@ class MainWindow(QMainWindow):
         )        
         if reply == QMessageBox.StandardButton.Yes:
             self.stop_timer()
-            if self.current_workout['work_time'] == 0:
-                result = self.workout_controller.delete_workout(self.current_workout['id'], self.current_user['id'])  
-                if result["success"]:
-                    self.status_bar.showMessage("Тренировка без выполненных подходов удалена", 3000)
-                else:
-                    self.show_error_message("Ошибка удаления тренировки", result["message"])
+            # Пустую тренировку удаляет поток БД после записи всех поставленных подходов
+            if self.current_workout:
+                self.async_workouts.finish_workout(
+                    self.current_workout['id'],
+                    self.current_user['id'],
+                    callback=self.on_stopped_workout_finished
+                )
 
             # self.current_workout = None
             self.workout_finished.emit()
+
+    def on_stopped_workout_finished(self, result):
+        """Обработка завершения остановленной тренировки (удаление, если подходов нет)"""
+        if not result["success"]:
+            self.show_error_message("Ошибка завершения тренировки", result["message"])
+        elif result["deleted"]:
+            self.status_bar.showMessage(result["message"], 3000)
     
     def create_new_exercise(self):
         """Создание новой тренировки"""
@@ -1009,7 +1094,7 @@ class MainWindow(QMainWindow):
             self.show_login_dialog()
             return
         
-        from src.views.exercise_dialog import exerciseDialog
+        from views.exercise_dialog import exerciseDialog
         
         dialog = exerciseDialog(
             exercise_controller=self.exercise_controller,
@@ -1035,7 +1120,7 @@ class MainWindow(QMainWindow):
         )
         
         if result["success"]:
-            from src.views.exercise_dialog import exerciseDialog
+            from views.exercise_dialog import exerciseDialog
             
             dialog = exerciseDialog(
                 exercise_controller=self.exercise_controller,
@@ -1104,21 +1189,25 @@ class MainWindow(QMainWindow):
         self.exercise_started.emit(self.current_exercise)
 
         # self.create_workout()        
-        result = self.workout_controller.create_workout(
+        self.current_workout = None
+        self.async_workouts.create_workout(
             user_id=self.current_user['id'],
             exercise_id=self.current_exercise['id'],
             name=self.current_exercise['name'],
             work_time=0,
             rest_time=self.current_exercise['rest_time'],
             reps=self.current_exercise['reps'],
-            sets=self.current_exercise['sets']          
+            sets=self.current_exercise['sets'],
+            callback=self.on_workout_created
         )
-        
+
+    def on_workout_created(self, result):
+        """Обработка создания тренировки"""
         if result["success"]:
+            self.current_workout = result["workout"]
             self.status_bar.showMessage("Тренировка создана", 3000)
         else:
             self.show_error_message("Ошибка сохранения", result["message"])
-        self.current_workout = self.workout_controller.get_current_workout()
     
     def initialize_timer(self):
         """Инициализация таймера"""
@@ -1129,16 +1218,16 @@ class MainWindow(QMainWindow):
         self.total_sets = self.current_exercise['sets']
         self.preparation_time = self.current_exercise['prepare_time']
         self.rest_time = self.current_exercise['rest_time']
-        self.current_set = 1
-        self.current_time = 10
-        self.is_preparation = False
-        self.is_resting = False
-        self.is_running = False
-
 
-        # Сброс таймера
-        # self.remaining_time = 10
-        self.is_running = False
+        # Движок таймера: подготовка к первому подходу 10 сек,
+        # сигналы отсчета за prepare_time секунд до конца отдыха
+        self.workout_timer = WorkoutTimer(
+            total_sets=self.total_sets,
+            rest_time=self.rest_time,
+            prepare_time=10,
+            countdown_time=self.preparation_time
+        )
+        self.workout_timer.add_listener(self.on_timer_event)
         
         # Обновляем отображение
         self.update_timer_display()
@@ -1152,30 +1241,40 @@ class MainWindow(QMainWindow):
         self.phase_info_label.setText("Этап: Подготовка")
         self.progress_bar.setVisible(False)
         self.progress_bar.setValue(0)
+
+    @property
+    def is_running(self) -> bool:
+        """Тренировка выполняется"""
+        return self.workout_timer is not None and self.workout_timer.is_running
     
     def start_timer(self):
         """Запуск таймера"""
         if not self.is_running:
-            self.is_running = True
-            self.current_set = 0
-            
             # Начинаем с подготовки
-            self.is_preparation = True
-            self.is_waiting_for_execute = False
-            self.is_resting = False
-            self.current_time = 10 
-            self.current_set += 1
+            self.workout_timer.start()
+            self.timer_active = True
             
-            # Создаем таймер
+            # Таймер только обновляет экран и опрашивает движок,
+            # время отсчитывается по монотонным часам
             self.timer = QTimer()
             self.timer.timeout.connect(self.update_timer)
-            self.timer.start(1000)  # 1 секунда
+            self.timer.start(self.config.TIMER_UPDATE_INTERVAL)
+
+            # Периодическая запись буфера подходов
+            self.flush_timer = QTimer()
+            self.flush_timer.timeout.connect(self.flush_workout_results)
+            self.flush_timer.start(self.config.HISTORY_FLUSH_INTERVAL)
+
+            # Замер задержек цикла событий во время тренировки (отладка)
+            if self.loop_probe:
+                self.loop_probe.start()
             
             # Обновляем кнопки
             self.start_timer_btn.setEnabled(False)
             # self.execute_btn.setEnabled(True)
             self.stop_timer_btn.setEnabled(True)
             self.progress_bar.setVisible(True)
+            self.update_timer_display()
     
     def show_simple_spin_dialog(self, default_value=1):
         dialog = QDialog(self)
@@ -1249,28 +1348,20 @@ class MainWindow(QMainWindow):
     def execute_action(self):
         """Обработка нажатия кнопки 'Выполнено'"""
         if self.is_running:
+            # Длительность фиксируется в момент нажатия, до открытия диалога
+            current_set, duration = self.workout_timer.complete_set()
+            self.execute_btn.setEnabled(False)
+
             new_value = self.last_reps if self.last_reps > 0 else self.current_exercise['reps']           
             reps = self.show_simple_spin_dialog(new_value)
 
-            self.progress_bar.setValue(self.current_set/self.total_sets*100)
-            self.save_exercise_result(self.current_set, reps, self.current_time)
+            self.progress_bar.setValue(current_set/self.total_sets*100)
+            self.save_exercise_result(current_set, reps, round(duration))
             self.last_reps = reps
 
-            if self.current_set + 1 > self.total_sets:
+            if current_set >= self.total_sets:
                 # Завершаем тренировку
                 self.stop_timer()
-            elif self.is_waiting_for_execute:
-                # Завершаем фазу выполнения и начинаем отдых
-                self.current_set += 1
-                self.is_waiting_for_execute = False
-                self.is_resting = True
-                self.current_time = self.rest_time
-                
-                self.execute_btn.setEnabled(False)
-                # self.phase_info_label.setText("Этап: Отдых")                
-                # self.update_set_info()
-            
-            self.execute_btn.setEnabled(False)
 
 
    
@@ -1289,9 +1380,16 @@ class MainWindow(QMainWindow):
     
     def stop_timer(self):
         """Остановка таймера"""
-        if self.is_running:
+        if self.timer_active:
             self.timer.stop()
-            self.is_running = False
+            self.flush_timer.stop()
+            self.workout_timer.stop()
+            self.timer_active = False
+            if self.loop_probe:
+                self.loop_probe.stop()
+
+            # Записываем оставшиеся подходы и итоги тренировки
+            self.flush_workout_results()
             # self.is_paused = False
             
             # Сброс кнопок
@@ -1302,10 +1400,10 @@ class MainWindow(QMainWindow):
             self.exercises_list.setEnabled(True)
             
             self.timer_status_label.setText("Тренировка завершена")
-            self.phase_info_label.setText(f"Этап: выполнено {self.current_set} из {self.total_sets}")
-            
-            # # Сохранение результата
-            # self.save_exercise_result(self.current_set, self.current_exercise['cycles'], self.current_time)
+            self.phase_info_label.setText(
+                f"Этап: выполнено {self.workout_timer.completed_sets} из {self.total_sets}"
+            )
+            self.update_timer_display()
             
             # Возврат к деталям тренировки
             QTimer.singleShot(2000, lambda: self.stacked_widget.setCurrentIndex(1))
@@ -1316,54 +1414,36 @@ class MainWindow(QMainWindow):
         """Обновление таймера"""
         if not self.is_running:
             return
+        # Движок сам определяет наступившие переходы и сообщает о них событиями
+        self.workout_timer.tick()
         self.update_timer_display()
 
-        if self.is_preparation:
-            # Фаза подготовки
-            if self.current_time > 0:
-                self.current_time -= 1
-                self.timer_status_label.setText(f"Подготовка...")
-                self.phase_info_label.setText(f"Этап: Подготовка к подходу {self.current_set} из {self.total_sets}")
-            else:
-                # Завершение подготовки, переход к ожиданию выполнения
-                self.is_preparation = False
-                self.is_waiting_for_execute = True
-
-                self.beep_thread.duration = 600
-                self.beep_thread.start()
-
-                self.current_time = 0
-                self.execute_btn.setEnabled(True)            
-        elif self.is_resting:
-            # Фаза отдыха
-            if self.current_time > 1:
-                if self.preparation_time >= self.current_time:
-                    self.beep_thread.duration = 200
-                    self.beep_thread.start()
-                self.current_time -= 1
-                self.timer_status_label.setText(f"Отдых...")
-                self.phase_info_label.setText(f"Этап: Подготовка к подходу {self.current_set} из {self.total_sets}")
-            else:
-                # Завершение отдыха, переход к ожиданию выполнения
-                self.beep_thread.duration = 600
-                self.beep_thread.start()
-               
-                self.is_resting = False
-                self.is_waiting_for_execute = True
-                self.current_time = 0
-                self.execute_btn.setEnabled(True)                   
-        elif self.is_waiting_for_execute:
-            # Время ожидания нажатия кнопки "Выполнено"
-            self.current_time += 1  # Увеличиваем время от 0
-            self.timer_status_label.setText(f"Сделал - жми 'Выполнено'!")
-            self.phase_info_label.setText(f"Этап: тренировка (подход {self.current_set} из {self.total_sets})")            
-        # self.update_timer_display()
+    def on_timer_event(self, event: TimerEvent, timer: WorkoutTimer):
+        """Обработка событий движка таймера"""
+        if event == TimerEvent.COUNTDOWN:
+            self.beep_thread.duration = 200
+            self.beep_thread.start()
+            return
 
+        if timer.phase == TimerPhase.PREPARE:
+            self.timer_status_label.setText("Подготовка...")
+            self.phase_info_label.setText(f"Этап: Подготовка к подходу {timer.current_set} из {self.total_sets}")
+        elif timer.phase == TimerPhase.REST:
+            self.timer_status_label.setText("Отдых...")
+            self.phase_info_label.setText(f"Этап: Подготовка к подходу {timer.current_set} из {self.total_sets}")
+        elif timer.phase == TimerPhase.WAIT_EXECUTE:
+            # Начало подхода
+            self.beep_thread.duration = 600
+            self.beep_thread.start()
+            self.execute_btn.setEnabled(True)
+            self.timer_status_label.setText("Сделал - жми 'Выполнено'!")
+            self.phase_info_label.setText(f"Этап: тренировка (подход {timer.current_set} из {self.total_sets})")
 
     def update_timer_display(self):
         """Обновление отображения таймера"""
-        minutes = self.current_time // 60
-        seconds = self.current_time % 60
+        current_time = self.workout_timer.display_seconds
+        minutes = current_time // 60
+        seconds = current_time % 60
         self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
     
     def save_exercise_result(self, current_set, reps, duration):
@@ -1371,20 +1451,29 @@ class MainWindow(QMainWindow):
         if not self.current_user or not self.current_exercise or not self.current_workout:
             return
         
-        result = self.workout_controller.save_workout_result(current_set, reps, duration)
-        
+        # Подход попадает в буфер, итоги тренировки контроллер обновляет сам
+        self.async_workouts.save_workout_result(
+            current_set, reps, duration,
+            callback=self.on_exercise_result_saved
+        )
+
+        # self.load_exercise_history()
+
+    def on_exercise_result_saved(self, result):
+        """Обработка сохранения результата подхода"""
         if result["success"]:
             self.status_bar.showMessage("Результат сохранен", 3000)
         else:
             self.show_error_message("Ошибка сохранения", result["message"])
 
-        # Обновляем тренировку
-        self.current_workout['work_time'] = self.current_workout['work_time'] + duration
-        self.current_workout['reps'] = self.current_workout['reps'] + reps
-        self.current_workout['sets'] = self.current_set
-        result = self.workout_controller.update_workout(**self.current_workout)
+    def flush_workout_results(self):
+        """Запись накопленных подходов в БД"""
+        self.async_workouts.flush_results(callback=self.on_workout_results_flushed)
 
-        # self.load_exercise_history()
+    def on_workout_results_flushed(self, result):
+        """Обработка записи накопленных подходов"""
+        if not result["success"]:
+            self.show_error_message("Ошибка сохранения", result["message"])
     
     def on_exercise_saved(self, exercise_data):
         """Обработка сохранения тренировки"""
@@ -1403,10 +1492,71 @@ class MainWindow(QMainWindow):
         from views.settings_dialog import SettingsDialog
         
         dialog = SettingsDialog(self.config, self)
+        dialog.database_restored.connect(self.load_user_data)
+        dialog.settings_changed.connect(self.apply_backup_settings)
         if dialog.exec():
             # Применение изменений конфигурации
             self.apply_styles()
     
+    def apply_backup_settings(self, *args):
+        """Запуск или остановка автоматических снимков по настройке auto_backup"""
+        settings = QSettings(self.config.ORGANIZATION, self.config.APP_NAME)
+        if settings.value('workouts/auto_backup', False, type=bool):
+            self.backup_scheduler.start()
+        else:
+            self.backup_scheduler.stop()
+    
+    def import_history(self):
+        """Массовый импорт истории тренировок из CSV/JSONL в фоновом потоке"""
+        if not self.current_user:
+            self.show_login_dialog()
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Импорт истории тренировок",
+            str(Path.home()),
+            "История тренировок (*.csv *.jsonl);;All Files (*)"
+        )
+        if not file_path:
+            return
+
+        from views.settings_dialog import DatabaseTaskThread
+
+        user_id = self.current_user['id']
+        cancel_event = threading.Event()
+        progress_dialog = QProgressDialog("Импорт истории тренировок...", "Отмена", 0, 1000, self)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.canceled.connect(cancel_event.set)
+
+        def run(progress):
+            # Прогресс в тысячных долях файла (значения сигнала Qt - 32-битные)
+            def on_progress(read_bytes, total_bytes, rows):
+                progress(read_bytes * 1000 // total_bytes if total_bytes else 1000, 1000)
+            return self.workout_controller.import_history(user_id, file_path, on_progress, cancel_event)
+
+        def on_done(task_result):
+            progress_dialog.close()
+            result = task_result["result"] if task_result["success"] else task_result
+            if not result["success"]:
+                self.show_error_message("Ошибка импорта", result["message"])
+                return
+            status = "Импорт отменен" if result["cancelled"] else "Импорт завершен"
+            self.show_success_message(
+                status,
+                f"{status}: тренировок {result['workouts']}, подходов {result['sets']} "
+                f"за {result['elapsed']} с"
+            )
+            self.load_user_data()
+            self.load_user_stats()
+
+        self.import_task = DatabaseTaskThread(run, self)
+        self.import_task.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        self.import_task.completed.connect(on_done)
+        self.import_task.start()
+        progress_dialog.show()
+    
     def show_stats_dialog(self):
         """Показать диалог статистики"""
         if not self.current_user:
@@ -1517,6 +1667,8 @@ class BeepThread(QThread):
     def run(self):
         """Основной метод потока"""
         try:
+            # winsound есть только в Windows и нужен только при первом сигнале
+            import winsound
             winsound.Beep(self.frequency, self.duration)
         except Exception as e:
             print(f"Ошибка звука: {e}")
@@ -6,7 +6,8 @@ from PyQt6.QtWidgets import (
     QComboBox, QSpinBox, QCheckBox, QTextEdit,
     QDateEdit, QTimeEdit, QListWidget, QListWidgetItem,
     QStackedWidget, QScrollArea, QFrame, QProgressBar,
-    QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView, QInputDialog
+    QFileDialog, QHeaderView, QInputDialog,
+    QTableView, QAbstractItemView
 )
 
 from PyQt6.QtCore import Qt, pyqtSignal, QDate, QTime, QDateTime
@@ -16,6 +17,8 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import hashlib
 
+from views.table_models import PagedTableModel, TableColumn, format_utc_datetime, format_duration, format_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +28,8 @@ class ProfileDialog(QDialog):
     profile_updated = pyqtSignal(dict)  # Сигнал при обновлении профиля
     password_changed = pyqtSignal()      # Сигнал при изменении пароля
     
-    def __init__(self, auth_controller, workout_controller, user_data: dict, parent=None):
+    def __init__(self, auth_controller, workout_controller, user_data: dict, parent=None,
+                 data_service=None):
         """
         Инициализация диалога профиля
         
@@ -33,10 +37,12 @@ class ProfileDialog(QDialog):
             auth_controller: Контроллер аутентификации
             user_data: Данные текущего пользователя
             parent: Родительское окно
+            data_service: Сервис доступа к данным (история загружается в потоке БД)
         """
         super().__init__(parent)
         self.auth_controller = auth_controller
         self.workout_controller = workout_controller
+        self.data_service = data_service
         self.user_data = user_data.copy()  # Копируем данные
         self.original_user_data = user_data.copy()
 
@@ -244,11 +250,30 @@ class ProfileDialog(QDialog):
         return card
     
     def create_activity_table(self) -> QWidget:
-        """Создание таблицы активности"""
+        """Создание таблицы активности (строки подгружаются страницами при прокрутке)"""
+        self.activity_model = PagedTableModel(
+            columns=[
+                TableColumn("Дата/время", lambda r: format_utc_datetime(r['created_at']),
+                            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+                TableColumn("Наименование", lambda r: format_value(r['name']),
+                            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+                TableColumn("Подходов", lambda r: format_value(r['sets'])),
+                TableColumn("Всего повторений", lambda r: format_value(r['reps'])),
+                TableColumn("Длительность", lambda r: format_duration(r['work_time'])),
+            ],
+            fetch_page=lambda cursor, limit: self.workout_controller.get_workout_history_page(
+                self.current_user_id, cursor, limit
+            ),
+            data_service=self.data_service,
+            parent=self
+        )
+        self.activity_model.load_failed.connect(
+            lambda message: self.parent().show_error_message("Ошибка загрузки истории тренировок", message)
+        )
       
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels(["Дата/время", "Наименование", "Подходов", "Всего повторений", "Длительность"])
+        table = QTableView()
+        table.setModel(self.activity_model)
+        table.verticalHeader().setVisible(False)
         # table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         # table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
@@ -261,15 +286,15 @@ class ProfileDialog(QDialog):
             header.setMinimumSectionSize(min_width)
         
         # Установить начальные ширины (равны минимальным или больше)
-        for i in range(table.columnCount()):
+        for i in range(self.activity_model.columnCount()):
             table.setColumnWidth(i, min_widths[i])
         
-        for i in range(table.columnCount()):
+        for i in range(self.activity_model.columnCount()):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Interactive)
 
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
 
-        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)    
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)    
         return table
     
     def create_buttons(self, parent_layout):
@@ -680,56 +705,9 @@ class ProfileDialog(QDialog):
             #     if isinstance(value_widget, QLabel):
             #         value_widget.setText(new_value)
 
-    def update_activity_table(self, history):
-        """Обновление таблицы активности"""
-        self.activity_table.setRowCount(len(history))
-        
-        for row, record in enumerate(history):
-            # Дата
-            utc_time_str = record.get('created_at', '')
-             # Парсим UTC время
-            utc_dt = datetime.strptime(utc_time_str, "%Y-%m-%d %H:%M:%S")
-            utc_dt = utc_dt.replace(tzinfo=timezone.utc)
-            
-            # Конвертируем в локальное
-            local_dt = utc_dt.astimezone()
-            
-            # Форматируем для отображения
-            display_time = local_dt.strftime("%d.%m.%Y %H:%M")
-
-            date_item = QTableWidgetItem(display_time)
-            self.activity_table.setItem(row, 0, date_item)            
-           
-            # Наименование тренировки
-            name_item = QTableWidgetItem(record.get('name', ''))
-            self.activity_table.setItem(row, 1, name_item)
-
-            # Число подходов
-            sets_item = QTableWidgetItem(str(record.get('sets', '')))
-            sets_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.activity_table.setItem(row, 2, sets_item)
-
-            # Число повторений
-            reps_item = QTableWidgetItem(str(record.get('reps', '')))
-            reps_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.activity_table.setItem(row, 3, reps_item)
-
-            # Длительность
-            duration = record.get('work_time', 0)
-            minutes = duration // 60
-            seconds = duration % 60
-            duration_item = QTableWidgetItem(f"{minutes}:{seconds:02d}")
-            duration_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.activity_table.setItem(row, 4, duration_item)
-
     def load_workout_history(self):
-        """Загрузка истории тренировок"""
-        result = self.workout_controller.get_workout_history(self.current_user_id)
-        
-        if result["success"]:
-            self.update_activity_table(result["history"])
-        else:
-            self.parent().show_error_message("Ошибка загрузки истории тренировок", result["message"])
+        """Загрузка истории тренировок (первая страница, остальные - при прокрутке)"""
+        self.activity_model.reload()
         
     def load_user_stats(self):
         """Загрузка статистики"""
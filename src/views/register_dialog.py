@@ -8,9 +8,12 @@ from PyQt6.QtCore import Qt
 class RegisterDialog(QDialog):
     """Диалог регистрации"""
     
-    def __init__(self, auth_controller, parent=None):
+    def __init__(self, auth_controller, parent=None, data_service=None):
         super().__init__(parent)
         self.auth_controller = auth_controller
+        # Хеширование пароля намеренно медленное, поэтому выполняется в потоке БД
+        self.data_service = data_service
+        self._busy = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -90,17 +93,42 @@ class RegisterDialog(QDialog):
         confirm_password = self.confirm_password_input.text()
         # remember_me = self.remember_checkbox.isChecked()
         
-        result = self.auth_controller.register(username, email, password, confirm_password)
-        
+        if self.data_service is None:
+            self.on_register_finished(self.auth_controller.register(username, email, password, confirm_password))
+            return
+
+        self.set_busy(True)
+        self.data_service.submit(
+            self.auth_controller.register, username, email, password, confirm_password,
+            callback=self.on_register_finished
+        )
+
+    def on_register_finished(self, result):
+        """Обработка результата регистрации"""
+        self.set_busy(False)
         if result["success"]:
             QMessageBox.information(self, "Успешно", result["message"])
             self.accept()  # Закрываем диалог с успехом
         else:
             QMessageBox.warning(self, "Ошибка", result["message"])
     
+    def set_busy(self, busy: bool):
+        """Блокировка формы на время регистрации"""
+        self._busy = busy
+        for widget in (self.username_input, self.email_input, self.password_input,
+                       self.confirm_password_input, self.register_button,
+                       self.cancel_button, self.login_link):
+            widget.setEnabled(not busy)
+        self.register_button.setText("Регистрация..." if busy else "Зарегистрироваться")
+
+    def reject(self):
+        # Пока идет регистрация, диалог не закрывается: результат придет в этот диалог
+        if not self._busy:
+            super().reject()
+
     def show_login(self):
         """Показать форму входа"""
         from .login_dialog import LoginDialog
-        login_dialog = LoginDialog(self.auth_controller, self)
+        login_dialog = LoginDialog(self.auth_controller, self, data_service=self.data_service)
         self.reject()  # Закрываем текущее окно
         login_dialog.exec()
\ No newline at end of file
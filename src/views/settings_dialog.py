@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
     QListWidgetItem, QMessageBox, QFileDialog, QGridLayout,
     QSlider, QProgressBar, QScrollArea, QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QSettings, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QSettings, QTimer, QThread, QDateTime
 from PyQt6.QtGui import QFont, QIcon, QIntValidator, QDoubleValidator
 import json
 from pathlib import Path
@@ -19,10 +19,12 @@ class SettingsDialog(QDialog):
     """Диалог настроек приложения"""
     
     settings_changed = pyqtSignal(dict)  # Сигнал при изменении настроек
+    database_restored = pyqtSignal()  # БД восстановлена из резервной копии
     
     def __init__(self, config, parent=None):
         super().__init__(parent)
         self.config = config
+        self.db_task = None  # фоновое копирование/восстановление БД
         self.settings = QSettings(config.ORGANIZATION, config.APP_NAME)
         self.original_settings = self.load_settings()
         
@@ -388,6 +390,11 @@ class SettingsDialog(QDialog):
         self.restore_button = QPushButton("Восстановить БД из копии")
         database_layout.addRow("", self.restore_button)
         
+        # Ход копирования (обновляется из фонового потока)
+        self.db_progress = QProgressBar()
+        self.db_progress.setVisible(False)
+        database_layout.addRow("", self.db_progress)
+        
         database_group.setLayout(database_layout)
         layout.addWidget(database_group)
         
@@ -515,6 +522,7 @@ class SettingsDialog(QDialog):
                                                            self.config.DEFAULT_SETS, type=int)
         settings_dict['auto_save_workouts'] = self.settings.value('workouts/auto_save', True, type=bool)
         settings_dict['auto_backup'] = self.settings.value('workouts/auto_backup', False, type=bool)
+        settings_dict['auto_export'] = self.settings.value('workouts/auto_export', False, type=bool)
         settings_dict['allow_public'] = self.settings.value('workouts/allow_public', True, type=bool)
         
         # Таймер
@@ -569,6 +577,7 @@ class SettingsDialog(QDialog):
         self.default_sets.setValue(settings['default_sets'])
         self.auto_save_workouts.setChecked(settings['auto_save_workouts'])
         self.auto_backup.setChecked(settings['auto_backup'])
+        self.auto_export.setChecked(settings['auto_export'])
         self.allow_public.setChecked(settings['allow_public'])
         
         # Таймер
@@ -624,6 +633,7 @@ class SettingsDialog(QDialog):
         settings['default_sets'] = self.default_sets.value()
         settings['auto_save_workouts'] = self.auto_save_workouts.isChecked()
         settings['auto_backup'] = self.auto_backup.isChecked()
+        settings['auto_export'] = self.auto_export.isChecked()
         settings['allow_public'] = self.allow_public.isChecked()
         
         # Таймер
@@ -676,6 +686,7 @@ class SettingsDialog(QDialog):
         self.settings.setValue('workouts/default_sets', settings['default_sets'])
         self.settings.setValue('workouts/auto_save', settings['auto_save_workouts'])
         self.settings.setValue('workouts/auto_backup', settings['auto_backup'])
+        self.settings.setValue('workouts/auto_export', settings['auto_export'])
         self.settings.setValue('workouts/allow_public', settings['allow_public'])
         
         # Таймер
@@ -836,25 +847,26 @@ class SettingsDialog(QDialog):
             self.db_path_edit.setText(file_path)
     
     def backup_database(self):
-        """Создание резервной копии базы данных"""
-        try:
-            from models.database import get_database
-            
-            db = get_database()
-            backup_path = db.backup_database()
-            
-            if backup_path:
-                QMessageBox.information(
-                    self,
-                    "Резервная копия создана",
-                    f"Резервная копия базы данных успешно создана:\n{backup_path}"
-                )
-            else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось создать резервную копию.")
-                
-        except Exception as e:
-            logger.error(f"Ошибка создания резервной копии: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Не удалось создать резервную копию: {e}")
+        """Создание резервной копии базы данных (в фоновом потоке)"""
+        from models.database import get_database
+
+        db = get_database()
+        self.start_db_task(
+            lambda progress: db.backup_to(progress=progress),
+            self.on_backup_finished
+        )
+
+    def on_backup_finished(self, result: dict):
+        """Результат создания резервной копии"""
+        if result["success"]:
+            QMessageBox.information(
+                self,
+                "Резервная копия создана",
+                f"Резервная копия базы данных успешно создана:\n{result['result']}"
+            )
+        else:
+            logger.error(f"Ошибка создания резервной копии: {result['message']}")
+            QMessageBox.critical(self, "Ошибка", f"Не удалось создать резервную копию: {result['message']}")
     
     def restore_database(self):
         """Восстановление базы данных из резервной копии"""
@@ -863,7 +875,7 @@ class SettingsDialog(QDialog):
             "ВНИМАНИЕ!",
             "Вы уверены, что хотите восстановить базу данных из резервной копии?\n\n"
             "Текущая база данных будет заменена.\n"
-            "Это действие невозможно отменить!",
+            "Перед восстановлением будет создана ее резервная копия.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
@@ -872,43 +884,82 @@ class SettingsDialog(QDialog):
             file_path, _ = QFileDialog.getOpenFileName(
                 self,
                 "Выберите резервную копию базы данных",
-                str(self.config.DB_PATH.parent),
+                str(self.config.DB_BACKUP_DIR),
                 "SQLite Database (*.db *.sqlite);;All Files (*)"
             )
             
             if file_path:
-                try:
-                    import shutil
-                    import os
-                    
-                    # Создаем резервную копию текущей БД
-                    current_db = Path(self.config.DB_PATH)
-                    if current_db.exists():
-                        timestamp = QDateTime.currentDateTime().toString("yyyyMMdd_hhmmss")
-                        backup_name = f"{current_db.stem}_before_restore_{timestamp}{current_db.suffix}"
-                        backup_path = current_db.parent / backup_name
-                        shutil.copy2(current_db, backup_path)
-                    
-                    # Копируем выбранную резервную копию
-                    shutil.copy2(file_path, current_db)
-                    
-                    QMessageBox.information(
-                        self,
-                        "Восстановление завершено",
-                        f"База данных успешно восстановлена из:\n{file_path}\n\n"
-                        f"Текущая БД сохранена как:\n{backup_path}"
-                    )
-                    
-                    # Требуем перезапуск приложения
-                    QMessageBox.warning(
-                        self,
-                        "Перезапуск требуется",
-                        "Для применения изменений требуется перезапуск приложения."
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Ошибка восстановления БД: {e}")
-                    QMessageBox.critical(self, "Ошибка", f"Не удалось восстановить БД: {e}")
+                from models.database import get_database
+
+                db = get_database()
+                timestamp = QDateTime.currentDateTime().toString("yyyyMMdd_hhmmss")
+                current_db = Path(db.db_path)
+                backup_path = self.config.DB_BACKUP_DIR / (
+                    f"{current_db.stem}_before_restore_{timestamp}{current_db.suffix}"
+                )
+
+                def restore(progress):
+                    # Сначала копия текущей БД, затем восстановление
+                    db.backup_to(backup_path, progress=progress)
+                    db.restore_from(file_path, progress=progress)
+                    return backup_path
+
+                self.start_db_task(
+                    restore,
+                    lambda result: self.on_restore_finished(result, file_path)
+                )
+
+    def on_restore_finished(self, result: dict, file_path: str):
+        """Результат восстановления базы данных"""
+        if result["success"]:
+            QMessageBox.information(
+                self,
+                "Восстановление завершено",
+                f"База данных успешно восстановлена из:\n{file_path}\n\n"
+                f"Текущая БД сохранена как:\n{result['result']}"
+            )
+            self.database_restored.emit()
+        else:
+            logger.error(f"Ошибка восстановления БД: {result['message']}")
+            QMessageBox.critical(self, "Ошибка", f"Не удалось восстановить БД: {result['message']}")
+
+    def start_db_task(self, fn, on_finished):
+        """
+        Запуск операции с БД в фоновом потоке
+
+        Args:
+            fn: Функция, принимающая progress(скопировано, всего)
+            on_finished: Обработчик результата {"success", "result"/"message"} в потоке GUI
+        """
+        if self.db_task is not None:
+            return
+        self.set_db_busy(True)
+        self.db_task = DatabaseTaskThread(fn, self)
+        self.db_task.progress.connect(self.on_db_progress)
+        self.db_task.completed.connect(lambda result: self.on_db_task_completed(result, on_finished))
+        self.db_task.start()
+
+    def on_db_progress(self, done: int, total: int):
+        self.db_progress.setMaximum(max(total, 1))
+        self.db_progress.setValue(done)
+
+    def on_db_task_completed(self, result: dict, on_finished):
+        self.db_task.wait()
+        self.db_task = None
+        self.set_db_busy(False)
+        on_finished(result)
+
+    def set_db_busy(self, busy: bool):
+        """Блокировка кнопок БД на время копирования"""
+        for widget in (self.backup_button, self.restore_button, self.browse_db_button):
+            widget.setEnabled(not busy)
+        self.db_progress.setValue(0)
+        self.db_progress.setVisible(busy)
+
+    def reject(self):
+        # Пока идет копирование, диалог не закрывается: результат придет в этот диалог
+        if self.db_task is None:
+            super().reject()
     
     def export_settings(self):
         """Экспорт настроек в файл"""
@@ -979,6 +1030,10 @@ class SettingsDialog(QDialog):
     
     def closeEvent(self, event):
         """Обработка закрытия диалога"""
+        if self.db_task is not None:
+            event.ignore()
+            return
+        
         current_settings = self.get_current_settings()
         
         # Проверяем, изменились ли настройки
@@ -1000,4 +1055,27 @@ class SettingsDialog(QDialog):
             else:
                 event.ignore()
         else:
-            event.accept()
\ No newline at end of file
+            event.accept()
+
+
+class DatabaseTaskThread(QThread):
+    """
+    Поток для копирования и восстановления БД
+
+    Функция получает progress(скопировано, всего); вызовы передаются
+    в поток GUI сигналом progress, результат - сигналом completed.
+    """
+
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(dict)
+
+    def __init__(self, fn, parent=None):
+        super().__init__(parent)
+        self.fn = fn
+
+    def run(self):
+        try:
+            result = {"success": True, "result": self.fn(self.progress.emit)}
+        except Exception as e:
+            result = {"success": False, "message": str(e)}
+        self.completed.emit(result)
@@ -0,0 +1,163 @@
+# src/views/table_models.py
+from datetime import datetime, timezone
+from functools import lru_cache
+import logging
+from typing import Any, Callable, List, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1024)
+def format_utc_datetime(value: str) -> str:
+    """Перевод времени UTC из БД ('ГГГГ-ММ-ДД ЧЧ:ММ:СС') в локальное 'ДД.ММ.ГГГГ ЧЧ:ММ'"""
+    if not value:
+        return ""
+    try:
+        utc_dt = datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return value
+    return utc_dt.astimezone().strftime("%d.%m.%Y %H:%M")
+
+
+def format_value(value: Any) -> str:
+    """Значение ячейки как текст (None - пустая строка)"""
+    return "" if value is None else str(value)
+
+
+def format_duration(seconds: Optional[int]) -> str:
+    """Длительность в формате м:сс"""
+    seconds = seconds or 0
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class TableColumn:
+    """Описание столбца таблицы: заголовок, функция форматирования строки, выравнивание"""
+
+    __slots__ = ('title', 'formatter', 'alignment')
+
+    def __init__(self, title: str, formatter: Callable[[Any], str],
+                 alignment: Qt.AlignmentFlag = Qt.AlignmentFlag.AlignCenter):
+        self.title = title
+        self.formatter = formatter
+        self.alignment = alignment
+
+
+class PagedTableModel(QAbstractTableModel):
+    """
+    Модель таблицы с постраничной загрузкой
+
+    Строки запрашиваются у fetch_page страницами по мере прокрутки
+    (canFetchMore/fetchMore), а текст ячеек форматируется только
+    при отображении в data(). Если передан сервис доступа к данным,
+    страницы загружаются в потоке БД.
+
+    fetch_page(cursor, limit) возвращает словарь контроллера
+    {"success", "items", "next_cursor"}; next_cursor = None - данных больше нет.
+    """
+
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, columns: List[TableColumn], fetch_page: Callable = None,
+                 page_size: int = 100, data_service=None, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.data_service = data_service
+        self._rows: List[Any] = []
+        self._cursor = None
+        self._exhausted = fetch_page is None
+        self._loading = False
+        self._generation = 0  # Отбрасывает ответы, пришедшие после reload()
+
+    # ========== ДАННЫЕ ==========
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return column.formatter(self._rows[index.row()])
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return column.alignment
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section].title
+        return super().headerData(section, orientation, role)
+
+    def row(self, row: int):
+        """Исходная запись строки"""
+        return self._rows[row]
+
+    # ========== ЗАГРУЗКА ==========
+
+    def set_rows(self, rows: Optional[List[Any]]):
+        """Замена содержимого готовым списком строк (без постраничной загрузки)"""
+        self.beginResetModel()
+        self._generation += 1
+        self._rows = list(rows or [])
+        self._cursor = None
+        self._exhausted = True
+        self._loading = False
+        self.endResetModel()
+
+    def reload(self):
+        """Сброс модели и загрузка первой страницы"""
+        self.beginResetModel()
+        self._generation += 1
+        self._rows = []
+        self._cursor = None
+        self._exhausted = self.fetch_page is None
+        self._loading = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return not self._exhausted and not self._loading
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        self._loading = True
+        generation = self._generation
+
+        def on_page(result):
+            if generation == self._generation:
+                self._append_page(result)
+
+        if self.data_service is not None:
+            self.data_service.submit(self.fetch_page, self._cursor, self.page_size, callback=on_page)
+        else:
+            on_page(self.fetch_page(self._cursor, self.page_size))
+
+    def _append_page(self, result: dict):
+        """Добавление загруженной страницы в конец модели"""
+        self._loading = False
+        if not result["success"]:
+            self._exhausted = True
+            logger.error(f"Ошибка загрузки страницы: {result['message']}")
+            self.load_failed.emit(result["message"])
+            return
+
+        items = result["items"]
+        self._cursor = result.get("next_cursor")
+        self._exhausted = self._cursor is None
+        if items:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+            self._rows.extend(items)
+            self.endInsertRows()
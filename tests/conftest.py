@@ -0,0 +1,75 @@
+# tests/conftest.py
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Модули приложения импортируются так же, как при запуске: config из корня, models из src
+ROOT_DIR = Path(__file__).resolve().parent.parent
+for path in (ROOT_DIR, ROOT_DIR / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Временная БД со всеми миграциями (новое соединение на каждый запрос)"""
+    from models.database import Database
+
+    database = Database(tmp_path / "test.db", pool_size=0)
+    yield database
+    database.close()
+
+
+# Размер истории для замеров производительности (подходов в таблице history)
+BENCH_HISTORY_ROWS = int(os.environ.get("TABATA_BENCH_HISTORY_ROWS", 1_000_000))
+BENCH_SETS_PER_WORKOUT = 10
+
+
+def fill_history(db_path, rows: int, sets_per_workout: int = BENCH_SETS_PER_WORKOUT) -> dict:
+    """
+    Заполнение БД одним пользователем с rows подходами (по sets_per_workout на тренировку)
+
+    Строки генерируются внутри SQLite (рекурсивный CTE), поэтому даже миллион
+    подходов создается за секунды.
+
+    Returns:
+        Dict: user_id, exercise_id, workouts (количество тренировок)
+    """
+    workouts = max(1, rows // sets_per_workout)
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            user_id = conn.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES ('bench', 'bench@example.com', '')"
+            ).lastrowid
+            exercise_id = conn.execute(
+                "INSERT INTO exercises (user_id, name) VALUES (?, 'Присед')", (user_id,)
+            ).lastrowid
+            conn.execute("""
+                WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+                INSERT INTO workouts (user_id, exercise_id, name, work_time, rest_time, sets, reps, created_at)
+                SELECT ?, ?, 'Присед', 300, 300, ?, 100, datetime('2020-01-01', '+' || i || ' hours') FROM n
+            """, (workouts, user_id, exercise_id, sets_per_workout))
+            first_id = conn.execute("SELECT MIN(id) FROM workouts").fetchone()[0]
+            conn.execute("""
+                WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < ? - 1)
+                INSERT INTO history (workout_id, set_number, reps, duration)
+                SELECT ? + i / ?, i % ? + 1, 10, 30 FROM n
+            """, (rows, first_id, sets_per_workout, sets_per_workout))
+    finally:
+        conn.close()
+    return {"user_id": user_id, "exercise_id": exercise_id, "workouts": workouts}
+
+
+@pytest.fixture(scope="session")
+def history_db_path(tmp_path_factory):
+    """Файл БД со всеми миграциями и BENCH_HISTORY_ROWS подходами (общий для замеров)"""
+    from models.database import Database
+
+    path = tmp_path_factory.mktemp("bench") / "history.db"
+    Database(path, pool_size=0).close()
+    info = fill_history(path, BENCH_HISTORY_ROWS)
+    return path, info
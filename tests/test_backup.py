@@ -0,0 +1,105 @@
+# tests/test_backup.py
+"""Онлайн-копия БД (backup_to) и восстановление из нее (restore_from)"""
+import sqlite3
+
+import pytest
+
+from models.migrations import latest_version
+from models.repositories.cached_repositories import CachedWorkoutRepository
+
+
+def make_data(db, workouts: int = 3) -> int:
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+        exercise_id = conn.execute(
+            "INSERT INTO exercises (user_id, name) VALUES (?, 'Присед')", (user_id,)
+        ).lastrowid
+        for _ in range(workouts):
+            conn.execute(
+                "INSERT INTO workouts (user_id, exercise_id, name, work_time) VALUES (?, ?, 'Присед', 60)",
+                (user_id, exercise_id)
+            )
+    return user_id
+
+
+def count(db, table: str) -> int:
+    with db.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_backup_and_restore_round_trip(db, tmp_path):
+    user_id = make_data(db)
+    progress = []
+    backup = db.backup_to(tmp_path / "backups" / "copy.db",
+                          progress=lambda done, total: progress.append((done, total)), pages=1)
+
+    assert backup.exists() and not backup.with_name("copy.db.tmp").exists()
+    assert progress and progress[-1][0] == progress[-1][1]
+    copy = sqlite3.connect(backup)
+    try:
+        assert copy.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert copy.execute("SELECT COUNT(*) FROM workouts").fetchone()[0] == 3
+    finally:
+        copy.close()
+
+    # Изменения после копии отменяются восстановлением, кэш чтения сбрасывается
+    workouts = CachedWorkoutRepository(db)
+    assert len(workouts.get_user_workouts(user_id)) == 3
+    assert db.cache.stats()["size"] > 0
+    with db.get_connection(write=True) as conn:
+        conn.execute("DELETE FROM workouts")
+        conn.execute("INSERT INTO users (username, email, password_hash) VALUES ('x', 'x@example.com', '')")
+
+    assert db.restore_from(backup) == latest_version()
+    assert count(db, "workouts") == 3
+    assert count(db, "users") == 1
+    assert db.cache.stats()["size"] == 0
+    assert len(workouts.get_user_workouts(user_id)) == 3
+
+
+def test_backup_is_consistent_while_writes_continue(db, tmp_path):
+    make_data(db, workouts=200)
+    writes = []
+
+    def write_during_copy(done, total):
+        # Запись другим соединением между шагами копирования
+        with db.get_connection(write=True) as conn:
+            conn.execute("DELETE FROM workouts WHERE id = (SELECT MIN(id) FROM workouts)")
+        writes.append(done)
+
+    backup = db.backup_to(tmp_path / "copy.db", progress=write_during_copy, pages=1)
+    copy = sqlite3.connect(backup)
+    try:
+        assert copy.execute("SELECT COUNT(*) FROM workouts").fetchone()[0] == 200
+    finally:
+        copy.close()
+    assert writes and count(db, "workouts") == 200 - len(writes)
+
+
+def test_backup_refuses_to_overwrite_database(db):
+    with pytest.raises(ValueError):
+        db.backup_to(db.db_path)
+
+
+def test_restore_rejects_newer_schema(db, tmp_path):
+    make_data(db)
+    backup = db.backup_to(tmp_path / "copy.db")
+    copy = sqlite3.connect(backup)
+    copy.execute(f"PRAGMA user_version = {latest_version() + 1}")
+    copy.close()
+
+    with pytest.raises(ValueError, match="более новой версией"):
+        db.restore_from(backup)
+    assert count(db, "workouts") == 3
+
+
+def test_restore_rejects_missing_or_corrupt_file(db, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        db.restore_from(tmp_path / "missing.db")
+
+    broken = tmp_path / "broken.db"
+    broken.write_bytes(b"not a database" * 100)
+    with pytest.raises(sqlite3.DatabaseError):
+        db.restore_from(broken)
@@ -0,0 +1,122 @@
+# tests/test_bulk_importer.py
+"""Массовый импорт истории: индексы схемы и ошибки формата"""
+import csv
+
+import pytest
+
+from models.bulk_importer import BulkImporter
+from models.database import Database
+from models.migrations import ensure_indexes, expected_indexes
+
+
+def write_csv(path, workouts: int, sets: int = 4, rest_time="60"):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["workout", "exercise", "set_number", "reps", "duration", "rest_time"])
+        for workout in range(workouts):
+            for set_number in range(1, sets + 1):
+                writer.writerow([f"w{workout}", "Присед", set_number, 10, 30, rest_time])
+    return path
+
+
+def index_names(db) -> set:
+    with db.get_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def index_definitions(db) -> dict:
+    with db.get_connection() as conn:
+        return {row[0]: row[1] for row in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index'")}
+
+
+def count(db, table: str) -> int:
+    with db.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.fixture
+def user_id(db):
+    with db.get_connection(write=True) as conn:
+        return conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+
+
+def test_import_keeps_indexes_by_default(db, user_id, tmp_path):
+    indexes = index_names(db)
+    seen = []
+
+    def progress(read_bytes, total_bytes, rows):
+        seen.append(index_names(db))
+
+    path = write_csv(tmp_path / "history.csv", workouts=100)
+    stats = BulkImporter(db, chunk_rows=40).import_file(path, user_id, progress)
+
+    assert (stats["workouts"], stats["sets"]) == (100, 400)
+    assert all(names == indexes for names in seen)
+    assert count(db, "history") == 400
+
+
+def test_deferred_indexes_are_rebuilt_in_the_same_transaction(db, user_id, tmp_path):
+    path = write_csv(tmp_path / "history.csv", workouts=100)
+    BulkImporter(db, chunk_rows=40, defer_indexes=True).import_file(path, user_id)
+
+    assert set(expected_indexes()) <= index_names(db)
+    assert count(db, "history") == 400
+
+
+def test_deferred_import_restores_every_index(db, user_id, tmp_path):
+    # Индекс вне миграций тоже пересоздается по своему DDL из sqlite_master
+    with db.get_connection(write=True) as conn:
+        conn.execute("CREATE INDEX idx_history_reps ON history (reps) WHERE reps > 0")
+    before = index_definitions(db)
+    dropped = []
+
+    def progress(read_bytes, total_bytes, rows):
+        dropped.append(set(before) - index_names(db))
+
+    path = write_csv(tmp_path / "history.csv", workouts=100)
+    BulkImporter(db, chunk_rows=40, defer_indexes=True).import_file(path, user_id, progress)
+
+    assert dropped and "idx_history_reps" in dropped[0]
+    assert index_definitions(db) == before
+    assert count(db, "history") == 400
+
+
+def test_failed_deferred_import_rolls_back_index_drop(db, user_id, tmp_path):
+    def crash(read_bytes, total_bytes, rows):
+        raise RuntimeError("сбой посреди импорта")
+
+    path = write_csv(tmp_path / "history.csv", workouts=100)
+    with pytest.raises(RuntimeError):
+        BulkImporter(db, chunk_rows=40, defer_indexes=True).import_file(path, user_id, crash)
+
+    assert set(expected_indexes()) <= index_names(db)
+    assert count(db, "workouts") == 0
+
+
+def test_invalid_rest_time_reports_line_number(db, user_id, tmp_path):
+    path = write_csv(tmp_path / "history.csv", workouts=2, rest_time="минута")
+    with pytest.raises(ValueError, match="Строка 2"):
+        BulkImporter(db).import_file(path, user_id)
+    assert count(db, "workouts") == 0
+
+
+def test_missing_indexes_are_recreated_at_startup(tmp_path):
+    db = Database(tmp_path / "indexes.db", pool_size=0)
+    with db.get_connection() as conn:
+        conn.execute("DROP INDEX idx_history_workout")
+        conn.execute("DROP INDEX idx_workouts_user_created")
+
+    reopened = Database(tmp_path / "indexes.db", pool_size=0)
+    assert set(expected_indexes()) <= index_names(reopened)
+
+
+def test_ensure_indexes_recreates_dropped_index(db):
+    before = index_definitions(db)
+    with db.get_connection() as conn:
+        conn.execute("DROP INDEX idx_history_workout")
+        assert ensure_indexes(conn) == ["idx_history_workout"]
+        assert ensure_indexes(conn) == []
+
+    assert index_definitions(db) == before
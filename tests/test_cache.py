@@ -0,0 +1,96 @@
+# tests/test_cache.py
+"""
+Согласованность кэша чтения с транзакциями записи
+
+Сброс записей кэша во время загрузки значения и до фиксации транзакции
+не должен оставлять в кэше данные, прочитанные до изменения.
+"""
+import threading
+
+from models.cache import LRUCache
+from models.repositories.cached_repositories import (
+    CachedWorkoutHistoryRepository, CachedWorkoutRepository
+)
+from models.repositories.exercise_repository import ExerciseRepository
+
+
+def make_workout(db):
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+    exercise_id = ExerciseRepository(db).create(user_id, "Присед", "", 30, 10, 10, 3)
+    workout_id = CachedWorkoutRepository(db).create(user_id, "Присед", exercise_id, 0, 30, 0, 0)
+    return user_id, workout_id
+
+
+def in_thread(fn):
+    """Выполнение fn в другом потоке (свое соединение с БД)"""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn()))
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+def test_invalidation_during_load_discards_loaded_value():
+    cache = LRUCache(maxsize=10, ttl=None)
+
+    def loader():
+        cache.invalidate(("history", 1, 7))  # запись изменилась, пока шла загрузка
+        return "old"
+
+    assert cache.get_or_load(("history", 1, 7), loader) == "old"
+    assert cache.get(("history", 1, 7)) is None
+    assert cache.stats()["stale_loads"] == 1
+    assert cache.get_or_load(("history", 1, 7), lambda: "new") == "new"
+    assert cache.get(("history", 1, 7)) == "new"
+
+
+def test_prefix_invalidation_during_load_discards_loaded_value():
+    cache = LRUCache(maxsize=10, ttl=None)
+
+    def loader():
+        cache.invalidate_prefix("last_workout", 1)
+        return "old"
+
+    cache.get_or_load(("last_workout", 1, 3), loader)
+    assert cache.get(("last_workout", 1, 3)) is None
+
+
+def test_reader_before_commit_does_not_keep_stale_sets(db):
+    user_id, workout_id = make_workout(db)
+    history = CachedWorkoutHistoryRepository(db)
+    assert history.get_data_by_workout_id(workout_id, user_id) == []
+
+    with db.get_connection(write=True):
+        history.save_results([(workout_id, 1, 10, 30)])
+        # Другой поток до фиксации читает прежний снимок и кэширует его
+        assert in_thread(lambda: history.get_data_by_workout_id(workout_id, user_id)) == []
+
+    sets = in_thread(lambda: history.get_data_by_workout_id(workout_id, user_id))
+    assert [row["set_number"] for row in sets] == [1]
+
+
+def test_rollback_drops_values_cached_inside_transaction(db):
+    user_id, workout_id = make_workout(db)
+    history = CachedWorkoutHistoryRepository(db)
+
+    try:
+        with db.get_connection(write=True):
+            history.save_result(workout_id, 1, 10, 30)
+            assert len(history.get_data_by_workout_id(workout_id, user_id)) == 1
+            raise RuntimeError("откат")
+    except RuntimeError:
+        pass
+
+    assert history.get_data_by_workout_id(workout_id, user_id) == []
+
+
+def test_history_is_scoped_to_owner(db):
+    user_id, workout_id = make_workout(db)
+    history = CachedWorkoutHistoryRepository(db)
+    history.save_result(workout_id, 1, 10, 30)
+
+    assert len(history.get_data_by_workout_id(workout_id, user_id)) == 1
+    assert history.get_data_by_workout_id(workout_id, user_id + 1) == []
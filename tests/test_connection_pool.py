@@ -0,0 +1,119 @@
+# tests/test_connection_pool.py
+"""
+Задержка одного вызова репозитория: пул соединений и соединение на вызов
+
+Замер на БД с BENCH_HISTORY_ROWS подходами (по умолчанию 1 млн): подходы
+случайных тренировок читаются через WorkoutHistoryRepository так же, как
+при отображении тренировки. Без пула каждый вызов открывает соединение,
+применяет профиль PRAGMA и заново читает схему; с пулом соединение
+берется готовым.
+"""
+import random
+import sqlite3
+import statistics
+import threading
+import time
+
+import pytest
+
+from models.connection_pool import ConnectionPool, PoolClosedError
+from models.database import Database
+from models.repositories.history_repository import WorkoutHistoryRepository
+
+CALLS = 2000
+
+
+def call_latencies(db, info: dict, calls: int = CALLS, seed: int = 0) -> list:
+    """Задержки (мс) последовательных чтений подходов случайных тренировок"""
+    history = WorkoutHistoryRepository(db)
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(calls):
+        workout_id = rng.randint(1, info["workouts"])
+        started = time.perf_counter()
+        sets = history.get_data_by_workout_id(workout_id, info["user_id"])
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert len(sets) == 10
+    return latencies
+
+
+def summary(latencies: list) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    return f"p50 {statistics.median(ordered):.3f} мс, p99 {p99:.3f} мс"
+
+
+def test_pooled_calls_are_faster_than_connect_per_call(history_db_path):
+    path, info = history_db_path
+    per_call = Database(path, pool_size=0)
+    pooled = Database(path, pool_size=4)
+    try:
+        # Прогрев: кэш страниц ОС и первое соединение пула
+        call_latencies(per_call, info, calls=100, seed=1)
+        call_latencies(pooled, info, calls=100, seed=1)
+
+        without_pool = call_latencies(per_call, info)
+        with_pool = call_latencies(pooled, info)
+    finally:
+        pooled.close()
+        per_call.close()
+
+    print(f"\nсоединение на вызов: {summary(without_pool)}; пул: {summary(with_pool)}")
+    assert statistics.median(with_pool) < statistics.median(without_pool)
+
+
+def test_pool_reuses_connections_across_threads(history_db_path):
+    path, info = history_db_path
+    db = Database(path, pool_size=2)
+    seen = set()
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            with db.get_connection() as conn:
+                with lock:
+                    seen.add(id(conn))
+                conn.execute("SELECT COUNT(*) FROM workouts WHERE user_id = ?", (info["user_id"],))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.close()
+
+    assert 1 <= len(seen) <= 2
+    with pytest.raises(PoolClosedError):
+        with db.get_connection():
+            pass
+
+
+def test_nested_calls_share_connection_and_transaction(db):
+    with db.get_connection(write=True) as outer:
+        outer.execute("INSERT INTO users (username, email, password_hash) VALUES ('n', 'n@example.com', '')")
+        with db.get_connection() as inner:
+            assert inner is outer
+            assert inner.in_transaction
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+
+
+def test_pool_replaces_broken_idle_connection(tmp_path):
+    created = []
+
+    def factory():
+        conn = sqlite3.connect(tmp_path / "pool.db", check_same_thread=False)
+        created.append(conn)
+        return conn
+
+    pool = ConnectionPool(factory, size=1, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # соединение испортилось, пока лежало в пуле
+
+    fresh = pool.acquire()
+    assert fresh is not conn
+    fresh.execute("SELECT 1")
+    pool.release(fresh)
+    pool.close()
+    assert len(created) == 2
@@ -0,0 +1,74 @@
+# tests/test_exercise_search.py
+"""Поиск упражнений: пустой запрос, FTS5 и восстановление индекса FTS5"""
+import pytest
+
+from controllers.exercise_controller import ExerciseController
+from models.database import Database
+from models.migrations import fts5_available
+from models.repositories.exercise_repository import ExerciseRepository
+
+EXERCISES = 250  # больше limit поиска по умолчанию в контроллере (200)
+
+
+@pytest.fixture
+def user_id(db):
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO exercises (user_id, name, description) VALUES (?, ?, ?)",
+            [(user_id, f"Упражнение {number}", "Гантели" if number % 2 else "Штанга")
+             for number in range(EXERCISES)]
+        )
+        conn.execute(
+            "INSERT INTO exercises (user_id, name, description) VALUES (?, 'Жим лежа', 'Штанга')", (user_id,)
+        )
+    return user_id
+
+
+@pytest.mark.parametrize("query", ["", "   ", "!?"])
+def test_empty_query_returns_every_exercise(db, user_id, query):
+    result = ExerciseController(db).search_exercises(user_id, query)
+
+    assert result["success"] and result["query"] == query
+    assert result["count"] == EXERCISES + 1
+    assert result["exercises"] == ExerciseRepository(db).get_user_exercises(user_id)
+
+
+def test_name_matches_come_before_description_matches(db, user_id):
+    repo = ExerciseRepository(db)
+    names = [row["name"] for row in repo.search(user_id, "жим")]
+    assert names == ["Жим лежа"]
+
+    found = repo.search(user_id, "штан", limit=5)
+    assert len(found) == 5
+    assert all(row["description"] == "Штанга" for row in found)
+
+
+def test_missing_fts_index_is_created_at_startup(tmp_path):
+    db = Database(tmp_path / "fts.db", pool_size=0)
+    with db.get_connection() as conn:
+        if not fts5_available(conn):
+            pytest.skip("SQLite собран без FTS5")
+
+    # БД, миграция 4 которой прошла на сборке SQLite без FTS5
+    with db.get_connection(write=True) as conn:
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER trg_exercises_fts_{trigger}")
+        conn.execute("DROP TABLE exercises_fts")
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+        conn.execute("INSERT INTO exercises (user_id, name) VALUES (?, 'Жим лежа')", (user_id,))
+
+    reopened = Database(tmp_path / "fts.db", pool_size=0)
+    with reopened.get_connection() as conn:
+        assert conn.execute(
+            "SELECT rowid FROM exercises_fts WHERE exercises_fts MATCH 'жим*'"
+        ).fetchall() != []
+
+    ExerciseRepository(reopened).create(user_id, "Жим стоя", "", 30, 10, 10, 3)
+    assert [row["name"] for row in ExerciseRepository(reopened).search(user_id, "жим")] == [
+        "Жим стоя", "Жим лежа"
+    ]
@@ -0,0 +1,76 @@
+# tests/test_history_streaming.py
+"""
+Потоковое чтение подходов порциями по ключу (iter_select)
+
+Порции читаются отдельными короткими запросами, поэтому недочитанный
+генератор не удерживает соединение потока, а строки не теряются и не
+повторяются на границах порций (в том числе у тренировок с одинаковым
+временем создания).
+"""
+from models.repositories.history_repository import WorkoutHistoryRepository
+from models.repositories.workout_repository import WorkoutRepository
+
+
+def make_history(db, workouts: int = 5, sets: int = 3) -> int:
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+        exercise_id = conn.execute(
+            "INSERT INTO exercises (user_id, name) VALUES (?, 'Присед')", (user_id,)
+        ).lastrowid
+        for number in range(workouts):
+            # Две тренировки на каждую отметку времени: ключ различает их по id
+            workout_id = conn.execute(
+                "INSERT INTO workouts (user_id, exercise_id, name, created_at) VALUES (?, ?, 'Присед', ?)",
+                (user_id, exercise_id, f"2024-01-0{1 + number // 2} 10:00:00")
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO history (workout_id, set_number, reps, duration) VALUES (?, ?, 10, 30)",
+                [(workout_id, set_number) for set_number in range(1, sets + 1)]
+            )
+    return user_id
+
+
+def test_batches_return_every_set_once_in_order(db):
+    user_id = make_history(db)
+    history = WorkoutHistoryRepository(db)
+    history.fetch_batch_size = 2
+
+    rows = list(history.iter_date_range_history(user_id))
+    keys = [(row["completed_at"], row["workout_id"], row["id"]) for row in rows]
+    assert len(rows) == 15
+    assert keys == sorted(set(keys))
+
+
+def test_period_filter_is_applied_to_every_batch(db):
+    user_id = make_history(db)
+    history = WorkoutHistoryRepository(db)
+    history.fetch_batch_size = 2
+
+    rows = list(history.iter_date_range_history(user_id, start_date="2024-01-02", end_date="2024-01-02"))
+    assert {row["completed_at"] for row in rows} == {"2024-01-02 10:00:00"}
+    assert len(rows) == 6
+
+
+def test_abandoned_iterator_does_not_hold_connection(db):
+    user_id = make_history(db)
+    history = WorkoutHistoryRepository(db)
+    history.fetch_batch_size = 2
+
+    rows = history.iter_date_range_history(user_id)
+    first = next(rows)
+    assert not db.in_transaction
+
+    # Запись фиксируется сразу, а не при сборке генератора
+    WorkoutRepository(db).delete(first["workout_id"], user_id)
+    other = db._connect()
+    try:
+        assert other.execute(
+            "SELECT COUNT(*) FROM workouts WHERE id = ?", (first["workout_id"],)
+        ).fetchone()[0] == 0
+    finally:
+        other.close()
+
+    # Продолжение видит удаление: остаток прочитанной порции и подходы остальных тренировок
+    assert len(list(rows)) == 1 + 12
@@ -0,0 +1,118 @@
+# tests/test_locking.py
+"""Блокировки SQLite: распознавание SQLITE_BUSY, задержки повторов и run_write"""
+import sqlite3
+import threading
+
+import pytest
+
+from config import config
+from models.contention import run_contention
+from models.database import Database
+from models.locking import DatabaseBusyError, backoff_delay, is_busy_error
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    # Короткие ожидания, чтобы повторы укладывались в доли секунды
+    monkeypatch.setattr(config, "DB_BUSY_TIMEOUT_MS", 10)
+    monkeypatch.setattr(config, "DB_BUSY_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(config, "DB_BUSY_BACKOFF_MAX", 0.05)
+
+
+def hold_write_lock(path) -> sqlite3.Connection:
+    """Другой писатель: открытая транзакция записи на отдельном соединении"""
+    blocker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    return blocker
+
+
+def insert_user(conn, name: str = "u") -> int:
+    return conn.execute(
+        "INSERT INTO users (username, email, password_hash) VALUES (?, ?, '')", (name, f"{name}@example.com")
+    ).lastrowid
+
+
+def test_busy_errors_are_recognized():
+    assert is_busy_error(sqlite3.OperationalError("database is locked"))
+    assert is_busy_error(sqlite3.OperationalError("Database is busy"))
+    assert not is_busy_error(sqlite3.OperationalError("no such table: users"))
+    assert not is_busy_error(sqlite3.IntegrityError("database is locked"))
+    assert not is_busy_error(DatabaseBusyError())
+
+
+def test_real_busy_error_is_recognized(tmp_path):
+    path = tmp_path / "busy.db"
+    blocker = hold_write_lock(path)
+    other = sqlite3.connect(path, timeout=0, isolation_level=None)
+    try:
+        with pytest.raises(sqlite3.OperationalError) as error:
+            other.execute("BEGIN IMMEDIATE")
+        assert is_busy_error(error.value)
+    finally:
+        other.close()
+        blocker.close()
+
+
+def test_backoff_delay_stays_within_bounds():
+    for attempt in range(1, 12):
+        limit = min(1.0, 0.05 * 2 ** attempt)
+        delays = [backoff_delay(attempt, 0.05, 1.0) for _ in range(200)]
+        assert all(0 <= delay <= limit for delay in delays)
+        # Разброс: процессы не повторяют попытки одновременно
+        assert len(set(delays)) > 1
+
+
+def test_run_write_retries_until_lock_is_released(db, fast_retries, monkeypatch):
+    monkeypatch.setattr(config, "DB_BUSY_RETRIES", 50)
+    db = Database(db.db_path, pool_size=0)  # соединения с коротким busy_timeout
+    blocker = hold_write_lock(db.db_path)
+    release = threading.Timer(0.2, blocker.commit)
+    release.start()
+    try:
+        user_id = db.run_write(insert_user)
+    finally:
+        release.join()
+        blocker.close()
+
+    stats = db.lock_stats.to_dict()
+    assert stats["retries"] > 0 and stats["failures"] == 0
+    assert stats["write_transactions"] == 1
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM users WHERE id = ?", (user_id,)).fetchone()[0] == 1
+
+
+def test_run_write_gives_up_after_retries(db, fast_retries, monkeypatch):
+    monkeypatch.setattr(config, "DB_BUSY_RETRIES", 2)
+    db = Database(db.db_path, pool_size=0)
+    blocker = hold_write_lock(db.db_path)
+    try:
+        with pytest.raises(DatabaseBusyError):
+            db.run_write(insert_user)
+    finally:
+        blocker.close()
+
+    stats = db.lock_stats.to_dict()
+    assert (stats["retries"], stats["failures"]) == (2, 1)
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+
+def test_run_write_retries_whole_transaction(db):
+    calls = []
+
+    def flaky(conn):
+        calls.append(insert_user(conn, f"u{len(calls)}"))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+
+    db.run_write(flaky)
+    # Первая попытка откатилась вместе со вставкой
+    with db.get_connection() as conn:
+        assert [row[0] for row in conn.execute("SELECT username FROM users")] == ["u1"]
+    assert db.lock_stats.to_dict()["retries"] == 1
+
+
+def test_concurrent_writer_processes_lose_no_rows(tmp_path):
+    report = run_contention(2, 20, tmp_path / "contention.db")
+    assert report["failed"] == 0
+    assert report["saved"] == report["rows_in_db"] == 40
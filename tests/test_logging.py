@@ -0,0 +1,46 @@
+# tests/test_logging.py
+"""Политика заполненной очереди логов"""
+import logging
+import queue
+import threading
+import time
+
+from config import BoundedQueueHandler, LoggingStats
+
+
+def make_record(level: int) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, "сообщение", None, None)
+
+
+def test_full_queue_drops_info_records():
+    stats = LoggingStats()
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), stats, policy="drop")
+    handler.emit(make_record(logging.INFO))
+    handler.emit(make_record(logging.INFO))
+    assert stats.to_dict()["dropped"] == 1
+
+
+def test_full_queue_block_policy_waits_at_most_block_timeout():
+    stats = LoggingStats()
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), stats, policy="block", block_timeout=0.05)
+    handler.emit(make_record(logging.WARNING))
+    started = time.perf_counter()
+    handler.emit(make_record(logging.WARNING))
+    assert time.perf_counter() - started >= 0.05
+    assert stats.to_dict()["dropped"] == 1
+
+
+def test_error_records_wait_longer_than_block_timeout():
+    stats = LoggingStats()
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, stats, policy="drop", block_timeout=0.05)
+    handler.emit(make_record(logging.INFO))
+
+    # Поток записи освобождает место позже block_timeout
+    drain = threading.Timer(0.3, log_queue.get)
+    drain.start()
+    handler.emit(make_record(logging.ERROR))
+    drain.join()
+
+    assert stats.to_dict()["dropped"] == 0
+    assert log_queue.get_nowait().levelno == logging.ERROR
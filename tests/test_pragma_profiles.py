@@ -0,0 +1,108 @@
+# tests/test_pragma_profiles.py
+"""
+Скорость записи подходов в history при разных профилях PRAGMA
+
+Для каждого профиля из config.DB_PRAGMA_PROFILES замеряются два режима:
+подход на транзакцию (save_result, как при нажатии 'Выполнено' без буфера)
+и пакет подходов в одной транзакции (save_results, запись буфера).
+Профили различаются synchronous, поэтому разница видна в первом режиме.
+"""
+import time
+
+import pytest
+
+from config import config
+from models.database import Database
+from models.repositories.history_repository import WorkoutHistoryRepository
+
+SINGLE_COMMITS = 300
+BATCH_ROWS = 50_000
+SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+
+
+def make_workout(db) -> int:
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('p', 'p@example.com', '')"
+        ).lastrowid
+        exercise_id = conn.execute(
+            "INSERT INTO exercises (user_id, name) VALUES (?, 'Присед')", (user_id,)
+        ).lastrowid
+        return conn.execute(
+            "INSERT INTO workouts (user_id, exercise_id, name) VALUES (?, ?, 'Присед')",
+            (user_id, exercise_id)
+        ).lastrowid
+
+
+def insert_throughput(db) -> dict:
+    """Подходов в секунду: по одному на транзакцию и пакетом"""
+    history = WorkoutHistoryRepository(db)
+    workout_id = make_workout(db)
+
+    started = time.perf_counter()
+    for set_number in range(SINGLE_COMMITS):
+        history.save_result(workout_id, set_number, 10, 30)
+    single = SINGLE_COMMITS / (time.perf_counter() - started)
+
+    rows = [(workout_id, SINGLE_COMMITS + i, 10, 30) for i in range(BATCH_ROWS)]
+    started = time.perf_counter()
+    history.save_results(rows)
+    batch = BATCH_ROWS / (time.perf_counter() - started)
+    return {"single": single, "batch": batch}
+
+
+@pytest.fixture(scope="module")
+def throughput(tmp_path_factory):
+    """Замеры всех профилей (профиль -> подходов в секунду)"""
+    results = {}
+    for profile in config.DB_PRAGMA_PROFILES:
+        db = Database(tmp_path_factory.mktemp(profile) / "bench.db", pool_size=1, pragma_profile=profile)
+        try:
+            results[profile] = insert_throughput(db)
+            with db.get_connection() as conn:
+                assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == SINGLE_COMMITS + BATCH_ROWS
+        finally:
+            db.close()
+    print()
+    for profile, result in results.items():
+        print(f"{profile:<10} подход на транзакцию: {result['single']:>9.0f}/с, "
+              f"пакет: {result['batch']:>9.0f}/с")
+    return results
+
+
+@pytest.mark.parametrize("profile", list(config.DB_PRAGMA_PROFILES))
+def test_profile_is_applied_to_connections(tmp_path, profile):
+    db = Database(tmp_path / "profile.db", pool_size=1, pragma_profile=profile)
+    pragmas = config.DB_PRAGMA_PROFILES[profile]
+    try:
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == pragmas["journal_mode"].lower()
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == SYNCHRONOUS[pragmas["synchronous"]]
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == pragmas["cache_size"]
+    finally:
+        db.close()
+
+
+def test_unknown_profile_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Database(tmp_path / "profile.db", pragma_profile="turbo")
+
+
+def test_cascade_delete_is_enforced(db):
+    workout_id = make_workout(db)
+    WorkoutHistoryRepository(db).save_results([(workout_id, 1, 10, 30), (workout_id, 2, 10, 30)])
+    with db.get_connection(write=True) as conn:
+        conn.execute("DELETE FROM workouts WHERE id = ?", (workout_id,))
+        assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 0
+
+
+def test_batched_writes_outpace_commit_per_set(throughput):
+    for profile, result in throughput.items():
+        assert result["batch"] > result["single"] * 5, profile
+
+
+def test_relaxed_sync_is_not_slower_than_durable(throughput):
+    # fsync на каждый коммит (FULL) не может быть быстрее записи без него (OFF);
+    # допуск покрывает разброс замеров на диске с дешевым fsync
+    assert throughput["fast"]["single"] > throughput["durable"]["single"] * 0.7
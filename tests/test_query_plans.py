@@ -0,0 +1,193 @@
+# tests/test_query_plans.py
+"""
+Регрессионная проверка планов запросов репозиториев
+
+Запросы репозиториев собираются f-строками, поэтому проверяется SQL,
+который действительно выполняется: методы репозиториев вызываются на
+временной БД со всеми миграциями, выполненные запросы перехватываются
+(set_trace_callback), и для каждого строится EXPLAIN QUERY PLAN. Полный
+просмотр (SCAN) таблиц с данными пользователей - ошибка: запросу нужен индекс.
+
+Пересчет сводки по всем пользователям (check_consistency/rebuild без
+user_id) читает workouts целиком намеренно и здесь не вызывается.
+"""
+import re
+
+import pytest
+
+from models.passwords import PasswordHasher
+from models.repositories.exercise_repository import ExerciseRepository
+from models.repositories.history_repository import WorkoutHistoryRepository
+from models.repositories.session_repository import SessionRepository
+from models.repositories.user_repository import UserRepository
+from models.repositories.user_stats_repository import UserStatsRepository
+from models.repositories.workout_repository import WorkoutRepository
+
+# Таблицы, которые растут с историей тренировок и не должны читаться целиком
+GUARDED_TABLES = {"workouts", "history", "exercises", "user_sessions"}
+
+_STATEMENT = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_SCAN = re.compile(r"^SCAN (\w+)")
+_KEYWORDS = {"WHERE", "ON", "JOIN", "LEFT", "INNER", "CROSS", "GROUP", "ORDER", "LIMIT", "USING"}
+
+
+def table_aliases(sql: str) -> dict:
+    """Имя или алиас в плане -> таблица запроса"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql: str) -> list:
+    """Строки плана с полным просмотром защищенных таблиц"""
+    aliases = table_aliases(sql)
+    scans = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        match = _SCAN.match(row[3])
+        if match and aliases.get(match.group(1)) in GUARDED_TABLES:
+            scans.append(row[3])
+    return scans
+
+
+@pytest.fixture
+def traced(db):
+    """БД, все запросы которой записываются в список statements"""
+    statements = []
+    connect = db._connect
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    db._connect = traced_connect
+    db.statements = statements
+    db.plain_connect = connect
+    return db
+
+
+@pytest.fixture
+def sample(traced):
+    """Пользователь с упражнением, тренировкой и подходами"""
+    users = UserRepository(traced, password_hasher=PasswordHasher(n=2 ** 10))
+    user_id = users.create_user("plan", "plan@example.com", "secret")["id"]
+    exercise_id = ExerciseRepository(traced).create(user_id, "Жим лежа", "Штанга", 30, 10, 10, 3)
+    workout_id = WorkoutRepository(traced).create(user_id, "Жим лежа", exercise_id, 60, 30, 10, 3)
+    WorkoutHistoryRepository(traced).save_results([(workout_id, 1, 10, 30), (workout_id, 2, 8, 30)])
+    traced.statements.clear()
+    return {"users": users, "user_id": user_id, "exercise_id": exercise_id, "workout_id": workout_id}
+
+
+def run_users(db, s):
+    users = s["users"]
+    users.get_by_id(s["user_id"])
+    users.get_by_email("plan@example.com")
+    users.get_by_username("plan")
+    users.authenticate("plan@example.com", "secret")
+    users.update_profile(s["user_id"], username="plan2")
+
+
+def run_sessions(db, s):
+    sessions = SessionRepository(db)
+    token = sessions.create_session(s["user_id"], remember_me=True)
+    db.cache.clear()
+    sessions.validate_session(token)
+    sessions.sweep_expired()
+    sessions.delete_session(token)
+    sessions.delete_user_sessions(s["user_id"])
+
+
+def run_exercises(db, s):
+    exercises = ExerciseRepository(db)
+    user_id, exercise_id = s["user_id"], s["exercise_id"]
+    exercises.get_user_exercises(user_id)
+    exercises.get_by_id(exercise_id, user_id)
+    exercises.get_by_id(exercise_id)
+    exercises.search(user_id, "жим")
+    exercises.search(user_id, "")
+    exercises._search_like(user_id, ["жим"], 10)
+    exercises.update(exercise_id, user_id, "Жим", "Гантели", 30, 10, 10, 3)
+    exercises.delete(exercise_id, user_id)
+
+
+def run_workouts(db, s):
+    workouts = WorkoutRepository(db)
+    user_id, exercise_id, workout_id = s["user_id"], s["exercise_id"], s["workout_id"]
+    workouts.get_user_workouts(user_id)
+    page = workouts.get_user_workouts_page(user_id, 1)
+    workouts.get_user_workouts_page(user_id, 1, page["next_token"])
+    workouts.get_by_id(workout_id, user_id)
+    workouts.get_by_id(workout_id)
+    workouts.get_user_stats(user_id)
+    workouts.get_last_workout_id(exercise_id, user_id)
+    workouts.get_last_workout_id(exercise_id)
+    workouts.get_last_workout_with_sets(user_id, exercise_id)
+    workouts.get_recent_workouts_with_sets(user_id)
+    workouts.get_recent_workouts_with_sets(user_id, exercise_id)
+    workouts.recalculate_totals([workout_id])
+    workouts.update(workout_id, user_id, "Жим", 30, 60, 10, 3)
+    workouts.delete(workout_id, user_id)
+
+
+def run_history(db, s):
+    history = WorkoutHistoryRepository(db)
+    history.fetch_batch_size = 1  # потоковое чтение выполняет и запросы продолжения по ключу
+    user_id, workout_id = s["user_id"], s["workout_id"]
+    history.save_result(workout_id, 3, 6, 30)
+    history.restore_results([(workout_id, 4, 5, 30)])
+    history.get_data_by_workout_id(workout_id)
+    history.get_data_by_workout_id(workout_id, user_id)
+    list(history.iter_date_range_history(user_id, "2020-01-01", "2100-01-01"))
+    history.get_date_range_history(user_id)
+    history.get_date_range_top_workouts(user_id, "2020-01-01")
+    history.get_date_range_weekday_counts(user_id)
+    page = history.get_user_history_page(user_id, 1)
+    history.get_user_history_page(user_id, 1, page["next_token"])
+    list(history.iter_period_history(user_id, 7))
+
+
+def run_user_stats(db, s):
+    stats = UserStatsRepository(db)
+    user_id = s["user_id"]
+    stats.get_totals(user_id)
+    stats.get_exercise_totals(user_id)
+    stats.get_current_period(user_id, "week")
+    stats.get_recent_periods(user_id, "month")
+    stats.check_consistency(user_id)
+    stats.rebuild(user_id)
+
+
+@pytest.mark.parametrize("scenario", [
+    run_users, run_sessions, run_exercises, run_workouts, run_history, run_user_stats,
+], ids=lambda scenario: scenario.__name__[len("run_"):])
+def test_repository_queries_use_indexes(traced, sample, scenario):
+    scenario(traced, sample)
+
+    statements = [sql for sql in traced.statements if _STATEMENT.match(sql)]
+    assert statements, "сценарий не выполнил ни одного запроса"
+
+    conn = traced.plain_connect()
+    try:
+        problems = []
+        for sql in statements:
+            scans = full_scans(conn, sql)
+            if scans:
+                problems.append(f"{' '.join(sql.split())}\n    -> {scans}")
+    finally:
+        conn.close()
+    assert not problems, "Запросы без индекса:\n" + "\n".join(problems)
+
+
+def test_missing_index_is_reported(traced, sample):
+    """Проверка не пропускает SCAN: без индекса истории запрос подходов читает таблицу целиком"""
+    conn = traced.plain_connect()
+    try:
+        conn.execute("DROP INDEX idx_history_workout")
+        scans = full_scans(conn, "SELECT * FROM history WHERE workout_id = 1")
+    finally:
+        conn.close()
+    assert scans == ["SCAN history"]
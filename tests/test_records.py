@@ -0,0 +1,102 @@
+# tests/test_records.py
+"""
+Записи Record вместо словарей: память и скорость загрузки подходов
+
+Замер на БД с BENCH_HISTORY_ROWS подходами (по умолчанию 1 млн): таблица
+history загружается через WorkoutHistoryRepository в режиме записей и в
+режиме словарей. Память - объем, занятый результатом (tracemalloc), время -
+лучший из нескольких запусков без трассировки памяти.
+"""
+import gc
+import time
+import tracemalloc
+
+import pytest
+
+from models.database import Database
+from models.records import HistoryRecord, Record
+from models.repositories.history_repository import WorkoutHistoryRepository
+
+QUERY = "SELECT * FROM history"
+RUNS = 2
+
+
+def load_seconds(repo) -> float:
+    """Лучшее время загрузки всех подходов"""
+    best = None
+    for _ in range(RUNS):
+        gc.collect()
+        started = time.perf_counter()
+        rows = repo.execute_select(QUERY)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        del rows
+    return best
+
+
+def load_bytes(repo) -> tuple:
+    """Память, занятая результатом загрузки, и количество строк"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        rows = repo.execute_select(QUERY)
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return used, rows
+
+
+@pytest.fixture(scope="module")
+def measurements(history_db_path):
+    path, _ = history_db_path
+    db = Database(path, pool_size=1)
+    try:
+        records = WorkoutHistoryRepository(db, use_records=True)
+        dicts = WorkoutHistoryRepository(db, use_records=False)
+        result = {"records_s": load_seconds(records), "dicts_s": load_seconds(dicts)}
+        result["records_bytes"], record_rows = load_bytes(records)
+        result["dicts_bytes"], dict_rows = load_bytes(dicts)
+        result["rows"] = len(record_rows)
+        result["same_rows"] = len(record_rows) == len(dict_rows) and all(
+            dict(record) == row for record, row in zip(record_rows[:1000], dict_rows[:1000])
+        )
+        result["record_type"] = type(record_rows[0])
+        del record_rows, dict_rows
+    finally:
+        db.close()
+
+    rows = result["rows"]
+    print(f"\n{rows} подходов: записи {result['records_s']:.2f} с, "
+          f"{result['records_bytes'] / 2 ** 20:.0f} МБ; словари {result['dicts_s']:.2f} с, "
+          f"{result['dicts_bytes'] / 2 ** 20:.0f} МБ")
+    return result
+
+
+def test_record_mode_returns_records_with_same_data(measurements):
+    assert measurements["record_type"] is HistoryRecord
+    assert measurements["same_rows"]
+
+
+def test_records_use_less_memory_than_dicts(measurements):
+    assert measurements["records_bytes"] < measurements["dicts_bytes"] * 0.75
+
+
+def test_records_load_at_least_as_fast_as_dicts(measurements):
+    # Допуск покрывает разброс замеров
+    assert measurements["records_s"] < measurements["dicts_s"] * 1.1
+
+
+def test_record_reads_like_dict():
+    record = HistoryRecord(1, 7, 2, 10, 30)
+    assert record["reps"] == 10 and record.get("missing", 0) == 0
+    assert dict(record) == {"id": 1, "workout_id": 7, "set_number": 2, "reps": 10, "duration": 30}
+    assert isinstance(record, Record) and not hasattr(record, "__dict__")
+    with pytest.raises(KeyError):
+        record["missing"]
+
+
+def test_joined_rows_stay_dicts(db):
+    repo = WorkoutHistoryRepository(db, use_records=True)
+    rows = repo.execute_select("SELECT 1 AS id, 'x' AS name")
+    assert rows == [{"id": 1, "name": "x"}]
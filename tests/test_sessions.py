@@ -0,0 +1,98 @@
+# tests/test_sessions.py
+"""Сессии: перевод времени в секунды эпохи (миграция 6) и удаление истекших пакетами"""
+import calendar
+import time
+
+from models import migrations
+from models.database import Database
+from models.repositories.session_repository import SessionRepository, SessionSweeper
+
+
+def make_user(db) -> int:
+    with db.get_connection(write=True) as conn:
+        return conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+
+
+def epoch(text: str) -> int:
+    return calendar.timegm(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+
+
+def test_migration_converts_timestamps_to_epoch(tmp_path, monkeypatch):
+    path = tmp_path / "sessions.db"
+    # БД в версии схемы 5: время сессий хранится строками
+    with monkeypatch.context() as patch:
+        patch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:5])
+        old = Database(path, pool_size=0)
+        assert old.schema_version == 5
+        user_id = make_user(old)
+        with old.get_connection(write=True) as conn:
+            conn.executemany(
+                "INSERT INTO user_sessions (user_id, session_token, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                [
+                    (user_id, "valid", "2024-01-01 10:00:00", "2024-01-31 10:00:00"),
+                    (user_id, "forever", "2024-01-01 10:00:00", None),
+                    (user_id, "garbage", "не дата", "не дата"),
+                ]
+            )
+
+    db = Database(path, pool_size=0)
+    assert db.schema_version == migrations.latest_version()
+    with db.get_connection() as conn:
+        rows = {row["session_token"]: row for row in conn.execute("SELECT * FROM user_sessions")}
+        column_types = {row["name"]: row["type"] for row in conn.execute("PRAGMA table_info(user_sessions)")}
+        indexes = {row["name"] for row in conn.execute("PRAGMA index_list(user_sessions)")}
+
+    assert column_types["created_at"] == column_types["expires_at"] == "INTEGER"
+    assert (rows["valid"]["created_at"], rows["valid"]["expires_at"]) == (
+        epoch("2024-01-01 10:00:00"), epoch("2024-01-31 10:00:00")
+    )
+    assert rows["forever"]["expires_at"] is None
+    # Нераспознанный срок считается истекшим, время создания - моментом миграции
+    assert rows["garbage"]["expires_at"] == 0
+    assert abs(rows["garbage"]["created_at"] - time.time()) < 60
+    assert {"idx_sessions_user", "idx_sessions_expires"} <= indexes
+
+
+def test_sweep_deletes_expired_sessions_in_batches(db):
+    user_id = make_user(db)
+    now = int(time.time())
+    with db.get_connection(write=True) as conn:
+        conn.executemany(
+            "INSERT INTO user_sessions (user_id, session_token, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            [(user_id, f"old{number}", now - 100, now - 1) for number in range(25)]
+            + [(user_id, "live", now, now + 3600), (user_id, "forever", now, None)]
+        )
+
+    repo = SessionRepository(db)
+    batches = []
+    execute_delete = repo.execute_delete
+
+    def counting_delete(query, params=()):
+        deleted = execute_delete(query, params)
+        batches.append(deleted)
+        return deleted
+
+    repo.execute_delete = counting_delete
+    assert repo.sweep_expired(batch_size=10) == 25
+    assert batches == [10, 10, 5]
+
+    with db.get_connection() as conn:
+        left = {row[0] for row in conn.execute("SELECT session_token FROM user_sessions")}
+    assert left == {"live", "forever"}
+    assert repo.sweep_expired(batch_size=10) == 0
+
+
+def test_sweeper_counts_deleted_sessions(db):
+    user_id = make_user(db)
+    repo = SessionRepository(db)
+    token = repo.create_session(user_id)
+    with db.get_connection(write=True) as conn:
+        conn.execute("UPDATE user_sessions SET expires_at = 1")
+
+    sweeper = SessionSweeper(repo, interval=3600, batch_size=2)
+    assert sweeper.sweep() == 1
+    assert sweeper.total_deleted == 1
+    assert repo.validate_session(token) is None
+
@@ -0,0 +1,103 @@
+# tests/test_snapshots.py
+"""Инкрементальные снимки БД: дедупликация блоков, очистка и сборка снимка"""
+import sqlite3
+
+import pytest
+
+from conftest import fill_history
+from models.snapshots import BackupScheduler, SnapshotStore
+
+ROWS = 200_000  # несколько мегабайт: изменение одной строки затрагивает единицы блоков
+
+
+@pytest.fixture
+def filled(db):
+    info = fill_history(db.db_path, ROWS)
+    return db, info
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(tmp_path / "snapshots", chunk_size=16 * 1024)
+
+
+def change_one_workout(db):
+    with db.get_connection(write=True) as conn:
+        conn.execute("UPDATE workouts SET work_time = 999 WHERE id = 1")
+
+
+def test_second_snapshot_stores_only_changed_chunks(filled, store):
+    db, _ = filled
+    first = store.create(db)
+    assert first["new_chunks"] == len(set(first["chunks"]))
+    assert first["size_bytes"] > 4 * 2 ** 20
+
+    change_one_workout(db)
+    second = store.create(db)
+
+    assert len(second["chunks"]) == len(first["chunks"])
+    assert 0 < second["new_chunks"] <= 5
+    assert second["new_bytes"] < first["size_bytes"] / 50
+    assert len(set(second["chunks"]) - set(first["chunks"])) == second["new_chunks"]
+
+    unchanged = store.create(db)
+    assert unchanged["new_chunks"] == 0
+
+
+def test_prune_removes_old_snapshots_and_unreferenced_chunks(filled, store):
+    db, _ = filled
+    first = store.create(db)
+    change_one_workout(db)
+    second = store.create(db)
+
+    removed = store.prune(keep_last=1, keep_daily=0)
+    assert removed == [first["id"]]
+    stats = store.stats()
+    assert stats["snapshots"] == 1 and stats["latest"] == second["id"]
+    assert stats["chunks"] == len(set(second["chunks"]))
+    with pytest.raises(FileNotFoundError):
+        store.get(first["id"])
+
+
+def test_materialize_round_trips_database(filled, store, tmp_path):
+    db, _ = filled
+    store.create(db)
+    change_one_workout(db)
+    snapshot = store.create(db)
+
+    copy = store.materialize(snapshot["id"], tmp_path / "restored.db")
+    reference = db.backup_to(tmp_path / "reference.db")
+    assert copy.read_bytes() == reference.read_bytes()
+
+    conn = sqlite3.connect(copy)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == ROWS
+        assert conn.execute("SELECT work_time FROM workouts WHERE id = 1").fetchone()[0] == 999
+    finally:
+        conn.close()
+
+
+def test_restore_from_snapshot_and_detect_damaged_chunk(filled, store, tmp_path):
+    db, _ = filled
+    snapshot = store.create(db)
+    change_one_workout(db)
+
+    store.restore(snapshot["id"], db)
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT work_time FROM workouts WHERE id = 1").fetchone()[0] == 300
+
+    # Блок с чужим содержимым не попадает в собранный файл
+    victim = store._chunk_path(snapshot["chunks"][0])
+    victim.write_bytes(store._chunk_path(snapshot["chunks"][-1]).read_bytes())
+    with pytest.raises(ValueError):
+        store.materialize(snapshot["id"], tmp_path / "broken.db")
+    assert not (tmp_path / "broken.db").exists()
+
+
+def test_scheduler_waits_for_interval(filled, store):
+    db, _ = filled
+    scheduler = BackupScheduler(db, store, interval=3600)
+    assert scheduler.seconds_until_due() == 0
+    assert scheduler.run_once() is not None
+    assert 3500 < scheduler.seconds_until_due() <= 3600
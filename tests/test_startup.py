@@ -0,0 +1,62 @@
+# tests/test_startup.py
+"""
+Бюджет холодного запуска (src/main.py --profile-startup)
+
+Приложение запускается так же, как вручную: родительский процесс
+перезапускает его под python -X importtime до первой отрисовки главного
+окна и возвращает код 1, если запуск дольше config.STARTUP_BUDGET_MS.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from config import config
+from startup_profiler import parse_budget, parse_import_times
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+MAIN = ROOT_DIR / "src" / "main.py"
+
+
+def profile_startup(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")  # без дисплея
+    return subprocess.run(
+        [sys.executable, str(MAIN), "--profile-startup", *args],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def test_cold_start_fits_budget():
+    process = profile_startup()
+    assert "first_paint" in process.stdout, process.stdout + process.stderr
+    assert process.returncode == 0, process.stdout
+    assert f"Бюджет запуска {config.STARTUP_BUDGET_MS:.0f} мс: в пределах" in process.stdout
+
+
+def test_exceeded_budget_fails():
+    process = profile_startup("--startup-budget=1")
+    assert process.returncode == 1, process.stdout + process.stderr
+    assert "ПРЕВЫШЕН" in process.stdout
+
+
+def test_budget_argument_forms():
+    assert parse_budget(["app.py", "--startup-budget=250"], 1500) == 250
+    assert parse_budget(["app.py", "--startup-budget", "300"], 1500) == 300
+    assert parse_budget(["app.py"], 1500) == 1500
+
+
+def test_import_time_lines_are_parsed():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   encodings.utf_8",
+        "import time:      2500 |       4000 | config",
+        "посторонняя строка",
+    ])
+    imports = parse_import_times(stderr)
+    assert [(item["module"], item["depth"]) for item in imports] == [("encodings.utf_8", 1), ("config", 0)]
+    assert imports[1]["cumulative_ms"] == 4.0
@@ -0,0 +1,116 @@
+# tests/test_stats_exporter.py
+"""Инкрементальный экспорт статистики: отметки и повтор после сбоя"""
+import csv
+import json
+
+import pytest
+
+from models.stats_exporter import StatsExporter
+
+
+def make_user(db) -> tuple:
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+        exercise_id = conn.execute(
+            "INSERT INTO exercises (user_id, name) VALUES (?, 'Присед')", (user_id,)
+        ).lastrowid
+    return user_id, exercise_id
+
+
+def add_workouts(db, user_id: int, exercise_id: int, workouts: int, sets: int = 3):
+    with db.get_connection(write=True) as conn:
+        for _ in range(workouts):
+            workout_id = conn.execute(
+                "INSERT INTO workouts (user_id, exercise_id, name, work_time) VALUES (?, ?, 'Присед', 60)",
+                (user_id, exercise_id)
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO history (workout_id, set_number, reps, duration) VALUES (?, ?, 10, 60)",
+                [(workout_id, number) for number in range(1, sets + 1)]
+            )
+
+
+def read_ids(path) -> list:
+    with open(path, encoding="utf-8", newline="") as f:
+        return [int(row["id"]) for row in csv.DictReader(f)]
+
+
+@pytest.fixture
+def exporter(db, tmp_path):
+    return StatsExporter(db, export_dir=tmp_path / "exports", fmt="csv", batch_size=4)
+
+
+def test_each_run_exports_only_new_rows(db, exporter):
+    user_id, exercise_id = make_user(db)
+    add_workouts(db, user_id, exercise_id, workouts=5)
+
+    first = exporter.export(user_id)
+    assert (first["workouts"]["rows"], first["history"]["rows"]) == (5, 15)
+    assert read_ids(first["history"]["file"]) == list(range(1, 16))
+
+    add_workouts(db, user_id, exercise_id, workouts=2)
+    second = exporter.export(user_id)
+    assert (second["workouts"]["rows"], second["history"]["rows"]) == (2, 6)
+    assert read_ids(second["history"]["file"]) == list(range(16, 22))
+    assert second["history"]["file"] != first["history"]["file"]
+    assert exporter.load_watermarks(user_id) == {"workouts": 7, "history": 21}
+
+
+def test_watermark_never_moves_back(db, exporter):
+    user_id, exercise_id = make_user(db)
+    add_workouts(db, user_id, exercise_id, workouts=3)
+    exporter.export(user_id)
+    before = exporter.load_watermarks(user_id)
+
+    # Удаление уже выгруженных строк и пустой запуск не откатывают отметки
+    with db.get_connection(write=True) as conn:
+        conn.execute("DELETE FROM workouts WHERE id = 3")
+    result = exporter.export(user_id)
+    assert result["workouts"] == {"rows": 0, "last_id": before["workouts"], "file": None}
+    assert exporter.load_watermarks(user_id) == before
+
+    # Новые id больше удаленных: выгружаются только они
+    add_workouts(db, user_id, exercise_id, workouts=1)
+    result = exporter.export(user_id)
+    assert read_ids(result["workouts"]["file"]) == [4]
+    after = exporter.load_watermarks(user_id)
+    assert all(after[table] > before[table] for table in before)
+
+
+def test_rerun_after_crash_rewrites_same_part(db, exporter, monkeypatch):
+    user_id, exercise_id = make_user(db)
+    add_workouts(db, user_id, exercise_id, workouts=3)
+
+    # Сбой после переименования части, до сохранения отметок
+    def crash(path, text):
+        raise OSError("сбой до сохранения отметок")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(StatsExporter, "_write_atomic", staticmethod(crash))
+        with pytest.raises(OSError):
+            exporter.export(user_id)
+    part = exporter.export_dir / f"user_{user_id}" / "workouts" / "workouts_000000000001.csv"
+    crashed = part.read_bytes()
+    assert exporter.load_watermarks(user_id) == {}
+
+    result = exporter.export(user_id)
+    assert result["workouts"]["file"] == str(part)
+    assert part.read_bytes() == crashed
+    assert read_ids(part) == [1, 2, 3]
+    files = sorted(p.name for p in (exporter.export_dir / f"user_{user_id}").rglob("*") if p.is_file())
+    assert files == ["export_state.json", "history_000000000001.csv", "workouts_000000000001.csv"]
+
+
+def test_jsonl_format_and_unknown_format(db, tmp_path):
+    user_id, exercise_id = make_user(db)
+    add_workouts(db, user_id, exercise_id, workouts=1, sets=2)
+
+    result = StatsExporter(db, export_dir=tmp_path, fmt="jsonl").export(user_id)
+    with open(result["history"]["file"], encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [(line["set_number"], line["exercise_id"]) for line in lines] == [(1, exercise_id), (2, exercise_id)]
+
+    with pytest.raises(ValueError):
+        StatsExporter(db, export_dir=tmp_path, fmt="xml")
@@ -0,0 +1,139 @@
+# tests/test_user_repository.py
+"""Пользователи: хеши паролей, вход и создание (по одному и пакетом)"""
+import hashlib
+
+import pytest
+
+from models.passwords import PasswordHasher
+from models.repositories.user_repository import (
+    DuplicateEmailError, DuplicateUserError, DuplicateUsernameError, UserRepository
+)
+
+# Низкая стоимость scrypt, чтобы тесты не тратили время на хеширование
+FAST_N = 2 ** 10
+
+
+@pytest.fixture
+def users(db):
+    return UserRepository(db, password_hasher=PasswordHasher(n=FAST_N))
+
+
+def stored_hash(db, user_id: int) -> str:
+    with db.get_connection() as conn:
+        return conn.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+
+
+def test_password_is_stored_as_salted_scrypt(db, users):
+    first = users.create_user("a", "a@example.com", "secret")
+    second = users.create_user("b", "b@example.com", "secret")
+
+    first_hash, second_hash = stored_hash(db, first["id"]), stored_hash(db, second["id"])
+    assert first_hash.startswith(f"scrypt${FAST_N}$8$1$")
+    assert first_hash != second_hash  # соль у каждого пользователя своя
+    assert "password_hash" not in first
+
+
+def test_legacy_sha256_hash_is_upgraded_on_login(db, users):
+    legacy = hashlib.sha256(b"secret").hexdigest()
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('old', 'old@example.com', ?)", (legacy,)
+        ).lastrowid
+
+    assert users.authenticate("old@example.com", "wrong") is None
+    assert stored_hash(db, user_id) == legacy
+
+    user = users.authenticate("old@example.com", "secret")
+    assert user["id"] == user_id
+    upgraded = stored_hash(db, user_id)
+    assert upgraded.startswith("scrypt$")
+    assert not users.password_hasher.needs_rehash(upgraded)
+    assert users.authenticate("old@example.com", "secret")["id"] == user_id
+
+
+def test_hash_with_old_cost_is_rehashed_on_login(db, users):
+    user_id = users.create_user("a", "a@example.com", "secret")["id"]
+    stronger = UserRepository(db, password_hasher=PasswordHasher(n=FAST_N * 2))
+
+    assert stronger.authenticate("a@example.com", "secret")["id"] == user_id
+    assert stored_hash(db, user_id).startswith(f"scrypt${FAST_N * 2}$")
+
+
+def test_login_fails_for_inactive_user_and_unknown_email(db, users):
+    user_id = users.create_user("a", "a@example.com", "secret")["id"]
+    with db.get_connection(write=True) as conn:
+        conn.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
+
+    assert users.authenticate("a@example.com", "secret") is None
+    assert users.authenticate("nobody@example.com", "secret") is None
+
+
+def count_users(db) -> int:
+    with db.get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+def test_create_user_returns_row_without_password(db, users):
+    user = users.create_user("a", "a@example.com", "secret")
+    assert set(user) == {"id", "username", "email", "created_at", "is_active", "last_login"}
+    assert (user["username"], user["email"], user["is_active"]) == ("a", "a@example.com", 1)
+    assert users.get_by_id(user["id"])["email"] == "a@example.com"
+
+
+def test_duplicates_map_to_specific_errors(db, users):
+    users.create_user("a", "a@example.com", "secret")
+
+    with pytest.raises(DuplicateEmailError):
+        users.create_user("b", "a@example.com", "secret")
+    with pytest.raises(DuplicateUsernameError):
+        users.create_user("a", "b@example.com", "secret")
+    assert issubclass(DuplicateEmailError, DuplicateUserError)
+    assert count_users(db) == 1
+
+
+def test_create_users_provisions_in_one_transaction(db, users):
+    batch = [{"username": f"u{n}", "email": f"u{n}@example.com", "password": f"p{n}"} for n in range(20)]
+    batch.append({"username": "ready", "email": "ready@example.com",
+                  "password_hash": users.password_hasher.hash("ready")})
+
+    result = users.create_users(batch, workers=4)
+    assert result == {"created": 21, "skipped": []}
+    assert count_users(db) == 21
+    assert users.authenticate("u7@example.com", "p7")["username"] == "u7"
+    assert users.authenticate("ready@example.com", "ready")["username"] == "ready"
+
+
+def test_create_users_rolls_back_on_duplicate(db, users):
+    users.create_user("taken", "taken@example.com", "secret")
+    batch = [
+        {"username": "new1", "email": "new1@example.com", "password": "p"},
+        {"username": "other", "email": "taken@example.com", "password": "p"},
+        {"username": "new2", "email": "new2@example.com", "password": "p"},
+    ]
+
+    with pytest.raises(DuplicateEmailError, match="Строка 2"):
+        users.create_users(batch)
+    assert count_users(db) == 1
+
+
+def test_create_users_skips_existing_when_asked(db, users):
+    users.create_user("taken", "taken@example.com", "secret")
+    batch = [
+        {"username": "new1", "email": "new1@example.com", "password": "p"},
+        {"username": "taken", "email": "other@example.com", "password": "p"},
+        {"username": "new2", "email": "new2@example.com", "password": "p"},
+    ]
+
+    result = users.create_users(batch, skip_existing=True)
+    assert result["created"] == 2
+    assert [(item["index"], item["username"]) for item in result["skipped"]] == [(1, "taken")]
+    assert count_users(db) == 3
+
+
+def test_create_users_validates_required_fields(db, users):
+    with pytest.raises(ValueError, match="Строка 2"):
+        users.create_users([
+            {"username": "a", "email": "a@example.com", "password": "p"},
+            {"username": "b", "email": "", "password": "p"},
+        ])
+    assert count_users(db) == 0
@@ -0,0 +1,106 @@
+# tests/test_user_stats.py
+"""Сводная статистика: триггеры на workouts и сверка с пересчетом"""
+import pytest
+
+from models.repositories.user_stats_repository import UserStatsRepository
+from models.repositories.workout_repository import WorkoutRepository
+
+
+@pytest.fixture
+def users(db):
+    """Два пользователя с упражнением у каждого: {user_id: exercise_id}"""
+    result = {}
+    with db.get_connection(write=True) as conn:
+        for name in ("a", "b"):
+            user_id = conn.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (?, ?, '')",
+                (name, f"{name}@example.com")
+            ).lastrowid
+            result[user_id] = conn.execute(
+                "INSERT INTO exercises (user_id, name) VALUES (?, 'Присед')", (user_id,)
+            ).lastrowid
+    return result
+
+
+def add_workout(db, user_id: int, exercise_id: int, work_time: int, reps: int, sets: int,
+                created_at: str = "2024-03-04 10:00:00") -> int:
+    with db.get_connection(write=True) as conn:
+        return conn.execute(
+            """INSERT INTO workouts (user_id, exercise_id, name, work_time, rest_time, sets, reps, created_at)
+               VALUES (?, ?, 'Присед', ?, 30, ?, ?, ?)""",
+            (user_id, exercise_id, work_time, sets, reps, created_at)
+        ).lastrowid
+
+
+def test_insert_adds_to_all_summaries(db, users):
+    stats = UserStatsRepository(db)
+    (user_id, exercise_id), (other_id, other_exercise) = users.items()
+    add_workout(db, user_id, exercise_id, 100, 20, 2)
+    add_workout(db, user_id, exercise_id, 50, 10, 1, created_at="2024-04-01 10:00:00")
+    add_workout(db, other_id, other_exercise, 7, 1, 1)
+
+    assert stats.get_totals(user_id) == {
+        "total_workouts": 2, "total_duration": 150, "total_reps": 30, "total_sets": 3
+    }
+    assert [row["total_workouts"] for row in stats.get_exercise_totals(user_id)] == [2]
+    months = {row["bucket"]: row["total_duration"] for row in stats.get_recent_periods(user_id, "month")}
+    assert months == {"2024-03": 100, "2024-04": 50}
+    assert stats.get_totals(other_id)["total_duration"] == 7
+    assert stats.check_consistency() == {}
+
+
+def test_update_moves_totals_between_periods(db, users):
+    stats = UserStatsRepository(db)
+    user_id, exercise_id = next(iter(users.items()))
+    workout_id = add_workout(db, user_id, exercise_id, 100, 20, 2)
+
+    WorkoutRepository(db).update(workout_id, user_id, "Присед", 30, 160, 25, 3)
+    with db.get_connection(write=True) as conn:
+        conn.execute("UPDATE workouts SET created_at = '2024-05-06 10:00:00' WHERE id = ?", (workout_id,))
+
+    assert stats.get_totals(user_id) == {
+        "total_workouts": 1, "total_duration": 160, "total_reps": 25, "total_sets": 3
+    }
+    months = {row["bucket"]: row["total_workouts"] for row in stats.get_recent_periods(user_id, "month")}
+    assert months == {"2024-05": 1}
+    assert stats.check_consistency(user_id) == {}
+
+
+def test_delete_subtracts_and_user_delete_clears(db, users):
+    stats = UserStatsRepository(db)
+    user_id, exercise_id = next(iter(users.items()))
+    first = add_workout(db, user_id, exercise_id, 100, 20, 2)
+    add_workout(db, user_id, exercise_id, 50, 10, 1)
+
+    WorkoutRepository(db).delete(first, user_id)
+    assert stats.get_totals(user_id)["total_duration"] == 50
+    assert stats.check_consistency(user_id) == {}
+
+    with db.get_connection(write=True) as conn:
+        conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        remaining = conn.execute("SELECT COUNT(*) FROM user_period_stats WHERE user_id = ?", (user_id,))
+        assert remaining.fetchone()[0] == 0
+    assert stats.get_totals(user_id)["total_workouts"] == 0
+
+
+def test_consistency_check_reports_and_rebuild_repairs_drift(db, users):
+    stats = UserStatsRepository(db)
+    (user_id, exercise_id), (other_id, other_exercise) = users.items()
+    add_workout(db, user_id, exercise_id, 100, 20, 2)
+    add_workout(db, other_id, other_exercise, 7, 1, 1)
+    with db.get_connection(write=True) as conn:
+        conn.execute("UPDATE user_stats SET total_duration = 1 WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM user_exercise_stats WHERE user_id = ?", (user_id,))
+
+    differences = stats.check_consistency()
+    assert set(differences) == {"user_stats", "user_exercise_stats"}
+    assert differences["user_stats"] == [{
+        "key": {"user_id": user_id},
+        "expected": {"total_workouts": 1, "total_duration": 100, "total_reps": 20, "total_sets": 2},
+        "actual": {"total_workouts": 1, "total_duration": 1, "total_reps": 20, "total_sets": 2},
+    }]
+    assert differences["user_exercise_stats"][0]["actual"] is None
+    assert stats.check_consistency(other_id) == {}
+
+    stats.rebuild(user_id)
+    assert stats.check_consistency() == {}
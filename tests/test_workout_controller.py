@@ -0,0 +1,59 @@
+# tests/test_workout_controller.py
+"""Завершение остановленной тренировки: удаляется только тренировка без подходов"""
+import pytest
+
+from config import config
+from controllers.workout_controller import WorkoutController
+from models.repositories.exercise_repository import ExerciseRepository
+
+
+@pytest.fixture
+def controller(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "HISTORY_JOURNAL_PATH", tmp_path / "history_journal.jsonl")
+    monkeypatch.setattr(config, "HISTORY_FLUSH_SETS", 10)
+    return WorkoutController(db)
+
+
+@pytest.fixture
+def workout(db, controller):
+    with db.get_connection(write=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES ('u', 'u@example.com', '')"
+        ).lastrowid
+    exercise_id = ExerciseRepository(db).create(user_id, "Присед", "", 30, 10, 10, 3)
+    result = controller.create_workout(user_id, exercise_id, "Присед", rest_time=30, reps=10, sets=3)
+    assert result["success"]
+    return result["workout"]
+
+
+def workout_exists(db, workout_id: int) -> bool:
+    with db.get_connection() as conn:
+        return conn.execute("SELECT 1 FROM workouts WHERE id = ?", (workout_id,)).fetchone() is not None
+
+
+def test_workout_without_sets_is_deleted(db, controller, workout):
+    result = controller.finish_workout(workout["id"], workout["user_id"])
+
+    assert result["success"] and result["deleted"]
+    assert not workout_exists(db, workout["id"])
+    assert controller.current_workout is None
+
+
+def test_buffered_set_keeps_workout(db, controller, workout):
+    # Подход еще в буфере: итоги в БД нулевые, пока finish_workout их не запишет
+    controller.save_workout_result(1, 10, 30)
+    result = controller.finish_workout(workout["id"], workout["user_id"])
+
+    assert result["success"] and not result["deleted"]
+    assert workout_exists(db, workout["id"])
+    with db.get_connection() as conn:
+        row = conn.execute("SELECT work_time FROM workouts WHERE id = ?", (workout["id"],)).fetchone()
+        sets = conn.execute("SELECT COUNT(*) FROM history WHERE workout_id = ?", (workout["id"],)).fetchone()[0]
+    assert (row["work_time"], sets) == (30, 1)
+
+
+def test_foreign_workout_is_not_deleted(db, controller, workout):
+    result = controller.finish_workout(workout["id"], workout["user_id"] + 1)
+
+    assert not result["success"]
+    assert workout_exists(db, workout["id"])
@@ -0,0 +1,108 @@
+# tests/test_workout_timer.py
+"""
+Проверка WorkoutTimer при зависаниях владельца
+
+Владелец таймера (цикл событий GUI) опрашивает tick() с задержками:
+между опросами вставляются случайные зависания 50-500 мс (модальный
+диалог, медленная запись в БД). Длительность каждого подхода, записанная
+таймером, должна совпадать с реальной (от конца отдыха до нажатия
+'Выполнено') с точностью 10 мс.
+"""
+import random
+import time
+
+import pytest
+
+from models.workout_timer import TimerPhase, WorkoutTimer
+
+TOLERANCE = 0.010  # секунд
+STALL_RANGE = (0.050, 0.500)  # секунд
+
+
+class FakeClock:
+    """Монотонные часы, которые двигает тест"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class RealClock:
+    """time.monotonic с настоящими паузами"""
+
+    def __call__(self) -> float:
+        return time.monotonic()
+
+    @staticmethod
+    def sleep(seconds: float):
+        time.sleep(seconds)
+
+
+def run_session(clock, rng: random.Random, sets: int, prepare: float, rest: float,
+                set_time: tuple, poll: float, stall_chance: float = 0.5) -> list:
+    """
+    Тренировка с зависаниями между опросами таймера
+
+    Returns:
+        Список (записанная длительность, реальная длительность) по подходам
+    """
+    timer = WorkoutTimer(total_sets=sets, rest_time=rest, prepare_time=prepare,
+                         countdown_time=3, clock=clock)
+
+    def poll_once():
+        clock.sleep(poll)
+        if rng.random() < stall_chance:
+            clock.sleep(rng.uniform(*STALL_RANGE))
+        timer.tick()
+
+    timer.start()
+    set_started = clock() + prepare  # подход начинается по окончании подготовки
+    results = []
+    for _ in range(sets):
+        while timer.phase != TimerPhase.WAIT_EXECUTE:
+            poll_once()
+
+        # Нажатие 'Выполнено' обрабатывается при первом опросе после цели
+        target = set_started + rng.uniform(*set_time)
+        while clock() < target:
+            poll_once()
+        pressed = clock()
+        _, duration = timer.complete_set()
+        results.append((duration, pressed - set_started))
+        set_started = pressed + rest
+
+    assert timer.phase == TimerPhase.FINISHED
+    assert timer.durations == [recorded for recorded, _ in results]
+    return results
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_stalls_do_not_shift_set_durations(seed):
+    results = run_session(FakeClock(), random.Random(seed), sets=10, prepare=10, rest=30,
+                          set_time=(5, 60), poll=0.1)
+    for recorded, actual in results:
+        assert abs(recorded - actual) <= TOLERANCE
+
+
+def test_stalls_do_not_shift_set_durations_real_clock():
+    """То же на настоящих часах: тренировка сжата до нескольких секунд"""
+    results = run_session(RealClock(), random.Random(0), sets=3, prepare=0.2, rest=0.3,
+                          set_time=(0.2, 0.4), poll=0.02)
+    for recorded, actual in results:
+        assert abs(recorded - actual) <= TOLERANCE
+
+
+def test_late_tick_starts_set_at_deadline():
+    """Опрос после зависания начинает подход в момент окончания отдыха, а не опроса"""
+    clock = FakeClock()
+    timer = WorkoutTimer(total_sets=2, rest_time=30, prepare_time=10, clock=clock)
+    timer.start()
+    clock.sleep(10.4)  # опрос опоздал на 400 мс
+    timer.tick()
+    assert timer.phase == TimerPhase.WAIT_EXECUTE
+    assert timer.elapsed == pytest.approx(0.4)